@@ -2,12 +2,15 @@ from fastapi import APIRouter, HTTPException
 from schemas.item_schema import item_info_request, item_info_response, item_info_snapshot, item_input_snapshot, look_info
 from schemas.user_schema import user_style_summary, user_profile
 from schemas.gemini_schema import GeminiExamplePrompt
-from service.gemini_service import extract_crawling_tasks, structured_personal_color_analysis
-from service.crowling_service import crowling_item_snap, category_codes, process_and_group_crawling_tasks
+from service.gemini_service import extract_crawling_tasks, structured_personal_color_analysis, structured_crawling_task_stream, current_recommendation_fingerprint
+from service.crowling_service import crowling_item_snap, category_codes, process_and_group_crawling_tasks, stream_and_group_crawling_tasks
+from core.config import settings
 from typing import Optional, List
 from db.user_session import SessionLocal
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Request
+from service.request_guard import cancel_on_disconnect
+from service.singleflight import get_singleflight
 
 router = APIRouter(prefix="/crawling", tags=["crawling"])
 
@@ -28,6 +31,7 @@ def get_db():
 async def analyze_structured_personal_color(
     user_id : int,
     filter : int,
+    request : Request,
     db : Session = Depends(get_db)
 ):
     """
@@ -41,12 +45,65 @@ async def analyze_structured_personal_color(
     2. 추천 결과를 크롤링 태스크로 변환
     3. 각 태스크에 대해 실제 상품 크롤링 수행
     4. 크롤링된 상품들을 룩 형태로 그룹화하여 반환
+    (클라이언트 연결이 끊기면 Gemini 호출/크롤링을 취소)
+
+    settings.crawling_stream_enabled이면 추천을 스트리밍으로 받아 완성된 룩부터 바로 크롤링을 시작하므로
+    Gemini 응답 생성과 크롤링이 겹쳐 전체 응답 시간이 줄어듭니다.
+
+    같은 user_id, filter, 추천 입력 지문으로 동시에 들어온 요청은 하나로 합쳐 한 번만 계산합니다. (singleflight)
+    합쳐진 계산은 기다리는 요청이 모두 끊긴 경우에만 취소됩니다.
     """
+    singleflight = get_singleflight()
+    if singleflight is None:
+        return await cancel_on_disconnect(request, _analyze_and_crawl(user_id, filter, db))
+
+    key = f"analyze-item:{user_id}:{filter}:{current_recommendation_fingerprint(db, user_id)}"
+    return await cancel_on_disconnect(
+        request,
+        singleflight.do(key, lambda: _analyze_and_crawl_in_session(user_id, filter),
+                        dumps=_dump_look_infos, loads=_load_look_infos)
+    )
+
+
+def _dump_look_infos(look_info_list: List[look_info]) -> List[dict]:
+    return [look.model_dump() for look in look_info_list]
+
+
+def _load_look_infos(payload: List[dict]) -> List[look_info]:
+    return [look_info.model_validate(look) for look in payload]
+
+
+async def _analyze_and_crawl_in_session(user_id: int, filter: int) -> List[look_info]:
+    """합쳐진 요청의 계산: 먼저 온 요청이 끊겨도 계속될 수 있으므로 요청 세션 대신 새 세션을 사용합니다."""
+    db = SessionLocal()
+    try:
+        return await _analyze_and_crawl(user_id, filter, db)
+    finally:
+        db.close()
+
+
+async def _analyze_and_crawl(user_id: int, filter: int, db: Session) -> List[look_info]:
+    """추천 분석 + 크롤링 + 룩 그룹화"""
+    if settings.crawling_stream_enabled:
+        try:
+            look_info_list = await stream_and_group_crawling_tasks(
+                structured_crawling_task_stream(user_id, db), user_id, db, filter
+            )
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            print(f"Error in streamed analysis: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"구조화된 분석 중 오류가 발생했습니다: {str(e)}")
+        print(f"Final result: {len(look_info_list)} look_info objects")
+        return look_info_list
+
     try:
         result = await structured_personal_color_analysis(user_id, db)
         print(f"Gemini API result type: {type(result)}")
         print(f"Gemini API result: {result}")
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Error in structured_personal_color_analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"구조화된 분석 중 오류가 발생했습니다: {str(e)}")
@@ -77,14 +134,7 @@ async def analyze_structured_personal_color(
     )
     
     print(f"Final result: {len(look_info_list)} look_info objects")
-    try : 
-        return look_info_list
-    except Exception as e:
-        print(f"Error in return look_info_list: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"응답 반환 중 오류가 발생했습니다.: {str(e)}")
-    
-
-
+    return look_info_list
 
 
 @router.get("/{product_id}/snap", response_model=item_info_snapshot)
@@ -4,11 +4,12 @@ from schemas.personal_schema import PersonalColorResponse, PersonalColorAnalysis
 from schemas.user_schema import user_style_summary, user_profile
 from schemas.gemini_schema import GeminiExamplePrompt
 from service.crowling_service import crowling_item_snap, category_codes
-from service.gemini_service import analyze_personal_color, structured_personal_color_analysis, extract_crawling_tasks
+from service.gemini_service import analyze_personal_color, structured_personal_color_analysis, extract_crawling_tasks, get_gemini_metrics
 from typing import Optional, List
 from db.user_session import SessionLocal
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Request
+from service.request_guard import cancel_on_disconnect
 
 router = APIRouter(prefix="/gemini", tags=["gemini"])
 
@@ -26,22 +27,26 @@ def get_db():
         db.close()
 
 @router.post("/analyze-color", response_model=str)
-async def analyze_personal_color_endpoint(face_color: PersonalColorResponse):
+async def analyze_personal_color_endpoint(face_color: PersonalColorResponse, request: Request):
     """
     퍼스널 컬러 분석을 수행하는 엔드포인트
     - face_color: 분석할 얼굴 색상 정보
     - Gemini API를 사용하여 퍼스널 컬러 분석 결과를 텍스트로 반환
     - 분석 중 오류가 발생하면 500 에러 반환
+    - 응답 전에 클라이언트 연결이 끊기면 Gemini 호출을 취소
     """
     try:
-        result = await analyze_personal_color(face_color)
+        result = await cancel_on_disconnect(request, analyze_personal_color(face_color))
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"분석 중 오류가 발생했습니다: {str(e)}")
 
 @router.post("/analyze-structured", response_model=GeminiExamplePrompt) #gemini 출력확인용 함수
 async def analyze_structured_personal_color(
     user_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -51,17 +56,22 @@ async def analyze_structured_personal_color(
     - 사용자 스타일 정보와 프로필을 포함한 종합 분석을 제공
     - Gemini API를 통해 구조화된 추천 결과를 반환
     - 분석 중 오류가 발생하면 500 에러 반환
+    - 응답 전에 클라이언트 연결이 끊기면 Gemini 호출을 취소
     """
     try:
-        result = await structured_personal_color_analysis(user_id, db)
+        result = await cancel_on_disconnect(request, structured_personal_color_analysis(user_id, db))
         
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"구조화된 분석 중 오류가 발생했습니다: {str(e)}")
 
-
-
-
-
-
-
+@router.get("/metrics")
+async def gemini_metrics():
+    """
+    Gemini 호출 지표
+    - rate_limiter: 남은 토큰, 우선순위별 대기열 길이, 동시 실행 수, 429 재시도/일시정지 상태
+    - recommendation_cache: 구조화된 추천 캐시 통계
+    """
+    return get_gemini_metrics()
@@ -2,16 +2,22 @@ from fastapi import APIRouter
 from typing import List
 from fastapi import UploadFile
 from fastapi.responses import FileResponse
-from service.facecolor_service import main, extract_face_only
-from service.gemini_service import analyze_personal_color
-from schemas.personal_schema import FaceColorData, PersonalColorResponse
+from service.facecolor_service import main, extract_face_only, analyze_face_full, visualize_face_colors, get_face_model_status, get_inference_executor
+from service.face_result_cache import get_face_result_cache
+from service.personal_color_cache import get_verdict_cache
+from service.face_batch_job import start_background_job, get_current_job
+from service.gemini_service import analyze_personal_color, is_valid_verdict
+from schemas.personal_schema import FaceColorData, PersonalColorResponse, PersonalColorFullResponse, FaceBatchJobRequest
 import json
+import base64
 from fastapi import Form, Response
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Header, Request
+from service.request_guard import cancel_on_disconnect
 from db.user_session import SessionLocal
 import os
 from fastapi import HTTPException
+from core.config import settings
 
 def get_db():
     """
@@ -25,8 +31,72 @@ def get_db():
     finally:
         db.close()
 
+def verify_admin_key(x_admin_key: str = Header(default=None)):
+    """
+    관리자 엔드포인트 인증 의존성 함수
+    - settings.admin_api_key가 설정되지 않았으면 관리자 엔드포인트를 사용할 수 없음 (403)
+    - X-Admin-Key 헤더가 일치하지 않으면 401
+    """
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="관리자 엔드포인트가 비활성화되어 있습니다.")
+    if x_admin_key != settings.admin_api_key:
+        raise HTTPException(status_code=401, detail="관리자 키가 올바르지 않습니다.")
+
 router = APIRouter(prefix="/personal", tags=["personal"])
 
+@router.get("/ready")
+async def face_model_ready(response: Response):
+    """
+    얼굴 파싱 모델 준비 상태를 반환하는 엔드포인트
+    - 모델 로드와 워밍업이 끝났으면 200, 아직이면 503 반환
+    - 로드 소요 시간과 마지막 로드 오류를 함께 반환
+    """
+    status = get_face_model_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+@router.get("/metrics")
+async def face_inference_metrics():
+    """
+    얼굴 분석 추론 실행기 지표를 반환하는 엔드포인트
+    - 대기/실행 중 작업 수, 처리/실패/거절 건수, 평균·최대 처리 시간
+    - 마이크로 배칭 통계 (스레드 모드에서 모델이 로드된 경우)
+    - 결과 캐시 적중률 (캐시가 켜져 있는 경우)
+    - 퍼스널 컬러 판정 캐시 적중률 (캐시가 켜져 있는 경우)
+    """
+    cache = get_face_result_cache()
+    verdict_cache = get_verdict_cache()
+    return {
+        "executor": get_inference_executor().metrics(),
+        "model": get_face_model_status(),
+        "cache": cache.stats() if cache else None,
+        "verdict_cache": verdict_cache.stats() if verdict_cache else None,
+    }
+
+@router.post("/admin/batch", dependencies=[Depends(verify_admin_key)])
+def start_face_batch_job(request: FaceBatchJobRequest):
+    """
+    얼굴 색상 일괄 추출 작업을 백그라운드로 시작하는 관리자 엔드포인트
+    - inputs: 서버에 저장된 이미지 파일 또는 디렉터리 경로 목록
+    - output: 결과 JSONL 파일 이름, settings.face_batch_job_dir 안의 상대 경로만 허용 (같은 경로로 다시 요청하면 이어서 처리)
+    - 이미 실행 중인 작업이 있으면 409
+    디렉터리 탐색이 오래 걸릴 수 있으므로 일반 함수로 두어 스레드 풀에서 실행합니다. (이벤트 루프를 막지 않음)
+    """
+    job = start_background_job(request.inputs, request.output, workers=request.workers, resume=request.resume)
+    return job.status()
+
+@router.get("/admin/batch", dependencies=[Depends(verify_admin_key)])
+async def face_batch_job_status():
+    """
+    가장 최근 일괄 추출 작업의 진행 상황을 반환하는 관리자 엔드포인트
+    - 전체/처리/성공/실패/건너뜀 건수, 처리 속도(장/초), 경과 시간
+    """
+    job = get_current_job()
+    if job is None:
+        raise HTTPException(status_code=404, detail="실행한 일괄 추출 작업이 없습니다.")
+    return job.status()
+
 @router.post("/facecolor", response_model=FaceColorData)
 async def extract_face_color(file: UploadFile):
     """
@@ -38,8 +108,22 @@ async def extract_face_color(file: UploadFile):
     face_color_data = await main(file)
     return face_color_data
 
+@router.post("/facecolor/visualize")
+async def visualize_face_color(file: UploadFile):
+    """
+    얼굴 색상 분석 결과를 시각화한 이미지를 반환하는 엔드포인트 (디버그용)
+    - file: 분석할 이미지 파일 (UploadFile)
+    - 원본, 세그멘테이션 마스크, 추출 색상 팔레트, 부위별 마스크를 담은 PNG 반환
+    """
+    image_bytes = await visualize_face_colors(file)
+    return Response(
+        content=image_bytes,
+        media_type="image/png",
+        headers={"Content-Disposition": "inline; filename=face_color_analysis.png"}
+    )
+
 @router.post("/analyze-all" , response_model=PersonalColorResponse)
-async def analyze_face_all(file: UploadFile, user_id: int, db: Session = Depends(get_db)):
+async def analyze_face_all(file: UploadFile, user_id: int, request: Request, db: Session = Depends(get_db)):
     """
     이미지를 받아서 색상 추출부터 퍼스널 컬러 분석까지 한 번에 처리하는 엔드포인트
     - file: 분석할 이미지 파일 (UploadFile)
@@ -56,7 +140,7 @@ async def analyze_face_all(file: UploadFile, user_id: int, db: Session = Depends
     try:
         face_color_data = await main(file)
         # FaceColorData 모델 검증 없이 직접 딕셔너리 전달
-        analysis_text = await analyze_personal_color(face_color_data, user_id, db)
+        analysis_text = await cancel_on_disconnect(request, analyze_personal_color(face_color_data, user_id, db))
         return PersonalColorResponse(personal_color_analysis=analysis_text)
     except HTTPException as e:
         # HTTPException의 detail만 반환
@@ -66,6 +150,41 @@ async def analyze_face_all(file: UploadFile, user_id: int, db: Session = Depends
     
 
 
+@router.post("/analyze-full", response_model=PersonalColorFullResponse)
+async def analyze_face_full_endpoint(file: UploadFile, user_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    색상 추출, 퍼스널 컬러 분석, 얼굴 이미지 추출을 한 번에 처리하는 엔드포인트
+    - file: 분석할 이미지 파일 (UploadFile)
+    - user_id: 분석할 사용자 ID
+    - db: 데이터베이스 세션
+    
+    /analyze-all 과 /extract-face-image 를 연달아 호출하는 것과 같은 결과를
+    세그멘테이션 한 번으로 반환합니다. 얼굴 이미지는 base64 PNG data URI로 포함됩니다.
+
+    오류 발생 시 detail에 에러 메시지를 담아 반환
+    - 이미지/얼굴 검증 오류: 해당 4xx 상태 코드
+    - 퍼스널 컬러 판정 실패(Gemini 오류, 시간 초과 등): 502
+    - 그 외 오류: 500
+    """
+    try:
+        face_result = await analyze_face_full(file)
+        analysis_text = await cancel_on_disconnect(request, analyze_personal_color(face_result["hex_codes"], user_id, db))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"분석 중 오류가 발생했습니다: {str(e)}")
+
+    # analyze_personal_color는 판정 실패 시 오류 메시지를 문자열로 반환하므로 판정 결과로 내보내지 않음
+    if not is_valid_verdict(analysis_text):
+        raise HTTPException(status_code=502, detail=analysis_text)
+
+    face_image = "data:image/png;base64," + base64.b64encode(face_result["cutout_png"]).decode("ascii")
+    return PersonalColorFullResponse(
+        hex_codes=face_result["hex_codes"],
+        personal_color_analysis=analysis_text,
+        face_image=face_image,
+    )
+
 @router.post("/extract-face-image")
 async def extract_face_image_endpoint(file: UploadFile):
     """
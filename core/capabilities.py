@@ -0,0 +1,77 @@
+# core/capabilities.py
+# 라우터 그룹(capability) 레지스트리
+# 라우터 모듈은 settings.enabled_routers에 포함된 그룹만 import 하므로, 예를 들어 users 전용 워커는
+# torch / transformers / selenium / google.generativeai 등을 전혀 불러오지 않습니다.
+# 그룹별 import 시간과 전체 기동 시간은 startup_report()로 확인할 수 있습니다. (GET /startup)
+
+import time
+
+# main.py가 가장 먼저 import 하므로, 이 시점을 기동 시작으로 봅니다. (fastapi 등 import 시간 포함)
+_PROCESS_STARTED = time.perf_counter()
+
+import importlib
+from typing import Dict, Any, List
+
+from fastapi import FastAPI
+
+from core.config import settings
+
+# 그룹 이름 -> (라우터 모듈, 설명)
+CAPABILITIES: Dict[str, Dict[str, str]] = {
+    "users": {"module": "api.user_router", "description": "회원/스타일 요약/즐겨찾기/룩 CRUD"},
+    "personal": {"module": "api.personal_router", "description": "얼굴 색상 추출 + 퍼스널 컬러 분석 (cv2, google.generativeai / torch, transformers는 모델 로드 시)"},
+    "crawling": {"module": "api.crawling_router", "description": "상품 크롤링 (selenium, bs4)"},
+    "gemini": {"module": "api.gemini_router", "description": "Gemini 퍼스널 컬러/스타일 분석 (google.generativeai, instructor)"},
+}
+
+_report: Dict[str, Any] = {
+    "process_started": _PROCESS_STARTED,
+    "enabled": [],
+    "routers": {},
+    "ready_seconds": None,
+}
+
+
+def enabled_capabilities() -> List[str]:
+    """설정에서 활성화된 그룹 목록 (쉼표 구분, "all"이면 전체)"""
+    names = [name.strip() for name in settings.enabled_routers.split(",") if name.strip()]
+    if "all" in names:
+        return list(CAPABILITIES)
+    unknown = [name for name in names if name not in CAPABILITIES]
+    if unknown:
+        raise ValueError(f"알 수 없는 라우터 그룹입니다: {', '.join(unknown)} (사용 가능: {', '.join(CAPABILITIES)})")
+    return names
+
+
+def is_enabled(name: str) -> bool:
+    """해당 그룹이 이 프로세스에서 활성화되어 있는지 여부"""
+    return name in _report["enabled"]
+
+
+def register_routers(app: FastAPI) -> List[str]:
+    """활성화된 그룹의 라우터 모듈만 import 하여 앱에 등록하고, 그룹별 import 시간을 기록합니다."""
+    names = enabled_capabilities()
+    for name in names:
+        started = time.perf_counter()
+        module = importlib.import_module(CAPABILITIES[name]["module"])
+        app.include_router(module.router)
+        _report["routers"][name] = {"import_seconds": round(time.perf_counter() - started, 3)}
+    _report["enabled"] = names
+    return names
+
+
+def mark_ready():
+    """앱 startup 이벤트가 끝난 시점을 기록하고 기동 시간 요약을 출력합니다."""
+    _report["ready_seconds"] = round(time.perf_counter() - _report["process_started"], 3)
+    detail = ", ".join(f"{name} {info['import_seconds']}초" for name, info in _report["routers"].items())
+    print(f"앱 기동 완료: {_report['ready_seconds']}초 (라우터 import: {detail or '없음'})")
+
+
+def startup_report() -> Dict[str, Any]:
+    """기동 시간 보고서 (활성 그룹, 그룹별 import 시간, 요청을 받을 수 있게 되기까지 걸린 시간)"""
+    return {
+        "enabled": list(_report["enabled"]),
+        "available": {name: info["description"] for name, info in CAPABILITIES.items()},
+        "routers": dict(_report["routers"]),
+        "ready_seconds": _report["ready_seconds"],
+    }
@@ -1,10 +1,112 @@
 # core/config.py
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
     gemini_api_key: str
     debug: bool = False
+    enabled_routers: str = "all"  # 이 프로세스에 등록할 라우터 그룹 (쉼표 구분: users,personal,crawling,gemini 또는 all)
+
+    # LLM 백엔드 ("gemini": 실제 Gemini API, "fake": 부하/지연 시간 측정용 로컬 대역)
+    llm_backend: str = "gemini"
+    fake_llm_text_latency_ms: float = 1500.0          # 대역: 퍼스널 컬러 판정 지연 시간 중앙값
+    fake_llm_structured_latency_ms: float = 20000.0   # 대역: 코디 추천 전체 지연 시간 중앙값
+    fake_llm_latency_sigma: float = 0.3               # 대역: 로그 정규 분포 표준편차 (꼬리 지연)
+    fake_llm_rate_limit_rate: float = 0.0             # 대역: 429 오류를 주입할 확률 (0~1)
+    fake_llm_seed: Optional[int] = None
+    fake_llm_canned_path: Optional[str] = None        # 대역: 항상 반환할 GeminiExamplePrompt JSON 파일
+
+    # Gemini 호출 설정
+    gemini_timeout_seconds: float = 60.0              # 퍼스널 컬러 진단 호출 시간 제한
+    gemini_structured_timeout_seconds: float = 180.0  # 구조화된 코디 추천 호출 시간 제한 (재시도 포함)
+
+    # Gemini 호출 속도 제한 (모든 Gemini 호출 공유, 퍼스널 컬러 판정 우선)
+    gemini_rate_limit_rpm: float = 60.0        # 분당 요청 수 (토큰 충전 속도)
+    gemini_rate_limit_burst: int = 10          # 한 번에 바로 보낼 수 있는 요청 수
+    gemini_max_in_flight: int = 8              # 동시에 실행 중인 최대 호출 수
+    gemini_max_retries: int = 3                # 429 오류 재시도 횟수
+    gemini_backoff_base_seconds: float = 1.0   # 첫 재시도 대기 시간 (시도마다 2배, 지터 적용)
+    gemini_backoff_max_seconds: float = 30.0
+    gemini_queue_timeout_seconds: float = 30.0  # 대기열에서 기다리는 최대 시간
+
+    # 구조화된 추천 프롬프트 고정 앞부분(역할/카탈로그 코드 표/정책)을 Gemini 컨텍스트 캐시로 전송
+    # (모델의 최소 캐시 토큰 수에 못 미치거나 지원되지 않으면 전체 프롬프트로 자동 전환)
+    gemini_context_cache_enabled: bool = False
+    gemini_context_cache_ttl_seconds: int = 3600
+
+    crawling_stream_enabled: bool = True              # /crawling/analyze-item: 추천을 스트리밍으로 받아 완성된 룩부터 크롤링 시작
+
+    # 동일 분석 요청 합치기 (/crawling/analyze-item, user_id + filter + 입력 지문 기준)
+    singleflight_backend: str = "local"          # "off", "local"(프로세스 내부), "file"(잠금 파일로 워커 간 공유)
+    singleflight_dir: Optional[str] = None       # "file" 잠금/결과 파일 경로 (None이면 임시 디렉터리)
+
+    # 퍼스널 컬러 판정 방식
+    # "gemini"(항상 Gemini), "hybrid"(로컬 신뢰도 낮으면 Gemini), "local"(로컬만, 판정할 수 없을 때만 Gemini)
+    # 로컬 분류기의 기준점은 Gemini 판정과의 일치율로 보정되지 않았으므로, 보정 전까지는 "gemini"를 기본값으로 둡니다.
+    personal_color_classifier: str = "gemini"
+    personal_color_confidence_threshold: float = 0.6   # hybrid 모드에서 로컬 결과를 그대로 쓰는 최소 신뢰도
+    personal_color_centroids_path: Optional[str] = None  # 타입별 기준점 보정 JSON 파일 (없으면 기본값)
+    personal_color_max_distance: float = 3.0           # 로컬 판정 최대 표준화 거리 (가장 가까운 기준점도 이보다 멀면 Gemini)
+    personal_color_min_chroma: float = 5.0             # 로컬 판정 최소 피부 채도 C* (무채색에 가까우면 색상각이 무의미하므로 Gemini)
+
+    # 퍼스널 컬러 판정 캐시 (피부/머리카락/눈 색을 Lab 격자로 양자화한 키)
+    personal_color_cache_enabled: bool = True
+    personal_color_cache_bin_size: float = 4.0            # Lab 격자 한 칸 크기 (클수록 더 많이 공유)
+    personal_color_cache_max_entries: int = 1024
+    personal_color_cache_ttl_seconds: int = 7 * 24 * 3600
+    personal_color_cache_sql: bool = False                # DB 테이블에도 저장 (워커/재시작 간 공유)
+
+    # 구조화된 코디 추천 결과 캐시 (스타일 요약 + 퍼스널 컬러 지문 기준)
+    recommendation_cache_enabled: bool = True
+    recommendation_cache_max_entries: int = 1024
+    recommendation_cache_ttl_seconds: int = 6 * 3600       # 신선 기간
+    recommendation_cache_stale_seconds: int = 3 * 24 * 3600  # TTL 이후 이전 결과를 반환하며 백그라운드 갱신 (0이면 사용 안 함)
+
+    # 얼굴 파싱 모델 설정
+    face_model_name: str = "jonathandinu/face-parsing"
+    face_model_preload: bool = True  # 앱 시작 시 모델을 미리 로드
+    face_model_warmup: bool = True   # 로드 직후 더미 이미지로 워밍업 추론
+    face_backend: str = "torch"      # "torch", "onnx", "onnx-int8"
+    face_onnx_dir: str = "models"    # ONNX 변환 모델 저장 경로
+    face_max_side: int = 768         # 세그멘테이션/색상 추출 작업 해상도 (긴 변 px, 0이면 원본 사용)
+    face_validation_side: int = 256  # 얼굴 개수 검증용 축소 마스크의 긴 변 (px)
+    face_region_margin: float = 0.5  # 얼굴 경계 상자를 넓히는 비율 (색상 추출 영역, 잘라내기는 이어진 얼굴/머리카락 전체)
+    face_color_strategy: str = "kmeans_fast"  # "kmeans", "kmeans_fast", "minibatch", "histogram"
+    face_color_sample_size: int = 20000       # kmeans_fast / minibatch 서브샘플 픽셀 수
+    face_debug_visualization: bool = False    # 분석 결과 그림을 face_debug_dir에 저장 (디버그용)
+    face_debug_dir: str = "debug"
+    face_debug_dpi: int = 150
+
+    # 업로드 이미지 수신 설정
+    upload_max_bytes: int = 25 * 1024 * 1024   # 업로드 최대 크기 (초과 시 413)
+    upload_multipart_overhead_bytes: int = 64 * 1024  # 요청 본문 제한에서 multipart 경계/헤더/다른 필드에 허용하는 여유 크기
+    upload_chunk_size: int = 1024 * 1024       # 업로드를 읽는 청크 크기
+    upload_max_pixels: int = 60_000_000        # 디코딩 전 허용 최대 픽셀 수 (압축 폭탄 방지)
+
+    # 얼굴 색상 추출 결과 캐시 (업로드 바이트 해시 기준)
+    face_cache_enabled: bool = True
+    face_cache_max_entries: int = 256
+    face_cache_ttl_seconds: int = 3600
+    face_cache_phash: bool = False              # 디코딩한 이미지의 perceptual hash로도 조회
+    face_cache_dir: Optional[str] = None        # 디스크 저장 경로 (None이면 메모리만)
+    face_cache_disk_max_mb: int = 512
+
+    # 얼굴 파싱 마이크로 배칭 설정
+    face_batch_enabled: bool = True
+    face_batch_max_size: int = 8       # 한 번에 묶을 최대 이미지 수
+    face_batch_max_wait_ms: float = 5.0  # 배치를 모으기 위해 기다리는 최대 시간(ms)
+
+    # 추론 실행기 설정 (이벤트 루프 밖에서 얼굴 분석 실행)
+    inference_executor: str = "thread"  # "thread" 또는 "process"
+    inference_workers: int = 2          # 워커 스레드/프로세스 수
+    inference_max_queue: int = 16       # 실행 중 작업 외 최대 대기 작업 수 (초과 시 503)
+    torch_num_threads: int = 0          # torch intra-op 스레드 수 (0이면 기본값)
+
+    # 얼굴 색상 일괄 추출 작업 (CLI / 관리자 엔드포인트)
+    face_batch_job_workers: int = 4
+    face_batch_job_dir: str = "batch_jobs"  # 관리자 엔드포인트의 결과 파일 저장 디렉터리 (output은 이 안의 경로만 허용)
+    admin_api_key: Optional[str] = None  # 관리자 엔드포인트 X-Admin-Key 값 (None이면 관리자 엔드포인트 비활성화)
 
     class Config:
         env_file = ".env"  # .env 파일에서 읽어옴
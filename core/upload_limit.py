@@ -0,0 +1,61 @@
+# 업로드 요청 본문 크기 제한
+# main.py가 모든 워커에서 import 하므로 PIL 등 무거운 모듈을 import 하지 않습니다. (users 전용 워커 기동 시간 유지)
+
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from core.config import settings
+
+
+def too_large_detail(max_bytes: int) -> str:
+    """업로드 크기 초과(413) 오류 메시지"""
+    return f"이미지 파일이 너무 큽니다. 최대 {max_bytes // (1024 * 1024)}MB까지 업로드할 수 있습니다."
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, max_bytes: Optional[int] = None, overhead_bytes: Optional[int] = None):
+        """
+        multipart 업로드 요청 본문 크기를 요청 단계에서 제한하는 ASGI 미들웨어
+        Starlette는 핸들러가 실행되기 전에 multipart 본문 전체를 받아 임시 파일에 저장하므로,
+        핸들러 안에서는 큰 업로드를 막을 수 없습니다. 여기서 Content-Length가 제한을 넘으면 본문을 받기 전에 413을 반환하고,
+        Content-Length가 없거나(청크 전송) 실제 본문이 더 길면 받은 바이트를 세다가 제한을 넘는 순간 413으로 중단합니다.
+
+        Args:
+            max_bytes: 파일 최대 크기 (기본값 settings.upload_max_bytes)
+            overhead_bytes: multipart 경계/헤더 및 다른 폼 필드에 허용하는 여유 크기 (기본값 settings.upload_multipart_overhead_bytes)
+        """
+        self.app = app
+        self.max_bytes = max_bytes or settings.upload_max_bytes
+        self.limit = self.max_bytes + (settings.upload_multipart_overhead_bytes if overhead_bytes is None else overhead_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.limit:
+            response = JSONResponse({"detail": too_large_detail(self.max_bytes)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    # 폼 파싱 중(핸들러 실행 전)에 발생하므로 예외 처리기가 413 응답으로 변환
+                    raise HTTPException(status_code=413, detail=too_large_detail(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from model.user_model import User, StylingSummary, Item, UserFavoriteItem, Favorite, FavoriteOutfitItem
 from fastapi import HTTPException
+from service.recommendation_cache import invalidate_recommendations
 
 def get_user_by_id(db : Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
@@ -20,6 +21,7 @@ def update_user_password_in_db(db: Session, user: User, password: str):
 def update_user_personal_color_in_db(db: Session, user: User, personal_color_name: str):
     db.query(User).filter(User.id == user.id).update({User.personal_color_name : personal_color_name})
     db.commit()
+    invalidate_recommendations(user.id)
     db.refresh(user)
     return user
 
@@ -36,17 +38,20 @@ def update_styling_summary_in_db(db: Session, styling_summary: StylingSummary, n
         if value is not None:  # None이 아닌 값만 업데이트
             setattr(styling_summary, key, value)
     db.commit()
+    invalidate_recommendations(styling_summary.user_id)
     db.refresh(styling_summary)
     return styling_summary
 
 def delete_user_in_db(db: Session, user: User):
     db.delete(user)
     db.commit()
+    invalidate_recommendations(user.id)
     return user
 
 def delete_styling_summary_in_db(db: Session, styling_summary: StylingSummary):
     db.delete(styling_summary)
     db.commit()
+    invalidate_recommendations(styling_summary.user_id)
     return styling_summary
 
 #db, 모델 받아서 저장처리
@@ -62,12 +67,14 @@ def create_user_personal_color_in_db(db: Session, user_id : int, personal_color_
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     db.query(User).filter(User.id == user_id).update({User.personal_color_name : personal_color_name})
     db.commit()
+    invalidate_recommendations(user_id)
     db.refresh(db_user)
     return db_user
 
 def create_styling_summary_in_db(db: Session, db_styling_summary: StylingSummary):
     db.add(db_styling_summary)
     db.commit()
+    invalidate_recommendations(db_styling_summary.user_id)
     db.refresh(db_styling_summary)
     return db_styling_summary
 
@@ -1,11 +1,11 @@
+from core.capabilities import register_routers, is_enabled, mark_ready, startup_report
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from api.personal_router import router as personal_router
-from api.user_router import router as user_router
-from api.crawling_router import router as crawling_router
-from api.gemini_router import router as gemini_router
 from fastapi.middleware.cors import CORSMiddleware
+from core.config import settings
+from core.upload_limit import UploadSizeLimitMiddleware
+import threading
 app = FastAPI(title="퍼스널 컬러 분석 API", description="얼굴 이미지로 퍼스널 컬러를 분석합니다")
 
 origins = [
@@ -16,6 +16,10 @@ origins = [
     # 여기에 프론트엔드가 실행되는 정확한 URL을 추가하세요.
 ]
 
+# 업로드 요청 본문 크기 제한 (본문을 다 받기 전에 413)
+# 나중에 추가한 미들웨어가 바깥쪽이므로 CORS보다 먼저 추가하여 413 응답에도 CORS 헤더가 붙게 함
+app.add_middleware(UploadSizeLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -24,11 +28,25 @@ app.add_middleware(
     allow_headers=["*"], # 또는 필요한 헤더 목록
 )
 
-# 라우터 등록
-app.include_router(personal_router)
-app.include_router(user_router)
-app.include_router(crawling_router)
-app.include_router(gemini_router)
+# 라우터 등록 (settings.enabled_routers에 포함된 그룹만 import)
+register_routers(app)
+
+@app.on_event("startup")
+def preload_face_model():
+    """
+    얼굴 파싱 모델을 앱 시작 시 한 번 로드하고 워밍업합니다.
+    personal 그룹이 활성화된 경우에만, 백그라운드 스레드에서 로드하므로 기동을 막지 않습니다.
+    (로드가 끝나기 전에는 /personal/ready가 503을 반환)
+    """
+    if settings.face_model_preload and is_enabled("personal"):
+        from service.facecolor_service import start_face_inference
+        threading.Thread(target=start_face_inference, name="face-model-preload", daemon=True).start()
+    mark_ready()
+
+@app.get("/startup")
+async def read_startup_report():
+    """기동 시간 보고서 (활성 라우터 그룹, 그룹별 import 시간, 기동 완료까지 걸린 시간)"""
+    return startup_report()
 
 @app.get("/")
 async def read_index():
@@ -64,3 +64,11 @@ class UserFavoriteItem(Base):
    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
    product_id = Column(Integer, ForeignKey("items.product_id", ondelete="CASCADE"), primary_key=True)
 
+
+class PersonalColorVerdict(Base):
+   __tablename__ = "personal_color_verdict_cache"
+
+   cache_key = Column(String(64), primary_key=True)  # 양자화한 색상 키의 SHA-256
+   color_key = Column(String(255), nullable=False)   # 양자화한 색상 키 (디버깅용)
+   verdict = Column(String(50), nullable=False)
+   created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
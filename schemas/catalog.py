@@ -0,0 +1,190 @@
+# 무신사 상품 카탈로그 (카테고리 / 색상 / 스타일 코드)
+# 응답 스키마(ItemInfo)의 허용 값, 코디 추천 프롬프트의 코드 표(service/catalog.py), 크롤링 URL 생성에 쓰는 코드를
+# 모두 이 모듈의 표에서 만듭니다. 코드를 추가하거나 바꿀 때는 이 파일만 수정하면 함께 반영됩니다.
+#
+# (순수 데이터 모듈입니다. 스키마와 크롤링 워커 서브프로세스도 import 하므로 서비스 모듈을 import 하지 않습니다.)
+
+from typing import Dict, List, Literal
+
+# 대분류 카테고리 (프롬프트에 나오는 순서)
+#   code: 대분류 코드(category_id), min_price: 검색 최소 가격, has_style: URL에 스타일 파라미터 사용 여부
+#   items: 세부 카테고리 이름 -> 코드(item_code)
+CATEGORIES: List[Dict] = [
+    {
+        "code": "001", "name": "상의", "min_price": 990, "has_style": True,
+        "items": {
+            "맨투맨/스웨트": "001005",
+            "후드 티셔츠": "001004",
+            "셔츠/블라우스": "001002",
+            "긴소매 티셔츠": "001010",
+            "반소매 티셔츠": "001001",
+            "피케/카라 티셔츠": "001003",
+            "니트/스웨터": "001006",
+            "민소매 티셔츠": "001011",
+            "기타 상의": "001008",
+        },
+    },
+    {
+        "code": "003", "name": "하의", "min_price": 3500, "has_style": True,
+        "items": {
+            "데님 팬츠": "003002",
+            "트레이닝/조거팬츠": "003004",
+            "코튼 팬츠": "003007",
+            "슈트 팬츠/슬랙스": "003008",
+            "숏 팬츠": "003009",
+            "레깅스": "003005",
+            "점프 슈트/오버올": "003010",
+            "기타 하의": "003006",
+        },
+    },
+    {
+        "code": "002", "name": "아우터", "min_price": 4900, "has_style": True,
+        "items": {
+            "후드 집업": "002022",
+            "블루종/MA-1": "002001",
+            "레더/라이더스 재킷": "002002",
+            "카디건": "002020",
+            "트러거 재킷": "002017",
+            "슈트/블레이저 재킷": "002003",
+            "스타디움 재킷": "002004",
+            "나일론/코치 재킷": "002006",
+            "아노락 재킷": "002019",
+            "트레이닝 재킷": "002018",
+            "환절기 코트": "002008",
+            "사파리/헌팅 재킷": "002014",
+            "베스트": "002021",
+            "숏패딩": "002012",
+            "무스탕/퍼": "002025",
+            "플리스/뽀글이": "002023",
+            "겨울 싱글 코트": "002007",
+            "겨울 더블 코트": "002024",
+            "겨울 기타 코트": "002009",
+            "롱패딩/헤비 아우터": "002013",
+            "패딩 베스트": "002016",
+            "기타 아우터": "002015",
+        },
+    },
+    {
+        "code": "100", "name": "원피스/스커트", "min_price": 4900, "has_style": True,
+        "items": {
+            "미니원피스": "100001",
+            "미디원피스": "100002",
+            "맥시원피스": "100003",
+            "미니스커트": "100004",
+            "미디스커트": "100005",
+            "롱스커트": "100006",
+        },
+    },
+    {
+        "code": "103", "name": "신발", "min_price": 4500, "has_style": False,  # 신발 (스타일 정보 없음)
+        "items": {
+            "스니커즈": "103004",
+            "패딩/퍼 신발": "103007",
+            "부츠/워커": "103002",
+            "구두": "103001",
+            "샌들/슬리퍼": "103003",
+            "스포츠화": "103005",
+        },
+    },
+]
+
+# 색상 매핑 (한국어 -> 영문 코드, 영문 코드는 무신사 검색 파라미터 값 그대로)
+color_map: Dict[str, str] = {
+   '화이트': 'WHITE',
+   '실버': 'SILVER',
+   '라이트 그레이': 'LIGHTGREY',
+   '그레이': 'GRAY',
+   '다크 그레이': 'DARKGREY',
+   '블랙': 'BLACK',
+   '레드': 'RED',
+   '딥레드': 'DEEPRED',
+   '버건디': 'BURGUNDY',
+   '브릭': 'BRICK',
+   '페일 핑크': 'PALEPINK',
+   '라이트 핑크': 'LIGHTPINK',
+   '핑크': 'PINK',
+   '다크 핑크': 'DARKPINK',
+   '피치': 'PEACH',
+   '로즈골드': 'ROSEGOLD',
+   '라이트 오렌지': 'LIGHTORANGE',
+   '오렌지': 'ORANGE',
+   '다크': 'DARKORANGE',
+   '아이보리': 'IVORY',
+   '오트밀': 'OATMENT',
+   '라이트 옐로우': 'LIGHTYELLOW',
+   '옐로우': 'YELLOW',
+   '머스타드': 'MUSTARD',
+   '골드': 'GOLD',
+   '라임': 'LIME',
+   '라이트 그린': 'LIGHTGREEN',
+   '그린': 'GREEN',
+   '올리브 그린': 'OLIVEGREEN',
+   '카키': 'KHAKI',
+   '다크 그린': 'DARKGREEN',
+   '민트': 'MENT',
+   '스카이 블루': 'SKYBLUE',
+   '블루': 'BLUE',
+   '다크 블루': 'DARKBLUE',
+   '네이비': 'NAVY',
+   '다크 네이비': 'DARKNAVY',
+   '라벤더': 'LAVENDER',
+   '퍼플': 'PURPLE',
+   '라이트 브라운': 'LIGHTBROWN',
+   '브라운': 'BROWN',
+   '다크 브라운': 'DAKTBROWN',
+   '카멜': 'CAMEL',
+   '샌드': 'SAND',
+   '베이지': 'BEIGE',
+   '다크 베이지': 'DARKBEIGE',
+   '카키 베이지': 'KHAKIBEIGE',
+   '데님': 'DENIM',
+   '연청': 'LIGHTBLUEDENIM',
+   '중청': 'MEDIUMBLUEDENIM',
+   '진청': 'DARKBLUEDENIM',
+   '흑청': 'BLACKDENIM'
+}
+
+# 스타일 매핑 (한국어 -> 숫자 코드)
+style_map: Dict[str, int] = {
+   '캐주얼': 1,
+   '스트릿': 2,
+   '고프코어': 3,
+   '워크웨어': 4,
+   '프레피': 5,
+   '시티보이': 6,
+   '스포티': 7,
+   '로맨틱': 8,
+   '걸리시': 9,
+   '클래식': 10,
+   '미니멀': 11,
+   '시크': 12,
+   '레트로': 13,
+   '에스닉': 14,
+   '리조트': 15
+}
+
+# 사용자 성별 매핑 (무신사 gf 파라미터)
+gender_codes: Dict[str, str] = {"남": "M", "여": "F", "기타" : "A"}
+
+# 크롤러에서 쓰는 형태로 펼친 표
+# 대분류 카테고리 코드 -> 이름
+category_codes: Dict[str, str] = {category["code"]: category["name"] for category in CATEGORIES}
+# 카테고리별 아이템 설정 (최소 가격 및 스타일 정보 포함 여부)
+item_configs: Dict[str, Dict] = {
+    category["code"]: {"min_price": category["min_price"], "has_style": category["has_style"]}
+    for category in CATEGORIES
+}
+
+# 응답 스키마에서 허용하는 값
+CATEGORY_IDS = tuple(category_codes)
+ITEM_CODES = tuple(code for category in CATEGORIES for code in category["items"].values())
+COLOR_CODES = tuple(color_map.values())
+
+CategoryId = Literal[CATEGORY_IDS]
+ItemCode = Literal[ITEM_CODES]
+ColorCode = Literal[COLOR_CODES]
+
+
+def category_of(item_code: str) -> str:
+    """세부 카테고리 코드의 대분류 코드 (앞 3자리)"""
+    return item_code[:3]
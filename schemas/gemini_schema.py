@@ -1,11 +1,20 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Dict, List, Optional, Any, Union
+from schemas.catalog import CategoryId, ItemCode, ColorCode, category_of
 
 class ItemInfo(BaseModel):
+    # 코드 값은 service/catalog.py의 카탈로그에 있는 값만 허용 (잘못된 코드는 응답 파싱 단계에서 거부되어 재요청됨)
     category: Optional[str] = None
-    item_code: Optional[str] = None
-    category_id: Optional[str] = None
-    color: Optional[str] = None
+    item_code: Optional[ItemCode] = None
+    category_id: Optional[CategoryId] = None
+    color: Optional[ColorCode] = None
+
+    @model_validator(mode="after")
+    def check_category_matches_item_code(self):
+        """세부 카테고리 코드는 대분류 코드로 시작해야 합니다. (예: 001005 -> 001)"""
+        if self.item_code and self.category_id and category_of(self.item_code) != self.category_id:
+            raise ValueError(f"item_code {self.item_code}는 category_id {self.category_id}에 속하지 않습니다.")
+        return self
 
 class LookInfo(BaseModel):
     look_name: str
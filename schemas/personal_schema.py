@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class ColorAnalysisDetail(BaseModel):
     hsv: List[int]
@@ -33,3 +33,14 @@ class PersonalColorAnalysis(BaseModel):
 class PersonalColorResponse(BaseModel):
     personal_color_analysis: str
 
+class PersonalColorFullResponse(BaseModel):
+    hex_codes: Dict[str, List[str]]
+    personal_color_analysis: str
+    face_image: str  # 배경을 제거한 얼굴 PNG (data:image/png;base64,...)
+
+
+class FaceBatchJobRequest(BaseModel):
+    inputs: List[str]               # 서버의 이미지 파일 또는 디렉터리 경로
+    output: str                     # 결과 JSONL 파일 이름 (settings.face_batch_job_dir 기준 상대 경로)
+    workers: Optional[int] = None
+    resume: bool = True             # 출력 파일에 이미 성공으로 기록된 이미지는 건너뜀
@@ -0,0 +1,26 @@
+# 코디 추천 프롬프트의 카탈로그 코드 표
+# 카테고리/색상 코드 자체는 schemas/catalog.py에 있으며, 여기서는 프롬프트에 넣을 표만 만듭니다.
+
+from schemas.catalog import CATEGORIES, color_map
+
+
+def catalog_prompt_block() -> str:
+    """
+    코디 추천 프롬프트에 넣을 카테고리/색상 코드 표
+    한 대분류를 한 줄로 압축하여 기존 한 줄에 한 코드씩 나열하던 표보다 입력 토큰을 줄입니다.
+    """
+    lines = [
+        "### 카테고리 코드 ###",
+        "반드시 카테고리는 아래 목록에서만 골라야 합니다. category_id에는 대분류 코드, item_code에는 세부 카테고리 코드를 씁니다.",
+        "형식: 대분류(category_id): 세부 카테고리=item_code, ...",
+    ]
+    for category in CATEGORIES:
+        items = ", ".join(f"{name}={code}" for name, code in category["items"].items())
+        lines.append(f"{category['name']}({category['code']}): {items}")
+    lines += [
+        "",
+        "### 색상 코드 ###",
+        "반드시 색상도 마찬가지로 아래 목록에 있는 항목들만 사용해야 하며, color에는 영문 코드만 씁니다.",
+        ", ".join(f"{name}={code}" for name, code in color_map.items()),
+    ]
+    return "\n".join(lines)
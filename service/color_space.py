@@ -0,0 +1,49 @@
+# 색 공간 변환 유틸리티
+# HEX/RGB <-> CIELAB 변환과 색차(ΔE) 계산
+
+import numpy as np
+from typing import List, Union
+
+# sRGB(D65) -> XYZ 변환 행렬
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.00000, 1.08883])
+
+
+def hex_to_rgb(hex_code: str) -> np.ndarray:
+    """'#rrggbb' 형식의 HEX 코드를 [R, G, B] (0~255) 배열로 변환합니다."""
+    hex_code = hex_code.lstrip("#")
+    return np.array([int(hex_code[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float64)
+
+
+def rgb_to_hex(rgb: Union[np.ndarray, List[int]]) -> str:
+    """RGB를 HEX 코드로 변환"""
+    return f"#{int(rgb[0]):02x}{int(rgb[1]):02x}{int(rgb[2]):02x}"
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    sRGB (0~255) 배열을 CIELAB(D65)으로 변환합니다.
+    마지막 축의 크기가 3인 임의 모양의 배열을 받습니다.
+    """
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ _RGB_TO_XYZ.T / _D65_WHITE
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def hex_to_lab(hex_code: str) -> np.ndarray:
+    """HEX 코드를 CIELAB으로 변환합니다."""
+    return rgb_to_lab(hex_to_rgb(hex_code))
+
+
+def delta_e76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIE76 색차 (Lab 공간의 유클리드 거리)"""
+    return np.linalg.norm(np.asarray(lab1) - np.asarray(lab2), axis=-1)
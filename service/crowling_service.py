@@ -12,10 +12,11 @@ import os
 import time
 import logging
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Tuple, AsyncIterator
 import multiprocessing
 from schemas.item_schema import item_info_request, item_info_response, item_info_snapshot, look_info
 from schemas.crowling_schema import CrawlingTask
+from schemas.gemini_schema import LookInfo
 from crud.user_crud import get_styling_summary_by_id
 from sqlalchemy.orm import Session
 
@@ -50,103 +51,8 @@ chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x
 chrome_options.add_argument('--log-level=3')  # 오류만 표시 (로그 노이즈 감소)
 chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])  # Chrome 로그 비활성화
 
-# 사용자 성별 매핑
-male = {"남": "M", "여": "F", "기타" : "A"}
-
-# 카테고리 정보
-# 대분류 카테고리 코드 (무신사 카테고리 체계)
-category_codes = {
-    "001": "상의", 
-    "002": "아우터", 
-    "003": "하의", 
-    "100": "원피스/스커트", 
-    "103": "신발"
-}
-
-
-# 카테고리별 아이템 설정 (최소 가격 및 스타일 정보 포함 여부)
-item_configs = {
-    "100" :     {"min_price": 4900, "has_style": True},  # 원피스/스커트
-    "001" :     {"min_price": 990, "has_style": True},    # 상의
-    "002" :     {"min_price": 4900, "has_style": True},   # 아우터
-    "003" :     {"min_price": 3500, "has_style": True},   # 하의
-    "103" :     {"min_price": 4500, "has_style": False},  # 신발 (스타일 정보 없음)
-}
-
-# 색상 매핑 (한국어 -> 영문 코드)
-color_map = {
-   '화이트': 'WHITE',
-   '실버': 'SILVER',
-   '라이트 그레이': 'LIGHTGREY',
-   '그레이': 'GRAY',
-   '다크 그레이': 'DARKGREY',
-   '블랙': 'BLACK',
-   '레드': 'RED',
-   '딥레드': 'DEEPRED',
-   '버건디': 'BURGUNDY',
-   '브릭': 'BRICK',
-   '페일 핑크': 'PALEPINK',
-   '라이트 핑크': 'LIGHTPINK',
-   '핑크': 'PINK',
-   '다크 핑크': 'DARKPINK',
-   '피치': 'PEACH',
-   '로즈골드': 'ROSEGOLD',
-   '라이트 오렌지': 'LIGHTORANGE',
-   '오렌지': 'ORANGE',
-   '다크': 'DARKORANGE',
-   '아이보리': 'IVORY',
-   '오트밀': 'OATMENT',
-   '라이트 옐로우': 'LIGHTYELLOW',
-   '옐로우': 'YELLOW',
-   '머스타드': 'MUSTARD',
-   '골드': 'GOLD',
-   '라임': 'LIME',
-   '라이트 그린': 'LIGHTGREEN',
-   '그린': 'GREEN',
-   '올리브 그린': 'OLIVEGREEN',
-   '카키': 'KHAKI',
-   '다크 그린': 'DARKGREEN',
-   '민트': 'MENT',
-   '스카이 블루': 'SKYBLUE',
-   '블루': 'BLUE',
-   '다크 블루': 'DARKBLUE',
-   '네이비': 'NAVY',
-   '다크 네이비': 'DARKNAVY',
-   '라벤더': 'LAVENDER',
-   '퍼플': 'PURPLE',
-   '라이트 브라운': 'LIGHTBROWN',
-   '브라운': 'BROWN',
-   '다크 브라운': 'DAKTBROWN',
-   '카멜': 'CAMEL',
-   '샌드': 'SAND',
-   '베이지': 'BEIGE',
-   '다크 베이지': 'DARKBEIGE',
-   '카키 베이지': 'KHAKIBEIGE',
-   '데님': 'DENIM',
-   '연청': 'LIGHTBLUEDENIM',
-   '중청': 'MEDIUMBLUEDENIM',
-   '진청': 'DARKBLUEDENIM',
-   '흑청': 'BLACKDENIM'
-}
-
-# 스타일 매핑 (한국어 -> 숫자 코드)
-style_map = {
-   '캐주얼': 1,
-   '스트릿': 2,
-   '고프코어': 3,
-   '워크웨어': 4,
-   '프레피': 5,
-   '시티보이': 6,
-   '스포티': 7,
-   '로맨틱': 8,
-   '걸리시': 9,
-   '클래식': 10,
-   '미니멀': 11,
-   '시크': 12,
-   '레트로': 13,
-   '에스닉': 14,
-   '리조트': 15
-}
+# 성별/카테고리/색상/스타일 코드 (service/catalog.py에서 프롬프트, 응답 스키마와 함께 관리)
+from schemas.catalog import category_codes, item_configs, color_map, style_map, gender_codes as male
 
 # 무신사 기본 URL
 musinsa_base = "https://www.musinsa.com"
@@ -292,65 +198,63 @@ def crowling_item_snap(product_id):
     return item_info_snapshot(snap_img_url=scraped_images[:3])
 
 
-async def process_and_group_crawling_tasks(
+def build_styling_summary_dict(styling_summary) -> Dict:
+    """SQLAlchemy 스타일 요약 모델을 크롤링 워커에 넘길 딕셔너리로 변환합니다."""
+    return {
+        'budget': styling_summary.budget,
+        'occasion': styling_summary.occasion,
+        'height': styling_summary.height,
+        'gender': styling_summary.gender,
+        'top_size': styling_summary.top_size,
+        'bottom_size': styling_summary.bottom_size,
+        'shoe_size': styling_summary.shoe_size,
+        'body_feature': styling_summary.body_feature,
+        'preferred_styles': styling_summary.preferred_styles,
+        'user_situation': styling_summary.user_situation
+    }
+
+
+def _crawling_pool_size() -> int:
+    """크롤링 풀 프로세스 수 (사용 가능한 모든 CPU 코어 사용)"""
+    num_processes = multiprocessing.cpu_count()
+    if num_processes < 1:
+        num_processes = 1
+    return num_processes
+
+
+def submit_crawling_task(pool, task: CrawlingTask, user_style_json: str, filter: int,
+                         loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+    """
+    크롤링 작업 하나를 풀에 제출하고, 결과 딕셔너리로 완료되는 asyncio Future를 반환합니다.
+    (풀의 결과 콜백 스레드에서 이벤트 루프로 결과를 넘기므로 대기 중에 스레드를 점유하지 않음)
+    """
+    future = loop.create_future()
+
+    def _resolve(result):
+        if not future.done():  # 요청이 취소된 경우 무시
+            future.set_result(result)
+
+    item_data_json = json.dumps(task.model_dump())
+    pool.apply_async(
+        _run_crowling_worker_process,
+        (item_data_json, user_style_json, filter),
+        callback=lambda result: loop.call_soon_threadsafe(_resolve, result),
+        error_callback=lambda error: loop.call_soon_threadsafe(_resolve, {"error": str(error)}),
+    )
+    return future
+
+
+def group_crawling_results(
     tasks_as_objects: List[CrawlingTask],
-    user_id: int,
-    db: Session,
-    look_descriptions: Dict[str, str],
-    filter: int
+    results: List[Dict],
+    look_descriptions: Dict[str, str]
 ) -> List[look_info]:
     """
-    크롤링 태스크를 처리하고 결과를 look_name별로 그룹화하여 반환합니다.
-    
-    Args:
-        tasks_as_objects (List[CrawlingTask]): 크롤링할 작업 리스트
-        styling_summary (user_style_summary): 사용자 스타일 정보
-        look_descriptions (Dict[str, str]): 룩별 설명 정보
-        filter (int): 필터링 값
-        
-    Returns:
-        List[look_info]: 그룹화된 룩 정보 리스트
+    크롤링 결과를 작업 순서대로 look_name별로 그룹화합니다.
+    상품을 찾지 못한 항목은 "상품을 찾을 수 없습니다" 자리 표시 상품으로 채웁니다.
     """
     look_groups = {}
-    
-    styling_summary = get_styling_summary_by_id(db, user_id)
-    # 멀티프로세싱 풀을 위한 인수 준비
-    pool_args = []
-    for task in tasks_as_objects:
-        item_data_json = json.dumps(task.model_dump())
-        # SQLAlchemy 모델을 딕셔너리로 변환
-        styling_summary_dict = {
-            'budget': styling_summary.budget,
-            'occasion': styling_summary.occasion,
-            'height': styling_summary.height,
-            'gender': styling_summary.gender,
-            'top_size': styling_summary.top_size,
-            'bottom_size': styling_summary.bottom_size,
-            'shoe_size': styling_summary.shoe_size,
-            'body_feature': styling_summary.body_feature,
-            'preferred_styles': styling_summary.preferred_styles,
-            'user_situation': styling_summary.user_situation
-        }
-        user_style_json = json.dumps(styling_summary_dict)
-        pool_args.append((item_data_json, user_style_json, filter))
-
-    
-    # 멀티프로세싱.Pool을 사용하여 작업을 병렬로 실행
-    #num_processes = 1
-    num_processes = multiprocessing.cpu_count()  # 사용 가능한 모든 CPU 코어 사용
-    if num_processes < 1:
-        num_processes = 1
-    
-    logger.info(f"Starting parallel crawling with {num_processes} processes...")
-    
-    # Windows 호환성을 위해 freeze_support() 호출
-    multiprocessing.freeze_support()
 
-    with multiprocessing.Pool(processes=num_processes) as pool:
-        # pool.starmap은 _run_crowling_worker_process가 여러 인수를 받기 때문에 사용
-        results = pool.starmap(_run_crowling_worker_process, pool_args)
-
-    # 풀에서 결과 처리
     for i, result_data in enumerate(results):
         task = tasks_as_objects[i]  # 원본 작업 객체 가져오기
         
@@ -397,4 +301,99 @@ async def process_and_group_crawling_tasks(
         ))
     
     logger.info(f"Final result: {len(look_info_list)} look_info objects")
-    return look_info_list
\ No newline at end of file
+    return look_info_list
+
+
+async def process_and_group_crawling_tasks(
+    tasks_as_objects: List[CrawlingTask],
+    user_id: int,
+    db: Session,
+    look_descriptions: Dict[str, str],
+    filter: int
+) -> List[look_info]:
+    """
+    크롤링 태스크를 처리하고 결과를 look_name별로 그룹화하여 반환합니다.
+    
+    Args:
+        tasks_as_objects (List[CrawlingTask]): 크롤링할 작업 리스트
+        styling_summary (user_style_summary): 사용자 스타일 정보
+        look_descriptions (Dict[str, str]): 룩별 설명 정보
+        filter (int): 필터링 값
+        
+    Returns:
+        List[look_info]: 그룹화된 룩 정보 리스트
+    """
+    styling_summary = get_styling_summary_by_id(db, user_id)
+    user_style_json = json.dumps(build_styling_summary_dict(styling_summary))
+    # 멀티프로세싱 풀을 위한 인수 준비
+    pool_args = []
+    for task in tasks_as_objects:
+        item_data_json = json.dumps(task.model_dump())
+        pool_args.append((item_data_json, user_style_json, filter))
+
+    
+    # 멀티프로세싱.Pool을 사용하여 작업을 병렬로 실행
+    num_processes = _crawling_pool_size()
+    
+    logger.info(f"Starting parallel crawling with {num_processes} processes...")
+    
+    # Windows 호환성을 위해 freeze_support() 호출
+    multiprocessing.freeze_support()
+
+    with multiprocessing.Pool(processes=num_processes) as pool:
+        # pool.starmap은 _run_crowling_worker_process가 여러 인수를 받기 때문에 사용
+        results = pool.starmap(_run_crowling_worker_process, pool_args)
+
+    return group_crawling_results(tasks_as_objects, results, look_descriptions)
+
+
+async def stream_and_group_crawling_tasks(
+    look_task_stream: AsyncIterator[Tuple[LookInfo, List[CrawlingTask]]],
+    user_id: int,
+    db: Session,
+    filter: int
+) -> List[look_info]:
+    """
+    완성된 룩이 도착하는 대로 해당 룩의 크롤링 작업을 풀에 제출하고,
+    스트림이 끝나면 모든 결과를 모아 look_name별로 그룹화하여 반환합니다.
+    (Gemini 응답 생성 시간과 크롤링 시간이 겹치도록 함)
+    
+    Args:
+        look_task_stream: (완성된 룩, 해당 룩의 크롤링 작업 리스트)를 내보내는 비동기 이터레이터
+        user_id (int): 사용자 ID
+        db (Session): 데이터베이스 세션
+        filter (int): 필터링 값
+        
+    Returns:
+        List[look_info]: 그룹화된 룩 정보 리스트
+    """
+    # 스타일 요약이 없으면 스트림 쪽(create_analyze_structured)에서 404가 먼저 발생하므로 첫 룩 도착 시 조회
+    user_style_json = None
+
+    tasks_as_objects: List[CrawlingTask] = []
+    pending = []
+    look_descriptions: Dict[str, str] = {}
+
+    num_processes = _crawling_pool_size()
+    logger.info(f"Starting streamed crawling with {num_processes} processes...")
+    multiprocessing.freeze_support()
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes=num_processes) as pool:
+        async for look, look_tasks in look_task_stream:
+            if user_style_json is None:
+                styling_summary = get_styling_summary_by_id(db, user_id)
+                user_style_json = json.dumps(build_styling_summary_dict(styling_summary))
+            look_descriptions[look.look_name] = look.look_description
+            for task in look_tasks:
+                tasks_as_objects.append(task)
+                pending.append(submit_crawling_task(pool, task, user_style_json, filter, loop))
+            logger.info(f"Look '{look.look_name}' submitted ({len(look_tasks)} tasks) "
+                        f"at {time.perf_counter() - started:.1f}s")
+
+        # 남은 크롤링이 끝날 때까지 대기 (취소되면 with 블록을 빠져나가며 풀이 종료됨)
+        results = await asyncio.gather(*pending)
+    logger.info(f"Streamed crawling finished: {len(pending)} tasks in {time.perf_counter() - started:.1f}s")
+
+    return group_crawling_results(tasks_as_objects, results, look_descriptions)
@@ -44,102 +44,8 @@ chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x
 chrome_options.add_argument('--log-level=3')  # 오류만 표시 (로그 노이즈 감소)
 chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])  # Chrome 로그 비활성화
 
-# 사용자 성별 매핑
-male = {"남": "M", "여": "F", "기타" : "A"}
-
-# 카테고리 정보
-# 대분류 카테고리 코드 (무신사 카테고리 체계)
-category_codes = {
-    "001": "상의",
-    "002": "아우터",
-    "003": "하의",
-    "100": "원피스/스커트",
-    "103": "신발"
-}
-
-# 카테고리별 아이템 설정 (최소 가격 및 스타일 정보 포함 여부)
-item_configs = {
-    "100" :     {"min_price": 4900, "has_style": True},  # 원피스/스커트
-    "001" :     {"min_price": 990, "has_style": True},    # 상의
-    "002" :     {"min_price": 4900, "has_style": True},   # 아우터
-    "003" :     {"min_price": 3500, "has_style": True},   # 하의
-    "103" :     {"min_price": 4500, "has_style": False},  # 신발 (스타일 정보 없음)
-}
-
-# 색상 매핑 (한국어 -> 영문 코드)
-color_map = {
-   '화이트': 'WHITE',
-   '실버': 'SILVER',
-   '라이트 그레이': 'LIGHTGREY',
-   '그레이': 'GRAY',
-   '다크 그레이': 'DARKGREY',
-   '블랙': 'BLACK',
-   '레드': 'RED',
-   '딥레드': 'DEEPRED',
-   '버건디': 'BURGUNDY',
-   '브릭': 'BRICK',
-   '페일 핑크': 'PALEPINK',
-   '라이트 핑크': 'LIGHTPINK',
-   '핑크': 'PINK',
-   '다크 핑크': 'DARKPINK',
-   '피치': 'PEACH',
-   '로즈골드': 'ROSEGOLD',
-   '라이트 오렌지': 'LIGHTORANGE',
-   '오렌지': 'ORANGE',
-   '다크': 'DARKORANGE',
-   '아이보리': 'IVORY',
-   '오트밀': 'OATMENT',
-   '라이트 옐로우': 'LIGHTYELLOW',
-   '옐로우': 'YELLOW',
-   '머스타드': 'MUSTARD',
-   '골드': 'GOLD',
-   '라임': 'LIME',
-   '라이트 그린': 'LIGHTGREEN',
-   '그린': 'GREEN',
-   '올리브 그린': 'OLIVEGREEN',
-   '카키': 'KHAKI',
-   '다크 그린': 'DARKGREEN',
-   '민트': 'MENT',
-   '스카이 블루': 'SKYBLUE',
-   '블루': 'BLUE',
-   '다크 블루': 'DARKBLUE',
-   '네이비': 'NAVY',
-   '다크 네이비': 'DARKNAVY',
-   '라벤더': 'LAVENDER',
-   '퍼플': 'PURPLE',
-   '라이트 브라운': 'LIGHTBROWN',
-   '브라운': 'BROWN',
-   '다크 브라운': 'DAKTBROWN',
-   '카멜': 'CAMEL',
-   '샌드': 'SAND',
-   '베이지': 'BEIGE',
-   '다크 베이지': 'DARKBEIGE',
-   '카키 베이지': 'KHAKIBEIGE',
-   '데님': 'DENIM',
-   '연청': 'LIGHTBLUEDENIM',
-   '중청': 'MEDIUMBLUEDENIM',
-   '진청': 'DARKBLUEDENIM',
-   '흑청': 'BLACKDENIM'
-}
-
-# 스타일 매핑 (한국어 -> 숫자 코드)
-style_map = {
-   '캐주얼': 1,
-   '스트릿': 2,
-   '고프코어': 3,
-   '워크웨어': 4,
-   '프레피': 5,
-   '시티보이': 6,
-   '스포티': 7,
-   '로맨틱': 8,
-   '걸리시': 9,
-   '클래식': 10,
-   '미니멀': 11,
-   '시크': 12,
-   '레트로': 13,
-   '에스닉': 14,
-   '리조트': 15
-}
+# 성별/카테고리/색상/스타일 코드 (service/catalog.py에서 프롬프트, 응답 스키마와 함께 관리)
+from schemas.catalog import category_codes, item_configs, color_map, style_map, gender_codes as male
 
 # 무신사 기본 URL
 musinsa_base = "https://www.musinsa.com"
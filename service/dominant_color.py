@@ -0,0 +1,185 @@
+# 지배색(dominant color) 추출 엔진
+# 부위별 픽셀에서 대표 색상을 픽셀 수 순으로 추출합니다. 전략은 settings.face_color_strategy로 선택합니다.
+#
+#   kmeans      : 기존 방식 (전체 픽셀, KMeans n_init=10)
+#   kmeans_fast : 결정적 서브샘플 + 시드 고정 단일 초기화 KMeans
+#   minibatch   : 결정적 서브샘플 + MiniBatchKMeans
+#   histogram   : 양자화 3D 색 히스토그램의 피크 선택 (클러스터링 없음)
+#
+# 벤치마크: python -m service.dominant_color service/test.jpg
+
+import os
+import sys
+import time
+import json
+import argparse
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.config import settings
+from service.color_space import rgb_to_lab, delta_e76
+
+STRATEGIES = ("kmeans", "kmeans_fast", "minibatch", "histogram")
+
+
+def _subsample(pixels: np.ndarray, sample_size: int) -> np.ndarray:
+    """일정 간격으로 픽셀을 골라 결정적인 서브샘플을 만듭니다. (같은 입력이면 항상 같은 결과)"""
+    if sample_size <= 0 or len(pixels) <= sample_size:
+        return pixels
+    step = int(np.ceil(len(pixels) / sample_size))
+    return pixels[::step]
+
+
+def _sorted_centers(labels: np.ndarray, centers: np.ndarray) -> List[np.ndarray]:
+    """클러스터 크기(픽셀 수) 내림차순으로 정렬한 중심 색상 리스트를 반환합니다."""
+    counts = np.bincount(labels, minlength=len(centers))
+    order = np.argsort(-counts, kind="stable")
+    return [centers[i].astype(int) for i in order if counts[i] > 0]
+
+
+def _kmeans(pixels: np.ndarray, n_colors: int) -> List[np.ndarray]:
+    """기존 방식: 전체 픽셀에 KMeans(n_init=10)"""
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
+    kmeans.fit(pixels)
+    return _sorted_centers(kmeans.labels_, kmeans.cluster_centers_)
+
+
+def _kmeans_fast(pixels: np.ndarray, n_colors: int, sample_size: int) -> List[np.ndarray]:
+    """서브샘플에 시드 고정 단일 초기화 KMeans"""
+    from sklearn.cluster import KMeans
+
+    sample = _subsample(pixels, sample_size)
+    n_colors = min(n_colors, len(sample))
+    kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=1)
+    kmeans.fit(sample)
+    return _sorted_centers(kmeans.labels_, kmeans.cluster_centers_)
+
+
+def _minibatch(pixels: np.ndarray, n_colors: int, sample_size: int) -> List[np.ndarray]:
+    """서브샘플에 MiniBatchKMeans"""
+    from sklearn.cluster import MiniBatchKMeans
+
+    sample = _subsample(pixels, sample_size)
+    n_colors = min(n_colors, len(sample))
+    kmeans = MiniBatchKMeans(n_clusters=n_colors, random_state=42, n_init=3, batch_size=2048)
+    kmeans.fit(sample)
+    return _sorted_centers(kmeans.predict(sample), kmeans.cluster_centers_)
+
+
+def _histogram(pixels: np.ndarray, n_colors: int, bins_per_channel: int = 16) -> List[np.ndarray]:
+    """
+    채널당 bins_per_channel 단계로 양자화한 3D 히스토그램에서 픽셀 수가 많은 빈을 고릅니다.
+    이미 고른 빈과 인접한(각 축 1칸 이내) 빈은 같은 색으로 보고 건너뜁니다.
+    대표 색은 해당 빈에 속한 픽셀들의 평균입니다.
+    """
+    shift = 8 - int(np.log2(bins_per_channel))
+    quantized = (pixels.astype(np.uint16) >> shift)
+    flat = (quantized[:, 0] * bins_per_channel + quantized[:, 1]) * bins_per_channel + quantized[:, 2]
+
+    total_bins = bins_per_channel ** 3
+    counts = np.bincount(flat, minlength=total_bins)
+    sums = np.stack([np.bincount(flat, weights=pixels[:, c], minlength=total_bins) for c in range(3)], axis=1)
+
+    occupied = np.nonzero(counts)[0]
+    occupied = occupied[np.argsort(-counts[occupied], kind="stable")]
+
+    chosen_coords = []
+    chosen_bins = []
+    for bin_index in occupied:
+        coord = np.array(np.unravel_index(bin_index, (bins_per_channel,) * 3))
+        if any(np.max(np.abs(coord - other)) <= 1 for other in chosen_coords):
+            continue
+        chosen_coords.append(coord)
+        chosen_bins.append(bin_index)
+        if len(chosen_bins) == n_colors:
+            break
+
+    # 떨어진 피크가 부족하면(색이 한 덩어리인 경우) 인접 빈이라도 픽셀 수 순으로 채움
+    for bin_index in occupied:
+        if len(chosen_bins) >= n_colors:
+            break
+        if bin_index not in chosen_bins:
+            chosen_bins.append(bin_index)
+
+    return [(sums[bin_index] / counts[bin_index]).astype(int) for bin_index in chosen_bins]
+
+
+def extract_dominant_colors(pixels: np.ndarray,
+                            n_colors: int = 3,
+                            strategy: Optional[str] = None,
+                            sample_size: Optional[int] = None) -> Optional[List[np.ndarray]]:
+    """
+    주어진 픽셀 (N, 3)에서 지배적인 색상을 추출하고 픽셀 수 기준 내림차순으로 정렬하여 반환합니다.
+    픽셀이 없으면 None을 반환합니다.
+    """
+    if len(pixels) == 0:
+        return None
+
+    n_colors = min(n_colors, len(pixels))
+    strategy = strategy or settings.face_color_strategy
+    sample_size = settings.face_color_sample_size if sample_size is None else sample_size
+
+    if strategy == "kmeans":
+        return _kmeans(pixels, n_colors)
+    if strategy == "kmeans_fast":
+        return _kmeans_fast(pixels, n_colors, sample_size)
+    if strategy == "minibatch":
+        return _minibatch(pixels, n_colors, sample_size)
+    if strategy == "histogram":
+        return _histogram(pixels, n_colors)
+    raise ValueError(f"지원하지 않는 색상 추출 전략입니다: {strategy} (사용 가능: {', '.join(STRATEGIES)})")
+
+
+def benchmark_strategies(image_path: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    실제 얼굴 이미지의 부위별 픽셀로 각 전략의 속도와 기존 방식(kmeans) 대비 색차(ΔE76)를 비교합니다.
+    상위 2개 색상(응답에 쓰이는 색)끼리 순서대로 비교합니다.
+    """
+    from PIL import Image
+    from service.facecolor_service import FaceColorExtractor
+
+    extractor = FaceColorExtractor()
+    original_image, label_index = extractor.parse_face_from_memory(Image.open(image_path))
+
+    part_pixels = {}
+    for part_name, label_ids in extractor.target_parts.items():
+        pixels = label_index.pixels(original_image, label_ids)
+        if len(pixels):
+            part_pixels[part_name] = pixels
+
+    report: Dict[str, Any] = {"image": image_path, "pixels": {k: len(v) for k, v in part_pixels.items()}, "strategies": {}}
+    reference = {name: extract_dominant_colors(pixels, 3, "kmeans")[:2] for name, pixels in part_pixels.items()}
+
+    for strategy in STRATEGIES:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = {name: extract_dominant_colors(pixels, 3, strategy)[:2] for name, pixels in part_pixels.items()}
+            timings.append(time.perf_counter() - started)
+
+        delta_e = {}
+        for name, colors in results.items():
+            pairs = list(zip(reference[name], colors))
+            delta_e[name] = [round(float(delta_e76(rgb_to_lab(ref), rgb_to_lab(col))), 2) for ref, col in pairs]
+
+        all_delta = [value for values in delta_e.values() for value in values]
+        report["strategies"][strategy] = {
+            "best_seconds": round(min(timings), 4),
+            "mean_delta_e": round(float(np.mean(all_delta)), 2) if all_delta else None,
+            "max_delta_e": round(float(np.max(all_delta)), 2) if all_delta else None,
+            "delta_e": delta_e,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지배색 추출 전략 벤치마크 (속도 / 기존 KMeans 대비 ΔE)")
+    parser.add_argument("image", nargs="?", default=os.path.join(os.path.dirname(__file__), "test.jpg"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(benchmark_strategies(args.image, args.repeat), ensure_ascii=False, indent=2))
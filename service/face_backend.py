@@ -0,0 +1,186 @@
+# 얼굴 파싱 모델 추론 백엔드
+# torch(기본), onnx(ONNX Runtime fp32), onnx-int8(동적 int8 양자화) 중 하나를 설정으로 선택합니다.
+#
+# 사용 예:
+#   python -m service.face_backend export --backend onnx-int8
+#   python -m service.face_backend parity service/test.jpg --backend onnx-int8
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Any, Optional
+
+import numpy as np
+import torch
+from transformers import SegformerForSemanticSegmentation
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.config import settings
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class TorchSegformerBackend:
+    name = "torch"
+
+    def __init__(self, model: SegformerForSemanticSegmentation):
+        """PyTorch fp32 Segformer 백엔드"""
+        self.model = model
+        self.model.eval()
+
+    def __call__(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """전처리된 입력 텐서 (N, 3, H, W)에 대한 logits (N, C, h, w)를 반환합니다."""
+        with torch.no_grad():
+            return self.model(pixel_values=pixel_values).logits
+
+
+class OnnxSegformerBackend:
+    def __init__(self, onnx_path: str, name: str = "onnx", num_threads: int = 0):
+        """ONNX Runtime CPU 백엔드 (onnxruntime은 이 백엔드를 선택한 경우에만 필요)"""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("face_backend=onnx 를 사용하려면 onnxruntime 패키지를 설치해야 합니다.")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.name = name
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """전처리된 입력 텐서에 대한 logits를 torch 텐서로 반환합니다. (후처리는 기존 프로세서를 그대로 사용)"""
+        logits = self.session.run(["logits"], {"pixel_values": pixel_values.numpy().astype(np.float32)})[0]
+        return torch.from_numpy(logits)
+
+
+def _onnx_path(model_name: str, quantized: bool) -> str:
+    """모델 이름으로부터 ONNX 파일 경로를 만듭니다."""
+    safe_name = model_name.replace("/", "__")
+    suffix = ".int8.onnx" if quantized else ".onnx"
+    return os.path.join(settings.face_onnx_dir, safe_name + suffix)
+
+
+def export_onnx(model: SegformerForSemanticSegmentation, onnx_path: str, opset: int = 17) -> str:
+    """Segformer 모델을 배치 크기가 가변인 ONNX 파일로 내보냅니다."""
+    os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+    model.eval()
+    dummy = torch.zeros(1, 3, 512, 512, dtype=torch.float32)
+    torch.onnx.export(
+        model,
+        (dummy,),
+        onnx_path,
+        input_names=["pixel_values"],
+        output_names=["logits"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+    print(f"ONNX 모델을 '{onnx_path}'에 저장했습니다.")
+    return onnx_path
+
+
+def quantize_onnx(src_path: str, dst_path: str) -> str:
+    """fp32 ONNX 모델에 동적 int8 양자화(가중치 int8)를 적용합니다."""
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        raise RuntimeError("int8 양자화를 사용하려면 onnxruntime 패키지를 설치해야 합니다.")
+
+    quantize_dynamic(src_path, dst_path, weight_type=QuantType.QInt8)
+    print(f"int8 양자화 모델을 '{dst_path}'에 저장했습니다.")
+    return dst_path
+
+
+def ensure_onnx_model(model_name: str, quantized: bool) -> str:
+    """필요한 ONNX 파일이 없으면 torch 모델에서 내보내고(양자화 포함) 경로를 반환합니다."""
+    fp32_path = _onnx_path(model_name, quantized=False)
+    if not os.path.exists(fp32_path):
+        model = SegformerForSemanticSegmentation.from_pretrained(model_name)
+        export_onnx(model, fp32_path)
+        del model
+
+    if not quantized:
+        return fp32_path
+
+    int8_path = _onnx_path(model_name, quantized=True)
+    if not os.path.exists(int8_path):
+        quantize_onnx(fp32_path, int8_path)
+    return int8_path
+
+
+def create_face_backend(kind: str, model_name: str):
+    """설정 값에 맞는 추론 백엔드를 생성합니다."""
+    if kind not in SUPPORTED_BACKENDS:
+        raise ValueError(f"지원하지 않는 얼굴 파싱 백엔드입니다: {kind} (사용 가능: {', '.join(SUPPORTED_BACKENDS)})")
+
+    if kind == "torch":
+        return TorchSegformerBackend(SegformerForSemanticSegmentation.from_pretrained(model_name))
+
+    onnx_path = ensure_onnx_model(model_name, quantized=(kind == "onnx-int8"))
+    return OnnxSegformerBackend(onnx_path, name=kind, num_threads=settings.torch_num_threads)
+
+
+def check_backend_parity(image_path: str, backend: str, reference: str = "torch") -> Dict[str, Any]:
+    """
+    같은 이미지에 대해 두 백엔드의 세그멘테이션 마스크(라벨별 IoU)와 추출 HEX 코드를 비교합니다.
+
+    Returns:
+        Dict[str, Any]: 라벨별 IoU, 평균 IoU, 픽셀 일치율, 부위별 HEX 코드와 일치 여부
+    """
+    from PIL import Image
+    from service.facecolor_service import FaceColorExtractor
+
+    image = Image.open(image_path).convert("RGB")
+    reference_extractor = FaceColorExtractor(backend=reference)
+    candidate_extractor = FaceColorExtractor(backend=backend)
+
+    reference_mask = reference_extractor.segment_batch([image])[0]
+    candidate_mask = candidate_extractor.segment_batch([image])[0]
+
+    per_label_iou = {}
+    for label_id, label_name in reference_extractor.label_map.items():
+        ref = reference_mask == label_id
+        cand = candidate_mask == label_id
+        union = np.logical_or(ref, cand).sum()
+        if union == 0:
+            continue
+        per_label_iou[label_name] = round(float(np.logical_and(ref, cand).sum() / union), 4)
+
+    reference_hex = reference_extractor.extract_face_colors(image)[0]
+    candidate_hex = candidate_extractor.extract_face_colors(image)[0]
+
+    return {
+        "reference": reference,
+        "backend": backend,
+        "pixel_agreement": round(float((reference_mask == candidate_mask).mean()), 4),
+        "mean_iou": round(float(np.mean(list(per_label_iou.values()))), 4) if per_label_iou else None,
+        "per_label_iou": per_label_iou,
+        "reference_hex": reference_hex,
+        "backend_hex": candidate_hex,
+        "hex_match": reference_hex == candidate_hex,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 파싱 백엔드 내보내기 / 정합성 검사")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="ONNX (및 int8) 모델 파일 생성")
+    export_parser.add_argument("--backend", choices=["onnx", "onnx-int8"], default="onnx-int8")
+    export_parser.add_argument("--model", default=settings.face_model_name)
+
+    parity_parser = subparsers.add_parser("parity", help="torch 결과와 마스크/HEX 코드 비교")
+    parity_parser.add_argument("image")
+    parity_parser.add_argument("--backend", choices=list(SUPPORTED_BACKENDS), default="onnx-int8")
+    parity_parser.add_argument("--reference", choices=list(SUPPORTED_BACKENDS), default="torch")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        print(ensure_onnx_model(args.model, quantized=(args.backend == "onnx-int8")))
+    else:
+        print(json.dumps(check_backend_parity(args.image, args.backend, args.reference), ensure_ascii=False, indent=2))
@@ -0,0 +1,278 @@
+# 얼굴 색상 일괄 추출 작업 (오프라인 재처리용)
+# 디렉터리 또는 이미지 경로 목록을 받아 디코딩 -> 배치 세그멘테이션 -> 색상 추출 -> JSONL 기록 순으로 처리합니다.
+#
+#   - 디코딩/색상 추출은 워커 스레드 풀에서, 세그멘테이션은 공유 배칭 스케줄러에서 여러 이미지를 묶어 수행
+#   - 결과는 한 줄에 한 이미지씩 JSONL로 기록 ({"path", "status", "hex_codes" | "error", "seconds"})
+#   - 출력 파일에 이미 "ok"로 기록된 경로는 건너뛰므로, 중단된 작업을 같은 명령으로 이어서 실행할 수 있음
+#   - 모델/임계값 변경 후 재처리가 목적이므로 결과 캐시는 사용하지 않음
+#
+# 사용 예:
+#   python -m service.face_batch_job photos/ --output results.jsonl --workers 4
+#   python -m service.face_batch_job --list paths.txt --output results.jsonl
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, List, Dict, Any, Optional, Set
+
+from fastapi import HTTPException
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.config import settings
+from service.image_ingest import decode_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def collect_image_paths(inputs: Iterable[str]) -> List[str]:
+    """디렉터리(하위 폴더 포함)와 개별 파일 경로를 정렬된 이미지 경로 목록으로 펼칩니다."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            paths.append(item)
+    return sorted(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def read_path_list(list_file: str) -> List[str]:
+    """한 줄에 경로 하나씩 적힌 목록 파일을 읽습니다. (빈 줄, # 주석 무시)"""
+    with open(list_file, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def load_completed_paths(output_path: str) -> Set[str]:
+    """기존 출력 파일에서 성공적으로 처리된 경로를 읽습니다. (체크포인트)"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단 시점에 잘린 마지막 줄
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["path"])
+    return completed
+
+
+class FaceBatchJob:
+    def __init__(self,
+                 paths: List[str],
+                 output_path: str,
+                 workers: Optional[int] = None,
+                 resume: bool = True,
+                 progress_every: float = 10.0):
+        """
+        일괄 추출 작업 초기화
+
+        Args:
+            paths: 처리할 이미지 경로 목록 (collect_image_paths 결과)
+            output_path: 결과 JSONL 파일 경로 (이어서 쓰기)
+            workers: 디코딩/색상 추출 워커 스레드 수 (기본값 settings.face_batch_job_workers)
+            resume: 출력 파일에 이미 성공으로 기록된 경로는 건너뜀
+            progress_every: 진행 상황 출력 간격(초)
+        """
+        self.paths = paths
+        self.output_path = output_path
+        self.workers = max(1, workers or settings.face_batch_job_workers)
+        self.resume = resume
+        self.progress_every = progress_every
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._status: Dict[str, Any] = {
+            "state": "pending",
+            "output": output_path,
+            "total": len(paths),
+            "skipped": 0,
+            "processed": 0,
+            "ok": 0,
+            "failed": 0,
+            "started_at": None,
+            "elapsed_seconds": 0.0,
+            "images_per_second": 0.0,
+            "error": None,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """진행 상황을 반환합니다."""
+        with self._lock:
+            status = dict(self._status)
+        if status["state"] == "running":
+            status["elapsed_seconds"] = round(time.time() - status["started_at"], 1)
+        return status
+
+    def cancel(self):
+        """새 이미지 제출을 멈춥니다. (진행 중인 이미지는 기록 후 종료)"""
+        self._cancel.set()
+
+    def _process_one(self, extractor, path: str) -> Dict[str, Any]:
+        """이미지 한 장: 디코딩 -> (배칭) 세그멘테이션 -> 색상 추출"""
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                image = decode_image(f.read(), max_side=settings.face_max_side)
+            hex_codes, _, _ = extractor.extract_face_colors(image)
+            record = {"path": path, "status": "ok", "hex_codes": hex_codes}
+        except HTTPException as e:
+            # 얼굴 없음/여러 명 등 검증 실패
+            record = {"path": path, "status": "error", "error": e.detail}
+        except Exception as e:
+            record = {"path": path, "status": "error", "error": str(e)}
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    def _report_progress(self):
+        status = self.status()
+        remaining = status["total"] - status["skipped"] - status["processed"]
+        print(f"[일괄 추출] {status['processed']}건 처리 (성공 {status['ok']}, 실패 {status['failed']}, "
+              f"건너뜀 {status['skipped']}, 남음 {remaining}) - {status['images_per_second']}장/초")
+
+    def run(self) -> Dict[str, Any]:
+        """작업을 실행하고 최종 상태를 반환합니다. (호출한 스레드에서 끝날 때까지 블로킹)"""
+        from service.facecolor_service import get_face_color_extractor
+
+        with self._lock:
+            self._status["state"] = "running"
+            self._status["started_at"] = time.time()
+
+        try:
+            completed = load_completed_paths(self.output_path) if self.resume else set()
+            pending = [path for path in self.paths if path not in completed]
+            with self._lock:
+                self._status["skipped"] = len(self.paths) - len(pending)
+
+            # 세그멘테이션은 배칭 스케줄러가 워커들의 요청을 묶어서 처리
+            extractor = get_face_color_extractor()
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+
+            started = time.perf_counter()
+            last_report = started
+            max_in_flight = self.workers * 2
+            with open(self.output_path, "a", encoding="utf-8") as output, \
+                    ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="face-batch-job") as pool:
+                queue = iter(pending)
+                in_flight = set()
+                while True:
+                    # 메모리에 올라가는 이미지 수를 제한하기 위해 일정 개수만 미리 제출
+                    while len(in_flight) < max_in_flight and not self._cancel.is_set():
+                        path = next(queue, None)
+                        if path is None:
+                            break
+                        in_flight.add(pool.submit(self._process_one, extractor, path))
+                    if not in_flight:
+                        break
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = future.result()
+                        # 출력 단계: 한 스레드에서만 기록하고 매번 flush (중단되어도 체크포인트 유지)
+                        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        output.flush()
+                        with self._lock:
+                            self._status["processed"] += 1
+                            self._status["ok" if record["status"] == "ok" else "failed"] += 1
+                            elapsed = time.perf_counter() - started
+                            self._status["images_per_second"] = round(self._status["processed"] / elapsed, 2) if elapsed else 0.0
+
+                    if time.perf_counter() - last_report >= self.progress_every:
+                        last_report = time.perf_counter()
+                        self._report_progress()
+
+            with self._lock:
+                self._status["state"] = "cancelled" if self._cancel.is_set() else "finished"
+        except Exception as e:
+            with self._lock:
+                self._status["state"] = "failed"
+                self._status["error"] = str(e)
+            print(f"[일괄 추출] 작업 실패: {e}")
+        finally:
+            with self._lock:
+                self._status["elapsed_seconds"] = round(time.time() - self._status["started_at"], 1)
+
+        self._report_progress()
+        return self.status()
+
+
+# 관리자 엔드포인트용 작업 레지스트리 (한 번에 하나의 작업만 실행)
+_current_job: Optional[FaceBatchJob] = None
+_job_lock = threading.Lock()
+
+
+def resolve_job_output(output: str) -> str:
+    """
+    관리자 엔드포인트의 결과 파일 경로를 settings.face_batch_job_dir 안의 경로로 바꿉니다.
+    절대 경로나 작업 디렉터리 밖을 가리키는 경로(../ 등)는 400
+    """
+    job_dir = os.path.realpath(settings.face_batch_job_dir)
+    if not output or os.path.isabs(output):
+        raise HTTPException(status_code=400, detail="결과 파일은 작업 디렉터리 기준 상대 경로로 지정해야 합니다.")
+    output_path = os.path.realpath(os.path.join(job_dir, output))
+    if os.path.commonpath([job_dir, output_path]) != job_dir or output_path == job_dir:
+        raise HTTPException(status_code=400, detail="결과 파일은 작업 디렉터리 안에만 만들 수 있습니다.")
+    return output_path
+
+
+def _job_running() -> bool:
+    return _current_job is not None and _current_job.status()["state"] in ("pending", "running")
+
+
+def start_background_job(inputs: List[str], output: str, workers: Optional[int] = None, resume: bool = True) -> FaceBatchJob:
+    """
+    백그라운드 스레드에서 일괄 추출 작업을 시작합니다. 이미 실행 중인 작업이 있으면 409
+    디렉터리 탐색(os.walk)은 시간이 걸릴 수 있으므로 잠금 밖에서 수행합니다. (호출한 스레드에서 블로킹)
+    """
+    global _current_job
+    output_path = resolve_job_output(output)
+    with _job_lock:
+        if _job_running():
+            raise HTTPException(status_code=409, detail="이미 실행 중인 일괄 추출 작업이 있습니다.")
+
+    paths = collect_image_paths(inputs)
+    if not paths:
+        raise HTTPException(status_code=400, detail="처리할 이미지를 찾을 수 없습니다.")
+
+    with _job_lock:
+        # 탐색하는 동안 다른 요청이 작업을 시작했을 수 있으므로 다시 확인
+        if _job_running():
+            raise HTTPException(status_code=409, detail="이미 실행 중인 일괄 추출 작업이 있습니다.")
+        job = FaceBatchJob(paths, output_path, workers=workers, resume=resume)
+        threading.Thread(target=job.run, name="face-batch-job-runner", daemon=True).start()
+        _current_job = job
+        return job
+
+
+def get_current_job() -> Optional[FaceBatchJob]:
+    """가장 최근에 시작한 일괄 추출 작업"""
+    return _current_job
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 색상 일괄 추출 (JSONL 출력, 중단 후 이어서 실행 가능)")
+    parser.add_argument("inputs", nargs="*", help="이미지 파일 또는 디렉터리")
+    parser.add_argument("--list", dest="list_file", help="이미지 경로 목록 파일 (한 줄에 하나)")
+    parser.add_argument("--output", required=True, help="결과 JSONL 파일 경로")
+    parser.add_argument("--workers", type=int, default=settings.face_batch_job_workers)
+    parser.add_argument("--no-resume", action="store_true", help="기존 출력 파일의 성공 기록을 무시하고 모두 다시 처리")
+    parser.add_argument("--progress-every", type=float, default=10.0, help="진행 상황 출력 간격(초)")
+    args = parser.parse_args()
+
+    inputs = list(args.inputs)
+    if args.list_file:
+        inputs.extend(read_path_list(args.list_file))
+    if not inputs:
+        parser.error("이미지 파일/디렉터리 또는 --list 를 지정해야 합니다.")
+
+    job = FaceBatchJob(collect_image_paths(inputs), args.output, workers=args.workers,
+                       resume=not args.no_resume, progress_every=args.progress_every)
+    print(json.dumps(job.run(), ensure_ascii=False, indent=2))
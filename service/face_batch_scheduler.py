@@ -0,0 +1,91 @@
+# 얼굴 파싱 마이크로 배칭 스케줄러
+# 동시에 들어온 이미지들을 짧은 시간 동안 모아 한 번의 Segformer forward pass로 처리합니다.
+
+import threading
+import queue
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Dict, Any
+
+import numpy as np
+from PIL import Image
+
+
+class SegmentationBatchScheduler:
+    def __init__(self,
+                 segment_batch: Callable[[List[Image.Image]], List[np.ndarray]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 5.0):
+        """
+        요청 병합(coalescing) 스케줄러 초기화
+
+        Args:
+            segment_batch: 이미지 리스트를 받아 이미지별 라벨 마스크 리스트를 반환하는 함수
+            max_batch_size: 한 번의 forward pass에 묶을 최대 이미지 수
+            max_wait_ms: 첫 요청 도착 후 다른 요청을 기다리는 최대 시간(ms)
+        """
+        self._segment_batch = segment_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats = {"batches": 0, "images": 0, "max_batch": 0}
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="segformer-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, image: Image.Image) -> Future:
+        """이미지를 대기열에 넣고, 해당 이미지의 마스크를 받을 Future를 반환합니다."""
+        future: Future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def segment(self, image: Image.Image) -> np.ndarray:
+        """이미지를 배치에 합류시키고 결과 마스크가 나올 때까지 기다립니다."""
+        return self.submit(image).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 처리 통계를 반환합니다."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["images"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _collect_batch(self) -> list:
+        """첫 요청을 기다린 뒤, max_wait 동안 또는 max_batch_size가 찰 때까지 요청을 모읍니다."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """배치 워커 루프"""
+        while True:
+            batch = self._collect_batch()
+            # 대기 중 취소된 요청은 제외
+            batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            images = [image for image, _ in batch]
+            try:
+                masks = self._segment_batch(images)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), mask in zip(batch, masks):
+                future.set_result(mask)
+
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["images"] += len(batch)
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
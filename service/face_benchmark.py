@@ -0,0 +1,311 @@
+# 얼굴 색상 추출 파이프라인 벤치마크
+# service/test.jpg(및 여러 해상도로 바꾼 버전)와 합성 얼굴 이미지로 단계별 처리 시간을 측정하고 JSON으로 출력합니다.
+#
+#   단계: decode, resize, preprocess, forward, postprocess, validation, colors.<부위>, visualization, cutout_decode, cutout_png
+#   지표: 단계별 p50/p95/평균(ms), 이미지/초(decode~colors 기준), 최대 RSS(MB)
+#
+# 백엔드 x 스레드 수 조합마다 별도 프로세스에서 측정하므로 최대 RSS와 스레드 설정이 서로 섞이지 않습니다.
+#
+# 사용 예:
+#   python -m service.face_benchmark --backends torch onnx-int8 --threads 1 4 --output bench.json
+#   python -m service.face_benchmark --compare bench_before.json bench.json
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import subprocess
+from typing import Dict, List, Any, Tuple, Optional
+
+import numpy as np
+from PIL import Image
+
+# 프로젝트 루트를 Python 경로에 추가
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from core.config import settings
+from service.image_ingest import decode_image
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test.jpg")
+DEFAULT_SIDES = (512, 1024, 2048, 4000)
+CORE_STAGES = ("decode", "resize", "preprocess", "forward", "postprocess", "validation", "colors")
+
+
+def _encode_jpeg(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def synthetic_face(long_side: int, seed: int = 0) -> Image.Image:
+    """
+    단색 배경 위에 머리카락, 얼굴, 눈, 눈썹, 코, 입술을 도형으로 그린 합성 얼굴 이미지 (세로 4:3)
+    모델이 얼굴로 인식하지 못하면 검증 단계에서 실패로 기록됩니다.
+    """
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    height, width = long_side, long_side * 3 // 4
+    canvas = np.full((height, width, 3), rng.integers(150, 230, size=3), dtype=np.uint8)
+    cx, cy = width // 2, height // 2
+    face_w, face_h = width // 4, height // 4
+
+    skin = tuple(int(v) for v in rng.integers([190, 140, 110], [240, 190, 160]))
+    hair = tuple(int(v) for v in rng.integers(20, 90, size=3))
+    cv2.ellipse(canvas, (cx, cy - face_h // 5), (int(face_w * 1.15), int(face_h * 1.15)), 0, 180, 360, hair, -1)
+    cv2.ellipse(canvas, (cx, cy), (face_w, face_h), 0, 0, 360, skin, -1)
+    for side in (-1, 1):
+        eye = (cx + side * face_w // 2, cy - face_h // 5)
+        cv2.ellipse(canvas, eye, (face_w // 6, face_h // 12), 0, 0, 360, (245, 245, 245), -1)
+        cv2.circle(canvas, eye, face_h // 14, (60, 40, 30), -1)
+        cv2.line(canvas, (eye[0] - face_w // 6, eye[1] - face_h // 6), (eye[0] + face_w // 6, eye[1] - face_h // 6),
+                 hair, max(2, face_h // 25))
+    cv2.ellipse(canvas, (cx, cy + face_h // 8), (face_w // 10, face_h // 6), 0, 0, 360,
+                tuple(max(0, v - 25) for v in skin), -1)
+    cv2.ellipse(canvas, (cx, cy + face_h // 2), (face_w // 3, face_h // 10), 0, 0, 360, (190, 70, 80), -1)
+    return Image.fromarray(canvas)
+
+
+def build_inputs(image_path: str, sides: Tuple[int, ...], synthetic: int) -> List[Tuple[str, bytes]]:
+    """(이름, JPEG 바이트) 목록: 원본 테스트 이미지, 긴 변을 바꾼 버전, 합성 얼굴"""
+    inputs = []
+    with open(image_path, "rb") as f:
+        inputs.append(("test", f.read()))
+
+    base = Image.open(image_path).convert("RGB")
+    for side in sides:
+        scale = side / max(base.size)
+        resized = base.resize((max(1, round(base.width * scale)), max(1, round(base.height * scale))), Image.BICUBIC)
+        inputs.append((f"test_{side}", _encode_jpeg(resized)))
+        for seed in range(synthetic):
+            inputs.append((f"synthetic_{side}_{seed}", _encode_jpeg(synthetic_face(side, seed))))
+    return inputs
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "n": len(samples),
+    }
+
+
+def _peak_rss_mb() -> float:
+    """현재 프로세스의 최대 RSS(MB) (Linux는 KB, macOS는 바이트 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_stages(extractor, contents: bytes, with_visualization: bool) -> Dict[str, float]:
+    """
+    이미지 한 장에 대해 서비스와 같은 순서로 단계를 실행하며 단계별 소요 시간(초)을 반환합니다.
+    검증에 실패하면 그 단계까지의 시간과 함께 "validation_error" 키를 남깁니다.
+    """
+    from fastapi import HTTPException
+    from transformers.modeling_outputs import SemanticSegmenterOutput
+    from service.face_visualization import render_face_analysis_png
+
+    timings: Dict[str, float] = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = time.perf_counter() - started
+        return result
+
+    # 색상 분석 경로와 같이 작업 해상도 근처로 축소 디코딩
+    image = timed("decode", decode_image, contents, max_side=settings.face_max_side)
+    image = timed("resize", extractor.cap_resolution, image)
+
+    inputs = timed("preprocess", extractor.processor, images=[image], return_tensors="pt")
+    logits = timed("forward", extractor.backend, inputs["pixel_values"])
+    mask = timed("postprocess", lambda: extractor.processor.post_process_semantic_segmentation(
+        SemanticSegmenterOutput(logits=logits), target_sizes=[image.size[::-1]])[0].numpy())
+
+    image_array = np.asarray(image)
+    try:
+        label_index = timed("validation", extractor.index_face_region, mask, image_array.shape)
+    except HTTPException as e:
+        timings["validation_error"] = e.detail
+        return timings
+
+    top, left = label_index.offset
+    face_array = np.ascontiguousarray(image_array[top:top + label_index.shape[0], left:left + label_index.shape[1]])
+    hex_codes = {}
+    colors_total = 0.0
+    for part_name in extractor.target_parts:
+        hex_codes[part_name] = timed(f"colors.{part_name}", extractor.extract_part_colors, part_name, face_array, label_index)
+        colors_total += timings[f"colors.{part_name}"]
+    timings["colors"] = colors_total
+
+    if with_visualization:
+        timed("visualization", render_face_analysis_png, face_array, label_index, hex_codes, extractor.target_parts)
+    # 잘라내기 경로는 원본 해상도로 디코딩한 전체 프레임을 넘기고, 좌표 변환은 build_face_cutout에 맡김
+    full_image = timed("cutout_decode", decode_image, contents, max_side=None)
+    timed("cutout_png", extractor.build_face_cutout, np.asarray(full_image), label_index)
+    return timings
+
+
+def benchmark_config(backend: str, threads: int, inputs: List[Tuple[str, bytes]],
+                     repeat: int, warmup: int, with_visualization: bool) -> Dict[str, Any]:
+    """현재 프로세스에서 백엔드 하나, 스레드 수 하나로 모든 입력을 측정합니다."""
+    import torch
+    from service.facecolor_service import FaceColorExtractor
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+        settings.torch_num_threads = threads  # onnxruntime 세션 스레드 수
+
+    load_started = time.perf_counter()
+    extractor = FaceColorExtractor(backend=backend)
+    load_seconds = time.perf_counter() - load_started
+
+    per_image: Dict[str, Any] = {}
+    all_samples: Dict[str, List[float]] = {}
+    core_total = 0.0
+    core_images = 0
+    for name, contents in inputs:
+        for _ in range(warmup):
+            run_stages(extractor, contents, with_visualization=False)
+
+        samples: Dict[str, List[float]] = {}
+        error = None
+        for _ in range(repeat):
+            timings = run_stages(extractor, contents, with_visualization)
+            error = timings.pop("validation_error", None)
+            for stage, seconds in timings.items():
+                samples.setdefault(stage, []).append(seconds)
+                all_samples.setdefault(stage, []).append(seconds)
+            if error is None:
+                core_total += sum(timings[stage] for stage in CORE_STAGES)
+                core_images += 1
+
+        per_image[name] = {
+            "input_bytes": len(contents),
+            "validation_error": error,
+            "stages": {stage: _summarize(values) for stage, values in samples.items()},
+        }
+
+    return {
+        "backend": backend,
+        "threads": threads if threads > 0 else torch.get_num_threads(),
+        "model_load_seconds": round(load_seconds, 3),
+        "images_per_second": round(core_images / core_total, 2) if core_total else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": {stage: _summarize(values) for stage, values in all_samples.items()},
+        "images": per_image,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """백엔드 x 스레드 수 조합마다 하위 프로세스를 띄워 측정하고 결과를 모읍니다."""
+    report: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "face_max_side": settings.face_max_side,
+            "face_color_strategy": settings.face_color_strategy,
+            "face_validation_side": settings.face_validation_side,
+        },
+        "repeat": args.repeat,
+        "configs": [],
+    }
+    for backend in args.backends:
+        for threads in args.threads:
+            command = [sys.executable, "-m", "service.face_benchmark", "--single",
+                       "--backends", backend, "--threads", str(threads),
+                       "--image", args.image, "--sides", *map(str, args.sides),
+                       "--synthetic", str(args.synthetic), "--repeat", str(args.repeat), "--warmup", str(args.warmup)]
+            if args.no_visualization:
+                command.append("--no-visualization")
+            print(f"측정 중: backend={backend}, threads={threads}", file=sys.stderr)
+            completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                report["configs"].append({"backend": backend, "threads": threads, "error": completed.stderr.strip()[-2000:]})
+                continue
+            report["configs"].append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return report
+
+
+def compare_reports(before_path: str, after_path: str) -> Dict[str, Any]:
+    """두 벤치마크 결과의 같은 (backend, threads) 조합끼리 단계별 p50과 처리량을 비교합니다."""
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+
+    before_configs = {(c["backend"], c["threads"]): c for c in before["configs"] if "error" not in c}
+    comparison = {"before": before.get("commit"), "after": after.get("commit"), "configs": []}
+    for config in after["configs"]:
+        previous = before_configs.get((config.get("backend"), config.get("threads")))
+        if previous is None or "error" in config:
+            continue
+        stages = {}
+        for stage, summary in config["stages"].items():
+            if stage in previous["stages"] and previous["stages"][stage]["p50_ms"] > 0:
+                stages[stage] = {
+                    "before_p50_ms": previous["stages"][stage]["p50_ms"],
+                    "after_p50_ms": summary["p50_ms"],
+                    "ratio": round(summary["p50_ms"] / previous["stages"][stage]["p50_ms"], 3),
+                }
+        comparison["configs"].append({
+            "backend": config["backend"],
+            "threads": config["threads"],
+            "images_per_second": [previous.get("images_per_second"), config.get("images_per_second")],
+            "peak_rss_mb": [previous.get("peak_rss_mb"), config.get("peak_rss_mb")],
+            "stages": stages,
+        })
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="얼굴 색상 추출 파이프라인 단계별 벤치마크 (JSON 출력)")
+    parser.add_argument("--backends", nargs="+", default=[settings.face_backend])
+    parser.add_argument("--threads", nargs="+", type=int, default=[0], help="torch/onnxruntime 스레드 수 (0이면 기본값)")
+    parser.add_argument("--image", default=TEST_IMAGE)
+    parser.add_argument("--sides", nargs="*", type=int, default=list(DEFAULT_SIDES), help="테스트 이미지/합성 얼굴의 긴 변(px)")
+    parser.add_argument("--synthetic", type=int, default=1, help="해상도마다 만들 합성 얼굴 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-visualization", action="store_true", help="matplotlib 시각화 단계 생략")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="두 결과 JSON 비교")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare_reports(*args.compare), ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    if args.single:
+        # 하위 프로세스: 결과를 마지막 한 줄 JSON으로 출력 (모델 로드 등 다른 출력은 그 앞에)
+        bench_inputs = build_inputs(args.image, tuple(args.sides), args.synthetic)
+        result = benchmark_config(args.backends[0], args.threads[0], bench_inputs,
+                                  args.repeat, args.warmup, not args.no_visualization)
+        print(json.dumps(result, ensure_ascii=False))
+        sys.exit(0)
+
+    output = json.dumps(run_benchmark(args), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"벤치마크 결과를 '{args.output}'에 저장했습니다.", file=sys.stderr)
+    else:
+        print(output)
@@ -0,0 +1,199 @@
+# 얼굴 색상 추출 결과 캐시
+# 업로드 바이트의 해시(선택적으로 디코딩 이미지의 perceptual hash)를 키로
+# 부위별 HEX 코드와 압축한 세그멘테이션 마스크를 저장합니다. 적중 시 Segformer와 색상 추출을 건너뜁니다.
+#
+# 메모리 LRU(크기/TTL 제한) -> 선택적 디스크 저장소(TTL/용량 제한) 순으로 조회합니다.
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+from PIL import Image
+
+from core.config import settings
+from service.ttl_cache import TTLCache
+
+
+class CachedFaceResult:
+    def __init__(self, hex_codes: Dict[str, List[str]], mask_shape: tuple, mask_bytes: bytes):
+        """캐시 항목: 부위별 HEX 코드와 zlib 압축한 uint8 세그멘테이션 마스크 (작업 해상도)"""
+        self.hex_codes = hex_codes
+        self.mask_shape = tuple(mask_shape)
+        self.mask_bytes = mask_bytes
+
+    @classmethod
+    def from_mask(cls, hex_codes: Dict[str, List[str]], mask: np.ndarray) -> "CachedFaceResult":
+        mask = np.ascontiguousarray(mask, dtype=np.uint8)
+        return cls(hex_codes, mask.shape, zlib.compress(mask.tobytes(), level=6))
+
+    def mask(self) -> np.ndarray:
+        """압축을 풀어 마스크 (H, W)를 반환합니다."""
+        return np.frombuffer(zlib.decompress(self.mask_bytes), dtype=np.uint8).reshape(self.mask_shape)
+
+
+def content_key(contents: bytes) -> str:
+    """업로드 바이트의 SHA-256 해시"""
+    return hashlib.sha256(contents).hexdigest()
+
+
+def perceptual_hash(image: Image.Image) -> str:
+    """
+    difference hash(dHash, 64비트): 9x8 흑백 축소 이미지에서 가로로 인접한 픽셀의 밝기 대소를 비트로 만듭니다.
+    재인코딩/리사이즈된 같은 사진은 대부분 같은 값이 나옵니다.
+    """
+    small = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
+
+class FaceResultCache:
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_seconds: float = 3600,
+                 disk_dir: Optional[str] = None,
+                 disk_max_mb: int = 512):
+        """
+        결과 캐시 초기화
+
+        Args:
+            max_entries: 메모리 LRU 최대 항목 수
+            ttl_seconds: 항목 만료 시간(초)
+            disk_dir: 디스크 저장 경로 (None이면 메모리만 사용)
+            disk_max_mb: 디스크 저장소 최대 용량(MB), 초과 시 오래된 파일부터 삭제
+        """
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.phash_index = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_mb * 1024 * 1024
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def _load_from_disk(self, key: str) -> Optional[CachedFaceResult]:
+        """디스크에서 항목을 읽습니다. 만료되었거나 손상된 파일은 삭제합니다."""
+        path = self._disk_path(key)
+        try:
+            if self.ttl_seconds > 0 and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with np.load(path) as data:
+                return CachedFaceResult(
+                    json.loads(str(data["hex_codes"])),
+                    tuple(data["mask_shape"]),
+                    data["mask_bytes"].tobytes(),
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"캐시 파일 읽기 실패, 삭제합니다: {path} ({e})")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _save_to_disk(self, key: str, entry: CachedFaceResult):
+        """디스크에 항목을 저장하고 용량 제한을 적용합니다."""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                hex_codes=np.array(json.dumps(entry.hex_codes)),
+                mask_shape=np.array(entry.mask_shape),
+                mask_bytes=np.frombuffer(entry.mask_bytes, dtype=np.uint8),
+            )
+        os.replace(tmp_path, path)
+        self._enforce_disk_limit()
+
+    def _enforce_disk_limit(self):
+        """디스크 저장소가 최대 용량을 넘으면 수정 시간이 오래된 파일부터 삭제합니다."""
+        with self._disk_lock:
+            files = []
+            for name in os.listdir(self.disk_dir):
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def get(self, key: str) -> Optional[CachedFaceResult]:
+        """콘텐츠 해시로 조회합니다. (메모리 -> 디스크)"""
+        entry = self.memory.get(key)
+        if entry is not None or not self.disk_dir:
+            return entry
+
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            self.disk_hits += 1
+            self.memory.set(key, entry)
+        return entry
+
+    def get_by_phash(self, phash: str) -> Optional[CachedFaceResult]:
+        """perceptual hash로 조회합니다. (바이트는 다르지만 같은 사진인 경우)"""
+        key = self.phash_index.get(phash)
+        return self.get(key) if key else None
+
+    def put(self, key: str, hex_codes: Dict[str, List[str]], mask: np.ndarray, phash: Optional[str] = None):
+        """결과를 저장합니다."""
+        entry = CachedFaceResult.from_mask(hex_codes, mask)
+        self.memory.set(key, entry)
+        if phash:
+            self.phash_index.set(phash, key)
+        if self.disk_dir:
+            try:
+                self._save_to_disk(key, entry)
+            except OSError as e:
+                print(f"캐시 파일 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_dir"] = self.disk_dir
+        stats["phash_entries"] = self.phash_index.stats()["entries"]
+        return stats
+
+
+_cache: Optional[FaceResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_face_result_cache() -> Optional[FaceResultCache]:
+    """설정에 따라 프로세스 전역 결과 캐시를 반환합니다. 비활성화되어 있으면 None"""
+    global _cache
+    if not settings.face_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FaceResultCache(
+                    max_entries=settings.face_cache_max_entries,
+                    ttl_seconds=settings.face_cache_ttl_seconds,
+                    disk_dir=settings.face_cache_dir,
+                    disk_max_mb=settings.face_cache_disk_max_mb,
+                )
+    return _cache
@@ -0,0 +1,139 @@
+# 얼굴 색상 분석 결과 시각화 (디버그용)
+# matplotlib은 시각화가 실제로 필요할 때만 import하며, 그림은 전용 백그라운드 워커 한 개에서만 그립니다.
+# (pyplot은 스레드 안전하지 않으므로 워커 한 개로 직렬화)
+
+import io
+import os
+import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.config import settings
+from service.label_index import LabelIndex
+
+_render_worker: Optional[ThreadPoolExecutor] = None
+_render_worker_lock = threading.Lock()
+
+
+def _get_render_worker() -> ThreadPoolExecutor:
+    """시각화 전용 단일 스레드 워커를 반환합니다."""
+    global _render_worker
+    if _render_worker is None:
+        # 여러 추론 스레드가 동시에 처음 호출해도 워커는 하나만 생성
+        with _render_worker_lock:
+            if _render_worker is None:
+                _render_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-visualization")
+    return _render_worker
+
+
+def _plot_color_palette(axes, colors: Dict[str, List[str]]):
+    """HEX 코드만 사용하여 색상 팔레트 시각화"""
+    from matplotlib.patches import Rectangle
+
+    axes.axis('off')
+    axes.set_title("Extracted Colors", fontsize=12, weight='bold')
+
+    y_pos = 0.8
+    
+    for part_name, hex_codes in colors.items():
+        if not hex_codes:
+            continue
+        
+        axes.text(0.05, y_pos, f"{part_name.title()}:", fontsize=10, va='center', weight='bold')
+        
+        for i, hex_code in enumerate(hex_codes):
+            axes.add_patch(Rectangle(((0.3 + i * 0.2), y_pos - 0.04), 0.15, 0.08, 
+                                     facecolor=hex_code, edgecolor='black'))
+            axes.text(0.375 + i * 0.2, y_pos - 0.07, hex_code, fontsize=8, ha='center')
+        
+        y_pos -= 0.2
+    axes.set_xlim(0, 1)
+    axes.set_ylim(0, 1)
+
+
+def _plot_part_masks(axes, original_image, label_index: LabelIndex, target_parts: Dict[str, List[int]]):
+    """부위별 마스크 시각화"""
+    part_names = list(target_parts.keys())
+    for i, part_name in enumerate(part_names[:3]):
+        ax = axes[1, i]
+        label_ids = target_parts[part_name]
+        
+        ax.imshow(original_image)
+        if label_index.count(label_ids) > 0:
+            colored_mask = np.zeros_like(original_image)
+            colored_mask.reshape(-1, 3)[label_index.indices(label_ids)] = [255, 0, 0] # Red
+            ax.imshow(colored_mask, alpha=0.5)
+        
+        ax.set_title(f"{part_name.title()} Mask")
+        ax.axis('off')
+
+
+def render_face_analysis_png(original_image: np.ndarray,
+                             label_index: LabelIndex,
+                             colors: Dict[str, List[str]],
+                             target_parts: Dict[str, List[int]],
+                             dpi: Optional[int] = None) -> bytes:
+    """결과 시각화 그림을 메모리의 PNG 바이트로 렌더링하고, 그림은 바로 닫아 메모리를 해제합니다."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+    try:
+        axes[0, 0].imshow(original_image)
+        axes[0, 0].set_title("Original Image")
+        axes[0, 0].axis('off')
+        
+        axes[0, 1].imshow(label_index.mask, cmap='tab20')
+        axes[0, 1].set_title("Segmentation Mask")
+        axes[0, 1].axis('off')
+        
+        _plot_color_palette(axes[0, 2], colors)
+        _plot_part_masks(axes, original_image, label_index, target_parts)
+
+        axes[1, 2].axis('off')
+
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi or settings.face_debug_dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def render_in_background(original_image: np.ndarray,
+                         label_index: LabelIndex,
+                         colors: Dict[str, List[str]],
+                         target_parts: Dict[str, List[int]]) -> Future:
+    """시각화 워커에 렌더링을 맡기고 PNG 바이트를 받을 Future를 반환합니다."""
+    return _get_render_worker().submit(render_face_analysis_png, original_image, label_index, colors, target_parts)
+
+
+def _save_debug_png(future: Future, save_path: str):
+    """렌더링이 끝나면 디버그 디렉터리에 저장합니다."""
+    try:
+        with open(save_path, "wb") as f:
+            f.write(future.result())
+        print(f"분석 결과 이미지를 '{save_path}'에 저장했습니다.")
+    except Exception as e:
+        print(f"분석 결과 이미지 저장 실패: {e}")
+
+
+def save_debug_visualization(original_image: np.ndarray,
+                             label_index: LabelIndex,
+                             colors: Dict[str, List[str]],
+                             target_parts: Dict[str, List[int]]):
+    """
+    디버그 모드(settings.face_debug_visualization)에서 결과 그림을 백그라운드로 저장합니다.
+    요청 경로는 렌더링을 기다리지 않으며, 요청마다 고유한 파일명을 사용해 서로 덮어쓰지 않습니다.
+    """
+    os.makedirs(settings.face_debug_dir, exist_ok=True)
+    file_name = f"face_color_analysis_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.png"
+    save_path = os.path.join(settings.face_debug_dir, file_name)
+    future = render_in_background(original_image, label_index, colors, target_parts)
+    future.add_done_callback(lambda done: _save_debug_png(done, save_path))
@@ -4,21 +4,34 @@
 import numpy as np
 import cv2
 from PIL import Image
-import torch
-from transformers import SegformerImageProcessor, SegformerForSemanticSegmentation
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
 from fastapi import UploadFile, HTTPException
 import io
 import os
-from typing import List, Dict, Any, Optional
+import time
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import colorsys
+from core.config import settings
+from service.face_batch_scheduler import SegmentationBatchScheduler
+from service.inference_executor import InferenceExecutor
+from service.dominant_color import extract_dominant_colors
+from service.label_index import LabelIndex
+from service.face_visualization import render_in_background, save_debug_visualization
+from service.face_result_cache import get_face_result_cache, content_key, perceptual_hash, CachedFaceResult
+from service.image_ingest import read_upload_limited, decode_image
+# torch / transformers는 무거우므로 모델을 실제로 로드할 때 import 합니다. (앱 기동 시간 단축)
 
 class FaceColorExtractor:
-    def __init__(self):
-        """얼굴 파싱 모델 초기화"""
-        self.processor = SegformerImageProcessor.from_pretrained("jonathandinu/face-parsing")
-        self.model = SegformerForSemanticSegmentation.from_pretrained("jonathandinu/face-parsing")
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[str] = None):
+        """얼굴 파싱 모델 초기화 (backend: "torch", "onnx", "onnx-int8")"""
+        from transformers import SegformerImageProcessor
+        from service.face_backend import create_face_backend
+
+        model_name = model_name or settings.face_model_name
+        self.processor = SegformerImageProcessor.from_pretrained(model_name)
+        self.backend = create_face_backend(backend or settings.face_backend, model_name)
+        # 마이크로 배칭 스케줄러 (레지스트리에서 연결, None이면 이미지마다 직접 추론)
+        self.scheduler: Optional[SegmentationBatchScheduler] = None
         
         self.label_map = {
             0: "background", 1: "skin", 2: "nose", 3: "eye_g", 4: "left_eye",
@@ -31,187 +44,366 @@ class FaceColorExtractor:
             "skin": [1], "nose": [2], "hair": [13], "eyes": [4, 5], "lips": [10, 11, 12]
         }
 
-    def validate_and_count_faces(self, segmentation_mask, original_image_shape):
-        """세그멘테이션 마스크를 사용하여 유효한 단일 얼굴이 있는지 검증합니다."""
-        unique_labels = np.unique(segmentation_mask)
-        has_skin = 1 in unique_labels
-        has_eye = 4 in unique_labels or 5 in unique_labels
+        # 배경을 제거한 얼굴 이미지에 남길 라벨
+        self.face_labels = [1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
+        # 얼굴 개수/면적 검증에 사용하는 얼굴 안쪽 부위 라벨 (피부, 코, 눈, 눈썹, 입, 입술)
+        self.face_part_labels = [1, 2, 4, 5, 6, 7, 10, 11, 12]
+
+    def validate_and_count_faces(self, segmentation_mask: np.ndarray, original_image_shape) -> Tuple[int, int, int, int]:
+        """
+        세그멘테이션 마스크를 사용하여 유효한 단일 얼굴이 있는지 검증하고, 얼굴의 경계 상자를 반환합니다.
+
+        얼굴 부위(피부, 코, 눈, 눈썹, 입술) 마스크를 긴 변 face_validation_side 정도로 간격 추출한 뒤
+        connectedComponentsWithStats 한 번으로 얼굴 개수, 면적, 경계 상자를 구합니다.
+        부위 라벨을 합쳐서 보므로 눈/코/입 구멍이 메워져 기존 외곽선 면적과 비슷한 값이 나옵니다.
+
+        Returns:
+            Tuple[int, int, int, int]: 마스크 좌표의 얼굴 경계 상자 (top, bottom, left, right), bottom/right는 미포함
+        """
+        label_counts = np.bincount(segmentation_mask.ravel(), minlength=len(self.label_map))
+        has_skin = label_counts[1] > 0
+        has_eye = label_counts[4] > 0 or label_counts[5] > 0
 
         if not (has_skin and has_eye):
             raise HTTPException(status_code=400, detail="얼굴의 핵심 부위(피부, 눈)가 인식되지 않았습니다. 더 선명한 사진을 사용해주세요.")
 
-        skin_mask = (segmentation_mask == 1).astype(np.uint8)
-        contours, _ = cv2.findContours(skin_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        min_face_area = (original_image_shape[0] * original_image_shape[1]) * 0.01
-        face_contours = [cnt for cnt in contours if cv2.contourArea(cnt) > min_face_area]
+        mask_h, mask_w = segmentation_mask.shape[:2]
+        stride = max(1, max(mask_h, mask_w) // max(1, settings.face_validation_side))
+        small_mask = segmentation_mask[::stride, ::stride]
+        face_part_mask = np.isin(small_mask, self.face_part_labels).astype(np.uint8)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(face_part_mask, connectivity=8)
+
+        # 0번 컴포넌트는 배경, 면적은 원래 해상도 기준으로 환산
+        areas = stats[1:, cv2.CC_STAT_AREA].astype(np.float64) * stride * stride
+        image_area = original_image_shape[0] * original_image_shape[1]
+        min_face_area = image_area * 0.01
+        face_components = np.nonzero(areas > min_face_area)[0]
 
-        if len(face_contours) == 0:
+        if len(face_components) == 0:
             raise HTTPException(status_code=400, detail="얼굴을 찾을 수 없습니다. 조명이 밝고 얼굴이 잘 보이는 사진을 사용해주세요.")
-        if len(face_contours) > 1:
-            raise HTTPException(status_code=400, detail=f"{len(face_contours)}명의 얼굴이 감지되었습니다. 한 명의 얼굴만 있는 사진을 사용해주세요.")
+        if len(face_components) > 1:
+            raise HTTPException(status_code=400, detail=f"{len(face_components)}명의 얼굴이 감지되었습니다. 한 명의 얼굴만 있는 사진을 사용해주세요.")
 
-        face_area = cv2.contourArea(face_contours[0])
-        image_area = original_image_shape[0] * original_image_shape[1]
-        face_ratio = face_area / image_area
+        face = face_components[0]
+        face_ratio = areas[face] / image_area
         if face_ratio < 0.03:
             raise HTTPException(status_code=400, detail="얼굴이 너무 작습니다. 더 가까이 찍은 사진을 사용해주세요.")
         print(f"얼굴 검증 완료: 1개의 얼굴 감지, 얼굴 비율: {face_ratio:.2%}")
 
+        x, y, w, h = stats[face + 1, :4]
+        return (y * stride, min(mask_h, (y + h) * stride), x * stride, min(mask_w, (x + w) * stride))
+
+    def face_region(self, face_bbox: Tuple[int, int, int, int], mask_shape) -> Tuple[int, int, int, int]:
+        """
+        얼굴 경계 상자를 머리카락/귀/목까지 포함하도록 face_region_margin 비율만큼 넓힌 영역을 반환합니다.
+        (위쪽은 머리카락을 위해 조금 더 넓힘)
+        """
+        top, bottom, left, right = face_bbox
+        height, width = bottom - top, right - left
+        margin = settings.face_region_margin
+        return (
+            max(0, int(top - height * margin * 1.2)),
+            min(mask_shape[0], int(bottom + height * margin)),
+            max(0, int(left - width * margin)),
+            min(mask_shape[1], int(right + width * margin)),
+        )
+
+    def index_face_region(self, segmentation_mask: np.ndarray, image_shape) -> LabelIndex:
+        """
+        검증 후 얼굴 주변 영역만 라벨 인덱스로 만듭니다.
+        이후 색상 추출은 이 영역 안에서만 픽셀을 찾습니다. (얼굴 잘라내기는 cutout_region 참고)
+        """
+        if segmentation_mask.dtype != np.uint8:
+            segmentation_mask = segmentation_mask.astype(np.uint8)
+        face_bbox = self.validate_and_count_faces(segmentation_mask, image_shape)
+        top, bottom, left, right = self.face_region(face_bbox, segmentation_mask.shape)
+        return LabelIndex(segmentation_mask[top:bottom, left:right], offset=(top, left), frame_mask=segmentation_mask)
+
+    def segment_batch(self, images: List[Image.Image]) -> List[np.ndarray]:
+        """
+        RGB 이미지 여러 장을 한 번의 forward pass로 세그멘테이션합니다. (검증 없음)
+        프로세서가 모든 이미지를 같은 입력 크기로 리사이즈하므로 하나의 텐서로 묶을 수 있고,
+        마스크는 이미지별 원래 크기로 후처리됩니다.
+        """
+        from transformers.modeling_outputs import SemanticSegmenterOutput
+
+        inputs = self.processor(images=images, return_tensors="pt")
+        outputs = SemanticSegmenterOutput(logits=self.backend(inputs["pixel_values"]))
+        masks = self.processor.post_process_semantic_segmentation(
+            outputs, target_sizes=[image.size[::-1] for image in images]
+        )
+        return [mask.numpy() for mask in masks]
+
+    def segment(self, image: Image.Image) -> np.ndarray:
+        """RGB 이미지 한 장을 세그멘테이션하여 (H, W) 라벨 마스크를 반환합니다. 스케줄러가 있으면 배치에 합류합니다."""
+        if self.scheduler is not None:
+            return self.scheduler.segment(image)
+        return self.segment_batch([image])[0]
+
+    def warmup(self):
+        """더미 이미지로 한 번 추론하여 첫 요청의 지연(가중치 로딩, 커널 초기화)을 미리 소모합니다."""
+        dummy = Image.new("RGB", (512, 512), (200, 170, 150))
+        self.segment_batch([dummy])
+
+    def cap_resolution(self, image: Image.Image) -> Image.Image:
+        """긴 변이 settings.face_max_side를 넘으면 비율을 유지해 작업 해상도로 축소합니다."""
+        max_side = settings.face_max_side
+        width, height = image.size
+        if max_side <= 0 or max(width, height) <= max_side:
+            return image
+        scale = max_side / max(width, height)
+        working_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return image.resize(working_size, Image.BILINEAR, reducing_gap=2.0)
+
     def parse_face_from_memory(self, image):
-        """메모리의 이미지에서 얼굴을 파싱하고 검증합니다."""
+        """
+        메모리의 이미지에서 얼굴을 파싱하고 검증합니다.
+        세그멘테이션, 검증, 색상 추출은 모두 작업 해상도(긴 변 face_max_side)에서 수행하므로
+        반환되는 이미지 배열과 마스크도 작업 해상도입니다.
+        """
         if image.mode != "RGB":
             image = image.convert("RGB")
-        inputs = self.processor(images=image, return_tensors="pt")
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        predicted_segmentation = self.processor.post_process_semantic_segmentation(outputs, target_sizes=[image.size[::-1]])[0].numpy()
-        self.validate_and_count_faces(predicted_segmentation, np.array(image).shape)
-        return np.array(image), predicted_segmentation
+        image = self.cap_resolution(image)
+        predicted_segmentation = self.segment(image)
+        image_array = np.array(image)
+        # 얼굴 주변 영역만 라벨 인덱스로 만들고, 이후 색상 추출/시각화/잘라내기가 공유
+        # (반환하는 이미지 배열도 같은 영역으로 잘라냄)
+        label_index = self.index_face_region(predicted_segmentation, image_array.shape)
+        top, left = label_index.offset
+        bottom, right = top + label_index.shape[0], left + label_index.shape[1]
+        return np.ascontiguousarray(image_array[top:bottom, left:right]), label_index
 
-    def _extract_sorted_dominant_colors(self, pixels: np.ndarray, n_colors: int = 1) -> Optional[List[np.ndarray]]:
+    def cutout_region(self, label_index: LabelIndex) -> Optional[Tuple[int, int, int, int]]:
         """
-        주어진 픽셀에서 K-Means를 사용하여 지배적인 색상을 추출하고 클러스터 크기(픽셀 수) 기준으로 정렬합니다.
+        얼굴 잘라내기 영역 (전체 마스크 좌표 y_min, y_max, x_min, x_max, 끝 포함)
+        색상 추출용 얼굴 주변 영역(face_region_margin)과 달리, 얼굴 영역과 이어진 얼굴/머리카락 라벨 덩어리 전체를 감싸므로
+        어깨까지 내려오는 머리카락이나 넓은 귀도 잘리지 않습니다.
+        덩어리는 검증과 같은 간격으로 축소한 전체 마스크에서 찾고, 경계 상자는 원래 해상도에서 다시 맞춥니다.
         """
-        if len(pixels) == 0:
+        frame_mask = label_index.frame_mask
+        mask_h, mask_w = frame_mask.shape[:2]
+        stride = max(1, max(mask_h, mask_w) // max(1, settings.face_validation_side))
+        small_mask = np.isin(frame_mask[::stride, ::stride], self.face_labels).astype(np.uint8)
+        _, components, stats, _ = cv2.connectedComponentsWithStats(small_mask, connectivity=8)
+
+        # 얼굴 주변 영역과 겹치는 덩어리들 (0번은 배경)
+        top, left = label_index.offset
+        bottom, right = top + label_index.shape[0], left + label_index.shape[1]
+        overlapping = np.unique(components[top // stride:-(-bottom // stride), left // stride:-(-right // stride)])
+        overlapping = overlapping[overlapping > 0]
+        if len(overlapping) == 0:
             return None
-        
-        if len(pixels) < n_colors:
-            n_colors = len(pixels)
-            if n_colors == 0:
-                return None
 
-        kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
-        kmeans.fit(pixels)
-        
-        # 클러스터별 픽셀 수 계산
-        labels, counts = np.unique(kmeans.labels_, return_counts=True)
-        
-        # (픽셀 수, 클러스터 중심 색상) 쌍을 만든 후 픽셀 수 기준으로 내림차순 정렬
-        dominant_colors_sorted_by_count = sorted(
-            zip(counts, kmeans.cluster_centers_), 
-            key=lambda x: x[0], 
-            reverse=True
-        )
+        x, y = stats[overlapping, cv2.CC_STAT_LEFT], stats[overlapping, cv2.CC_STAT_TOP]
+        w, h = stats[overlapping, cv2.CC_STAT_WIDTH], stats[overlapping, cv2.CC_STAT_HEIGHT]
+        region_top, region_bottom = int(y.min()) * stride, min(mask_h, int((y + h).max()) * stride + stride)
+        region_left, region_right = int(x.min()) * stride, min(mask_w, int((x + w).max()) * stride + stride)
+
+        # 축소 마스크의 경계를 원래 해상도의 실제 라벨 픽셀에 맞춤
+        region = np.isin(frame_mask[region_top:region_bottom, region_left:region_right], self.face_labels)
+        rows, cols = np.nonzero(region.any(axis=1))[0], np.nonzero(region.any(axis=0))[0]
+        if len(rows) == 0:
+            return None
+        return (region_top + int(rows[0]), region_top + int(rows[-1]),
+                region_left + int(cols[0]), region_left + int(cols[-1]))
+
+    def build_face_cutout(self, original_image: np.ndarray, label_index: LabelIndex) -> bytes:
+        """
+        얼굴 영역만 남긴 투명 배경 PNG를 원본 해상도로 생성합니다.
+        잘라내기 영역(cutout_region)의 마스크만 원본 크기로 확대하므로, 전체 마스크를 확대하지 않습니다.
+        """
+        region = self.cutout_region(label_index)
+        if region is None:
+            raise HTTPException(status_code=400, detail="얼굴 영역을 찾을 수 없습니다.")
+        y_min, y_max, x_min, x_max = region
+
+        # 작업 해상도(전체 마스크) 좌표를 원본 해상도 좌표로 변환
+        full_h, full_w = original_image.shape[:2]
+        mask_h, mask_w = label_index.frame_shape
+        scale_y, scale_x = full_h / mask_h, full_w / mask_w
+        top, bottom = int(np.floor(y_min * scale_y)), min(full_h, int(np.ceil((y_max + 1) * scale_y)))
+        left, right = int(np.floor(x_min * scale_x)), min(full_w, int(np.ceil((x_max + 1) * scale_x)))
+
+        crop_mask = np.isin(label_index.frame_mask[y_min:y_max + 1, x_min:x_max + 1], self.face_labels).astype(np.uint8) * 255
+        if crop_mask.shape != (bottom - top, right - left):
+            crop_mask = cv2.resize(crop_mask, (right - left, bottom - top), interpolation=cv2.INTER_NEAREST)
+
+        cropped_face = np.empty((bottom - top, right - left, 4), dtype=np.uint8)
+        cropped_face[:, :, :3] = original_image[top:bottom, left:right]
+        cropped_face[:, :, 3] = crop_mask
+        cropped_pil = Image.fromarray(cropped_face, 'RGBA')
         
-        # 정렬된 색상만 추출
-        sorted_colors = [color.astype(int) for count, color in dominant_colors_sorted_by_count]
+        img_byte_arr = io.BytesIO()
+        cropped_pil.save(img_byte_arr, format='PNG')
+        return img_byte_arr.getvalue()
 
-        return sorted_colors
+    def _extract_sorted_dominant_colors(self, pixels: np.ndarray, n_colors: int = 1) -> Optional[List[np.ndarray]]:
+        """
+        주어진 픽셀에서 지배적인 색상을 추출하고 클러스터 크기(픽셀 수) 기준으로 정렬합니다.
+        추출 방식은 settings.face_color_strategy (service/dominant_color.py 참고)
+        """
+        return extract_dominant_colors(pixels, n_colors=n_colors)
 
     def rgb_to_hex(self, rgb: np.ndarray) -> str:
         """RGB를 HEX 코드로 변환"""
         return f"#{int(rgb[0]):02x}{int(rgb[1]):02x}{int(rgb[2]):02x}"
 
-    def extract_face_colors(self, image: Image.Image) -> (Dict[str, List[str]], np.ndarray, np.ndarray):
+    def extract_part_colors(self, part_name: str, original_image: np.ndarray, label_index: LabelIndex) -> List[str]:
+        """한 부위의 지배색 HEX 코드(상위 2개)를 추출합니다. 해당 부위 픽셀이 없으면 빈 리스트"""
+        label_ids = self.target_parts[part_name]
+        if label_index.count(label_ids) == 0:
+            return []
+        part_pixels = label_index.pixels(original_image, label_ids)
+
+        # 'eyes'인 경우 흰색/회색 영역 제외 (검은색은 포함)
+        if part_name == "eyes":
+            hsv_pixels = cv2.cvtColor(part_pixels.reshape(-1, 1, 3), cv2.COLOR_RGB2HSV).reshape(-1, 3)
+            # 흰색/회색 제외: 채도(S)가 낮고 명도(V)가 높은 픽셀을 제외
+            non_white_mask = ~((hsv_pixels[:, 1] < 30) & (hsv_pixels[:, 2] > 180))
+            part_pixels = part_pixels[non_white_mask]
+
+            if len(part_pixels) == 0:
+                return [] # 흰색/회색 제외 후 픽셀이 없으면 다음 부위로
+        
+        n_colors = 3 # 3개의 지배색 추출
+        
+        colors_list = self._extract_sorted_dominant_colors(
+            part_pixels, n_colors=n_colors
+        )
+        if colors_list is None:
+            return []
+        # 추출된 3개의 색상 중 상위 2개만 사용
+        return [self.rgb_to_hex(c) for c in colors_list[:2]]
+
+    def extract_face_colors(self, image: Image.Image) -> (Dict[str, List[str]], np.ndarray, LabelIndex):
         """얼굴 부위별 색상 HEX 코드만 추출하는 메인 함수"""
-        original_image, segmentation_mask = self.parse_face_from_memory(image)
+        original_image, label_index = self.parse_face_from_memory(image)
         
         part_hex_codes = {}
         for part_name in self.target_parts.keys():
-            part_hex_codes[part_name] = []
-
-        for part_name, label_ids in self.target_parts.items():
-            part_mask = np.isin(segmentation_mask, label_ids)
-            if np.any(part_mask):
-                part_pixels = original_image[part_mask]
-
-                # 'eyes'인 경우 흰색/회색 영역 제외 (검은색은 포함)
-                if part_name == "eyes":
-                    hsv_pixels = cv2.cvtColor(part_pixels.reshape(-1, 1, 3), cv2.COLOR_RGB2HSV).reshape(-1, 3)
-                    # 흰색/회색 제외: 채도(S)가 낮고 명도(V)가 높은 픽셀을 제외
-                    non_white_mask = ~((hsv_pixels[:, 1] < 30) & (hsv_pixels[:, 2] > 180))
-                    part_pixels = part_pixels[non_white_mask]
-
-                    if len(part_pixels) == 0:
-                        continue # 흰색/회색 제외 후 픽셀이 없으면 다음 부위로
-                
-                n_colors = 3 # K-means로 3개의 색상 추출
-                
-                colors_list = self._extract_sorted_dominant_colors(
-                    part_pixels, n_colors=n_colors
+            part_hex_codes[part_name] = self.extract_part_colors(part_name, original_image, label_index)
+        
+        return part_hex_codes, original_image, label_index
+
+# 프로세스 전역 모델 레지스트리
+# Segformer 모델은 요청마다 새로 로드하지 않고, 앱 시작 시 한 번 로드한 인스턴스를 모든 요청이 공유합니다.
+_extractor: Optional[FaceColorExtractor] = None
+_extractor_lock = threading.Lock()
+_extractor_status: Dict[str, Any] = {"ready": False, "loading": False, "load_seconds": None, "error": None}
+
+def load_face_color_extractor(warmup: Optional[bool] = None, batching: Optional[bool] = None) -> FaceColorExtractor:
+    """
+    얼굴 파싱 모델을 로드하고(이미 로드되어 있으면 재사용) 더미 추론으로 워밍업합니다.
+    앱 시작 시 호출되며, 여러 스레드에서 동시에 호출되어도 모델은 한 번만 로드됩니다.
+    """
+    global _extractor
+    if _extractor is not None:
+        return _extractor
+
+    with _extractor_lock:
+        if _extractor is not None:
+            return _extractor
+
+        if warmup is None:
+            warmup = settings.face_model_warmup
+        if batching is None:
+            batching = settings.face_batch_enabled
+
+        _extractor_status["loading"] = True
+        started = time.perf_counter()
+        try:
+            extractor = FaceColorExtractor()
+            if warmup:
+                extractor.warmup()
+            if batching:
+                extractor.scheduler = SegmentationBatchScheduler(
+                    extractor.segment_batch,
+                    max_batch_size=settings.face_batch_max_size,
+                    max_wait_ms=settings.face_batch_max_wait_ms,
                 )
+        except Exception as e:
+            _extractor_status["error"] = str(e)
+            raise
+        finally:
+            _extractor_status["loading"] = False
 
-                if colors_list is not None:
-                    # 추출된 3개의 색상 중 상위 2개만 사용
-                    part_hex_codes[part_name] = [self.rgb_to_hex(c) for c in colors_list[:2]]
-        
-        return part_hex_codes, original_image, segmentation_mask
+        _extractor = extractor
+        _extractor_status["ready"] = True
+        _extractor_status["error"] = None
+        _extractor_status["load_seconds"] = round(time.perf_counter() - started, 3)
+        _extractor_status["backend"] = extractor.backend.name
+        print(f"얼굴 파싱 모델 로드 완료 (백엔드: {extractor.backend.name}, {_extractor_status['load_seconds']}초)")
+        return _extractor
 
-    def _plot_color_palette(self, axes, colors: Dict[str, List[str]]):
-        """HEX 코드만 사용하여 색상 팔레트 시각화"""
-        axes.axis('off')
-        axes.set_title("Extracted Colors", fontsize=12, weight='bold')
+def get_face_color_extractor() -> FaceColorExtractor:
+    """공유 FaceColorExtractor 인스턴스를 반환합니다. 아직 로드되지 않았다면 이 시점에 로드합니다."""
+    if _extractor is not None:
+        return _extractor
+    return load_face_color_extractor()
 
-        y_pos = 0.8
-        
-        for part_name, hex_codes in colors.items():
-            if not hex_codes:
-                continue
-            
-            axes.text(0.05, y_pos, f"{part_name.title()}:", fontsize=10, va='center', weight='bold')
-            
-            for i, hex_code in enumerate(hex_codes):
-                axes.add_patch(plt.Rectangle(((0.3 + i * 0.2), y_pos - 0.04), 0.15, 0.08, 
-                                          facecolor=hex_code, edgecolor='black'))
-                axes.text(0.375 + i * 0.2, y_pos - 0.07, hex_code, fontsize=8, ha='center')
-            
-            y_pos -= 0.2
-        axes.set_xlim(0, 1)
-        axes.set_ylim(0, 1)
-
-    def _plot_part_masks(self, axes, original_image, segmentation_mask):
-        """부위별 마스크 시각화"""
-        part_names = list(self.target_parts.keys())
-        for i, part_name in enumerate(part_names[:3]):
-            ax = axes[1, i]
-            label_ids = self.target_parts[part_name]
-            part_mask = np.isin(segmentation_mask, label_ids)
-            
-            ax.imshow(original_image)
-            if np.any(part_mask):
-                colored_mask = np.zeros_like(original_image)
-                colored_mask[part_mask] = [255, 0, 0] # Red
-                ax.imshow(colored_mask, alpha=0.5)
-            
-            ax.set_title(f"{part_name.title()} Mask")
-            ax.axis('off')
-
-    def visualize_results(self, original_image, segmentation_mask, colors, save_path=None):
-        """결과 시각화"""
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        
-        axes[0, 0].imshow(original_image)
-        axes[0, 0].set_title("Original Image")
-        axes[0, 0].axis('off')
-        
-        axes[0, 1].imshow(segmentation_mask, cmap='tab20')
-        axes[0, 1].set_title("Segmentation Mask")
-        axes[0, 1].axis('off')
-        
-        self._plot_color_palette(axes[0, 2], colors)
-        self._plot_part_masks(axes, original_image, segmentation_mask)
+def get_face_model_status() -> Dict[str, Any]:
+    """모델 레지스트리의 준비 상태를 반환합니다."""
+    status = dict(_extractor_status)
+    if settings.inference_executor == "process":
+        # 프로세스 풀에서는 모델이 워커 프로세스에 로드되므로 실행기 기동 여부로 판단
+        status["ready"] = _executor is not None and _executor.ready
+    if _extractor is not None and _extractor.scheduler is not None:
+        status["batching"] = _extractor.scheduler.stats()
+    return status
 
-        axes[1, 2].axis('off')
+def _lookup_perceptual(cache, image: Image.Image) -> (Optional[CachedFaceResult], Optional[str]):
+    """face_cache_phash가 켜져 있으면 디코딩한 이미지의 perceptual hash로 캐시를 조회합니다."""
+    if cache is None or not settings.face_cache_phash:
+        return None, None
+    phash = perceptual_hash(image)
+    return cache.get_by_phash(phash), phash
 
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"분석 결과 이미지를 '{save_path}'에 저장했습니다.")
+def run_face_pipeline(contents: bytes, with_colors: bool = True, with_cutout: bool = False) -> Dict[str, Any]:
+    """
+    업로드된 이미지 바이트 하나에 대해 세그멘테이션을 한 번만 수행하고,
+    요청한 결과(부위별 HEX 코드, 배경을 제거한 얼굴 PNG)를 함께 만듭니다. (추론 워커에서 실행)
 
-async def main(file: UploadFile):
-    """얼굴 이미지에서 HEX 코드만 추출하고 시각화하는 메인 함수"""
-    extractor = FaceColorExtractor()
-    
+    Returns:
+        Dict[str, Any]: {"hex_codes": 부위별 HEX 코드} 및/또는 {"cutout_png": PNG 바이트}
+    """
+    extractor = get_face_color_extractor()
+    cache = get_face_result_cache()
     try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        hex_codes_data, original_image, segmentation_mask = extractor.extract_face_colors(image)
-        
-        extractor.visualize_results(original_image, segmentation_mask, hex_codes_data, "face_color_analysis.png")
-        
-        return hex_codes_data
+        # 같은 파일을 다시 올린 경우 (색상만 필요하면 디코딩 없이 바로 반환)
+        key = content_key(contents) if cache else None
+        cached = cache.get(key) if cache else None
+        if cached is not None and not with_cutout:
+            return {"hex_codes": {part: list(codes) for part, codes in cached.hex_codes.items()}}
+
+        # 잘라내기는 원본 해상도가 필요하고, 그 외에는 작업 해상도 근처로 축소 디코딩
+        image = decode_image(contents, max_side=None if with_cutout else settings.face_max_side)
+
+        phash = None
+        if cached is None:
+            cached, phash = _lookup_perceptual(cache, image)
+
+        if cached is not None:
+            # 캐시된 마스크를 사용해 세그멘테이션과 색상 추출을 건너뜀
+            hex_codes_data = {part: list(codes) for part, codes in cached.hex_codes.items()}
+            label_index = extractor.index_face_region(cached.mask(), cached.mask_shape) if with_cutout else None
+        elif with_colors:
+            hex_codes_data, working_image, label_index = extractor.extract_face_colors(image)
+            if cache:
+                cache.put(key, hex_codes_data, label_index.frame_mask, phash)
+            # 디버그 모드에서만 결과 그림을 백그라운드로 저장 (응답은 기다리지 않음)
+            if settings.face_debug_visualization:
+                save_debug_visualization(working_image, label_index, hex_codes_data, extractor.target_parts)
+        else:
+            # 세그멘테이션은 작업 해상도에서 수행하고, 잘라낼 때만 원본 해상도로 마스크를 확대
+            hex_codes_data = None
+            _, label_index = extractor.parse_face_from_memory(image)
+
+        result: Dict[str, Any] = {}
+        if with_colors:
+            result["hex_codes"] = hex_codes_data
+        if with_cutout:
+            result["cutout_png"] = extractor.build_face_cutout(np.asarray(image), label_index)
+        return result
         
     except HTTPException as e:
         raise e
@@ -219,40 +411,98 @@ async def main(file: UploadFile):
         print(f"오류 발생: {e}")
         raise HTTPException(status_code=500, detail=f"이미지 처리 중 오류가 발생했습니다: {str(e)}")
 
-async def extract_face_only(file: UploadFile):
-    """얼굴만 추출하고 배경을 제거하는 함수"""
-    extractor = FaceColorExtractor()
+def analyze_face_colors_bytes(contents: bytes) -> Dict[str, List[str]]:
+    """업로드된 이미지 바이트에서 얼굴 부위별 HEX 코드를 추출합니다. (추론 워커에서 실행)"""
+    return run_face_pipeline(contents, with_colors=True, with_cutout=False)["hex_codes"]
+
+def extract_face_only_bytes(contents: bytes) -> bytes:
+    """업로드된 이미지 바이트에서 얼굴만 남기고 배경을 제거한 PNG 바이트를 반환합니다. (추론 워커에서 실행)"""
+    return run_face_pipeline(contents, with_colors=False, with_cutout=True)["cutout_png"]
+
+def analyze_face_full_bytes(contents: bytes) -> Dict[str, Any]:
+    """HEX 코드와 얼굴 PNG를 한 번의 세그멘테이션으로 함께 생성합니다. (추론 워커에서 실행)"""
+    return run_face_pipeline(contents, with_colors=True, with_cutout=True)
+
+def visualize_face_colors_bytes(contents: bytes) -> bytes:
+    """업로드된 이미지의 색상 분석 결과 그림을 PNG 바이트로 반환합니다. (추론 워커에서 실행)"""
+    extractor = get_face_color_extractor()
     try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        original_image, segmentation_mask = extractor.parse_face_from_memory(image)
-        
-        face_labels = [1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
-        face_mask = np.isin(segmentation_mask, face_labels)
-        
-        if not np.any(face_mask):
-            raise HTTPException(status_code=400, detail="얼굴 영역을 찾을 수 없습니다.")
-        
-        face_only_image = np.zeros((original_image.shape[0], original_image.shape[1], 4), dtype=np.uint8)
-        face_only_image[:, :, :3] = original_image
-        face_only_image[:, :, 3] = face_mask.astype(np.uint8) * 255
-        
-        face_coords = np.where(face_mask)
-        y_min, y_max = np.min(face_coords[0]), np.max(face_coords[0])
-        x_min, x_max = np.min(face_coords[1]), np.max(face_coords[1])
-        
-        cropped_face = face_only_image[y_min:y_max+1, x_min:x_max+1]
-        cropped_pil = Image.fromarray(cropped_face, 'RGBA')
-        
-        img_byte_arr = io.BytesIO()
-        cropped_pil.save(img_byte_arr, format='PNG')
-        img_byte_arr.seek(0)
-        
-        return img_byte_arr.getvalue()
-        
+        image = decode_image(contents, max_side=settings.face_max_side)
+        hex_codes_data, original_image, label_index = extractor.extract_face_colors(image)
+        return render_in_background(original_image, label_index, hex_codes_data, extractor.target_parts).result()
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"얼굴 추출 중 예상치 못한 오류 발생: {e}")
-        raise HTTPException(status_code=500, detail=f"이미지 처리 중 오류가 발생했습니다: {str(e)}")
\ No newline at end of file
+        print(f"시각화 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail=f"이미지 처리 중 오류가 발생했습니다: {str(e)}")
+
+# 추론 실행기 레지스트리
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+def _configure_torch_threads():
+    """torch intra-op 스레드 수를 설정합니다. (0이면 torch 기본값 사용)"""
+    if settings.torch_num_threads > 0:
+        import torch
+        torch.set_num_threads(settings.torch_num_threads)
+
+def _init_process_worker():
+    """프로세스 풀 워커 초기화: 워커마다 모델을 한 번 로드해 둡니다. (워커 내부는 단일 스레드라 배칭 없음)"""
+    _configure_torch_threads()
+    load_face_color_extractor(batching=False)
+
+def _process_worker_ready() -> bool:
+    """프로세스 워커 기동 확인용 함수"""
+    return _extractor is not None
+
+def get_inference_executor() -> InferenceExecutor:
+    """설정에 따라 스레드 풀 또는 프로세스 풀 추론 실행기를 생성(한 번)하고 반환합니다."""
+    global _executor
+    if _executor is not None:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None:
+            if settings.inference_executor == "process":
+                _executor = InferenceExecutor(
+                    kind="process",
+                    workers=settings.inference_workers,
+                    max_queue=settings.inference_max_queue,
+                    initializer=_init_process_worker,
+                )
+            else:
+                _configure_torch_threads()
+                _executor = InferenceExecutor(
+                    kind="thread",
+                    workers=settings.inference_workers,
+                    max_queue=settings.inference_max_queue,
+                )
+    return _executor
+
+def start_face_inference():
+    """앱 시작 시 호출: 실행 방식에 맞게 모델을 미리 로드합니다."""
+    executor = get_inference_executor()
+    if executor.kind == "process":
+        executor.prestart(_process_worker_ready)
+    else:
+        load_face_color_extractor()
+
+async def main(file: UploadFile):
+    """얼굴 이미지에서 HEX 코드만 추출하는 메인 함수"""
+    contents = await read_upload_limited(file)
+    return await get_inference_executor().run(analyze_face_colors_bytes, contents)
+
+async def visualize_face_colors(file: UploadFile):
+    """얼굴 색상 분석 결과를 시각화한 PNG를 생성하는 함수"""
+    contents = await read_upload_limited(file)
+    return await get_inference_executor().run(visualize_face_colors_bytes, contents)
+
+async def analyze_face_full(file: UploadFile) -> Dict[str, Any]:
+    """색상 분석과 얼굴 추출을 한 번의 세그멘테이션으로 처리하는 함수"""
+    contents = await read_upload_limited(file)
+    return await get_inference_executor().run(analyze_face_full_bytes, contents)
+
+async def extract_face_only(file: UploadFile):
+    """얼굴만 추출하고 배경을 제거하는 함수"""
+    contents = await read_upload_limited(file)
+    return await get_inference_executor().run(extract_face_only_bytes, contents)
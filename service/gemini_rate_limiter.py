@@ -0,0 +1,285 @@
+# Gemini 호출 속도 제한기
+# 모든 Gemini 호출이 공유하는 클라이언트 측 제한기입니다. 짧은 폭주는 실패시키지 않고 잠시 대기열에 세웁니다.
+#
+#   - 토큰 버킷   : 분당 요청 수(gemini_rate_limit_rpm)만큼 토큰이 차고, 최대 burst개까지 모아 둠
+#   - 동시 실행 수 : 동시에 실행 중인 호출은 gemini_max_in_flight개까지
+#   - 우선순위    : 빠른 퍼스널 컬러 판정(PRIORITY_HIGH)이 무거운 코디 추천(PRIORITY_LOW)보다 먼저 슬롯을 받음
+#   - 429 재시도  : 지터를 준 지수 백오프로 재시도하고, 그동안 버킷을 멈춰 다른 호출도 함께 물러남
+#                   (응답에 retry_delay가 있으면 그 시간 이상 대기)
+
+import re
+import time
+import heapq
+import random
+import logging
+import asyncio
+import itertools
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger()
+
+PRIORITY_HIGH = 0  # 퍼스널 컬러 판정
+PRIORITY_LOW = 1   # 구조화된 코디 추천
+
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_LOW: "low"}
+
+_RETRY_DELAY_PATTERN = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)")
+
+
+class GeminiQueueTimeout(Exception):
+    """대기열에서 제한 시간 안에 실행 슬롯을 받지 못한 경우"""
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """429 / 할당량 초과 오류인지 확인합니다. (instructor 등이 감싼 원인 예외까지 확인)"""
+    try:
+        from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+        rate_limit_types: Tuple[type, ...] = (ResourceExhausted, TooManyRequests)
+    except ImportError:
+        rate_limit_types = ()
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if rate_limit_types and isinstance(error, rate_limit_types):
+            return True
+        message = str(error).lower()
+        if "429" in message or "quota" in message or "resource exhausted" in message:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_delay_hint(error: BaseException) -> Optional[float]:
+    """오류 메시지에 포함된 서버의 재시도 대기 시간(초)"""
+    match = _RETRY_DELAY_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class GeminiRateLimiter:
+    def __init__(self,
+                 requests_per_minute: float = 60.0,
+                 burst: int = 10,
+                 max_in_flight: int = 8,
+                 max_retries: int = 3,
+                 backoff_base_seconds: float = 1.0,
+                 backoff_max_seconds: float = 30.0,
+                 queue_timeout_seconds: float = 30.0):
+        """
+        토큰 버킷 + 동시 실행 제한 + 우선순위 대기열
+
+        Args:
+            requests_per_minute: 분당 허용 요청 수 (토큰 충전 속도)
+            burst: 버킷 최대 토큰 수 (한 번에 바로 보낼 수 있는 요청 수)
+            max_in_flight: 동시에 실행 중인 최대 호출 수
+            max_retries: 429 오류 시 최대 재시도 횟수
+            backoff_base_seconds: 첫 재시도 대기 시간 (시도마다 2배)
+            backoff_max_seconds: 재시도 대기 시간 상한
+            queue_timeout_seconds: 대기열에서 기다리는 최대 시간 (초과 시 GeminiQueueTimeout)
+        """
+        self.rate_per_second = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rate_limited = 0
+        self.retries = 0
+        self.queue_timeouts = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+        self._refilled_at = now
+
+    def _dispatch(self):
+        """대기열 앞쪽부터 토큰과 슬롯이 허락하는 만큼 실행을 허가하고, 부족하면 다시 깨어날 시간을 예약합니다."""
+        self._refill()
+        now = time.monotonic()
+        while self._waiters and self._in_flight < self.max_in_flight:
+            if now < self._paused_until or self._tokens < 1.0:
+                break
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # 시간 초과/취소된 대기자
+                continue
+            self._tokens -= 1.0
+            self._in_flight += 1
+            future.set_result(True)
+
+        self._waiters = [w for w in self._waiters if not w[2].done()]
+        heapq.heapify(self._waiters)
+        if self._waiters and self._in_flight < self.max_in_flight and self._wakeup is None:
+            # 토큰이 찰 때까지(또는 429 일시정지가 끝날 때까지) 기다렸다가 다시 배분
+            delay = max(self._paused_until - now, (1.0 - self._tokens) / self.rate_per_second if self.rate_per_second > 0 else 1.0, 0.01)
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
+
+    async def acquire(self, priority: int = PRIORITY_LOW):
+        """실행 슬롯을 받을 때까지 기다립니다. (우선순위가 같으면 먼저 온 순서)"""
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.queue_timeouts += 1
+            raise GeminiQueueTimeout("요청이 많아 Gemini 호출 대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소된 경우 반납
+                self.release()
+            else:
+                future.cancel()
+            raise
+        self.total_wait_seconds += time.monotonic() - started
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self.granted[name] = self.granted.get(name, 0) + 1
+
+    def release(self):
+        """실행 슬롯을 반납합니다."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_LOW):
+        """async with limiter.slot(priority): 블록 동안 실행 슬롯 하나를 사용합니다."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        429 오류 후 대기 시간을 계산하고, 그동안 버킷을 멈춰 다른 호출도 함께 물러나게 합니다.
+        지터: 지수 백오프 값의 50~100% 사이에서 무작위 선택
+        """
+        self.rate_limited += 1
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.0)
+        hint = _retry_delay_hint(error) if error is not None else None
+        if hint is not None:
+            delay = max(delay, min(hint, self.backoff_max_seconds))
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._tokens = 0.0
+        return delay
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """429 오류이고 재시도 횟수가 남았는지 여부"""
+        return attempt < self.max_retries and is_rate_limit_error(error)
+
+    async def call(self, factory: Callable[[], Awaitable[Any]], priority: int = PRIORITY_LOW) -> Any:
+        """
+        슬롯을 받아 factory()를 실행합니다. 429 오류면 백오프 후 재시도하고, 재시도가 끝나면 마지막 오류를 다시 발생시킵니다.
+        """
+        attempt = 0
+        while True:
+            async with self.slot(priority):
+                try:
+                    return await factory()
+                except Exception as e:
+                    if not self.should_retry(e, attempt):
+                        raise
+                    delay = self.backoff(attempt, e)
+            await self._wait_retry(delay, attempt)
+            attempt += 1
+
+    async def stream(self, factory: Callable[[], AsyncIterator[Any]], priority: int = PRIORITY_LOW) -> AsyncIterator[Any]:
+        """
+        슬롯을 받아 factory()가 만든 스트림을 끝까지 내보냅니다. (스트림이 끝날 때까지 슬롯 하나를 사용)
+        첫 항목을 받기 전의 429 오류만 call과 같은 방식으로 백오프 후 재시도하고,
+        이미 항목을 내보낸 뒤의 오류는 결과가 중복되지 않도록 그대로 발생시킵니다.
+        """
+        attempt = 0
+        while True:
+            received = False
+            async with self.slot(priority):
+                iterator = factory()
+                try:
+                    async for item in iterator:
+                        received = True
+                        yield item
+                    return
+                except Exception as e:
+                    if received or not self.should_retry(e, attempt):
+                        raise
+                    delay = self.backoff(attempt, e)
+                finally:
+                    aclose = getattr(iterator, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+            await self._wait_retry(delay, attempt)
+            attempt += 1
+
+    async def _wait_retry(self, delay: float, attempt: int):
+        """재시도 전 백오프 대기 (슬롯을 반납한 뒤 호출)"""
+        self.retries += 1
+        logger.warning(f"Gemini 429 응답, {delay:.1f}초 후 재시도합니다. ({attempt + 1}/{self.max_retries})")
+        await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """현재 토큰/대기열/동시 실행 상태와 누적 통계"""
+        self._refill()
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                queued[name] = queued.get(name, 0) + 1
+        granted_total = sum(self.granted.values())
+        return {
+            "tokens": round(self._tokens, 2),
+            "capacity": self.capacity,
+            "requests_per_minute": round(self.rate_per_second * 60.0, 2),
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": queued,
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "granted": dict(self.granted),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "queue_timeouts": self.queue_timeouts,
+            "avg_wait_ms": round(self.total_wait_seconds / granted_total * 1000, 1) if granted_total else 0.0,
+        }
+
+
+_limiter: Optional[GeminiRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_gemini_rate_limiter() -> GeminiRateLimiter:
+    """프로세스 전역 Gemini 속도 제한기"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = GeminiRateLimiter(
+                    requests_per_minute=settings.gemini_rate_limit_rpm,
+                    burst=settings.gemini_rate_limit_burst,
+                    max_in_flight=settings.gemini_max_in_flight,
+                    max_retries=settings.gemini_max_retries,
+                    backoff_base_seconds=settings.gemini_backoff_base_seconds,
+                    backoff_max_seconds=settings.gemini_backoff_max_seconds,
+                    queue_timeout_seconds=settings.gemini_queue_timeout_seconds,
+                )
+    return _limiter
@@ -1,18 +1,26 @@
-import google.generativeai as genai
 import os
-import instructor
 from schemas.personal_schema import FaceColorData, PersonalColorAnalysis, PersonalColorResponse
 from schemas.user_schema import user_style_summary, user_profile
-from schemas.gemini_schema import GeminiExamplePrompt
+from schemas.gemini_schema import GeminiExamplePrompt, LookInfo
 from schemas.crowling_schema import CrawlingTask
 from crud.user_crud import get_styling_summary_by_id, get_user_by_id, create_user_personal_color_in_db
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+from pydantic import ValidationError
 import logging
 import sys
 import os
+import threading
+import asyncio
 from fastapi import HTTPException
+from core.config import settings
+from service.personal_color_classifier import get_personal_color_classifier
+from service.personal_color_cache import get_verdict_cache, quantize_color_key
+from service.recommendation_cache import get_recommendation_cache, recommendation_fingerprint
+from service.catalog import catalog_prompt_block
+from service.llm_client import create_llm_client
+from service.gemini_rate_limiter import get_gemini_rate_limiter, GeminiQueueTimeout, PRIORITY_HIGH, PRIORITY_LOW
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -32,87 +40,175 @@ load_dotenv()
 # Gemini API 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# 프롬프트에 사용될 텍스트 파일 경로
+PROJ_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERSONAL_COLOR_THEORY_PATH = os.path.join(PROJ_ROOT, "personal_color.txt")
+PERSONAL_COLOR_TYPES_PATH = os.path.join(PROJ_ROOT, "personal_color_type.txt")
+
+# 진단 프롬프트의 마지막 고정 부분 (진단 요청)
+PERSONAL_COLOR_PROMPT_TAIL = "\n".join([
+    "---",
+    "## 4. 최종 진단 요청",
+    "위의 '1. 이론', '2. 타입별 설명', '3. HEX 코드'를 모두 엄격하게 고려하여, 사용자의 최종 퍼스널 컬러를 아래 8가지 타입 중 하나로 확정해주십시오.",
+    "**분석 과정:**",
+    "1. 먼저 **피부(skin)의 HEX 코드**를 보고 웜/쿨, 명도, 채도 특성을 분석하여 '타입별 설명'과 비교하고, 가장 유력한 계절(봄, 여름, 가을, 겨울)을 결정합니다.",
+    "2. 그 다음, **헤어(hair), 눈(eyes)** 색상의 HEX 코드를 보조 지표로 사용하여 1차 결정을 검증하고 세부 톤(예: 라이트, 뮤트, 딥)을 좁힙니다.",
+    "3. 최종적으로 '타입별 설명'에 가장 부합하는 단 하나의 타입을 선택합니다.",
+    "**반드시 'Spring Bright', 'Spring Light', 'Summer Light', 'Summer Mute', 'Autumn Mute', 'Autumn Deep', 'Winter Deep', 'Winter Bright' 중 하나만 선택해야 합니다.",
+    "**어떠한 추가 설명도 없이, 최종 타입의 이름만 정확히 반환해주십시오.**"
+])
+
+# 구조화된 코디 추천 프롬프트의 고정 앞부분 (역할, 응답 가이드라인, 카탈로그 코드 표, 진단 결과 정책)
+# 사용자별 정보는 create_structured_user_prompt가 뒤에 붙이며, 고정 앞부분은 컨텍스트 캐시로 보낼 수 있습니다.
+STRUCTURED_STATIC_PROMPT = f"""
+        당신은 전문 패션 스타일리스트로 활동하면서, 퍼스널 컬러와 성별, 상의 사이즈, 하의 사이즈, 체형(str), 신발 사이즈, 선호하는 스타일, 
+        그리고 옷을 입을 상황(데이트 등) 정보를 입력받아 고객에게 최적의 옷 조합을 제안하는 업무를 수행합니다. 
+        주로 퍼스널 컬러 진단 결과와 신체 치수를 기반으로 컬러 매칭, 실루엣 강약 조절, 
+        아이템 밸런스를 고려하여 상의·하의·아우터·신발·원피스까지 포함한 완벽한 코디를 구성합니다. 
+
+다음 형식으로 응답하세요:
+
+        ### 분석 가이드라인 ###
+        카테고리 (ex 맨투맨, 슬랙스등
+
+{catalog_prompt_block()}
+
+        반드시 진단 결과 정책의 내용은 지켜야합니다, 만약 정책을 어길시 패널티 받게 될것입니다.
+
+        ### 진단 결과 정책###
+        반드시 선호 스타일 하나당 3개의 세트 코디를 만들어야 합니다. 스타일별로 구분 가능하게 만들어야합니다. 반드시 작성된 모든 스타일에 대한 코디를 3개씩 추천해야합니다
+        룩 이외의 다른것을 출력하지 않습니다, 양식에 있는 정보를 모두 받아야합니다,
+        옷에 맞는 색상은 반드시 퍼스널 컬러에 맞는 색으로 추천해야합니다.
+        look_Des에는 색상 관련 사항을 포함하지 않습니다. 띄어쓰기를 사용합니다.
+        비어있는 아이템은 null값을 사용하세요.
+        모든 아이템 필드는 반드시 객체 형태로 반환하세요.
+        아우터, 상의, 하의, 신발, 원피스 등 모든 카테고리는 반드시 포함해야 합니다.
+        반드시 코드에 띄어쓰기 없이 쭉 나열하여 작성합니다. 줄띄움은 필요 없습니다.
+        상의,하의,신발,원피스,아우터같이 대분류카테고리는 반드시 코드를 작성해야합니다다.
+        만약 여성이라면 원피스 추천도 해주세요.
+        만약 원피스를 추천을 해줬으면 상의,하의는 null값을 반환해야합니다.
+"""
+
+class PromptFile:
+    def __init__(self, file_path: str):
+        """
+        프롬프트 텍스트 파일 캐시
+        내용을 메모리에 보관하고, 파일 수정 시간(mtime)이 바뀐 경우에만 다시 읽습니다. (재시작 없이 반영)
+        """
+        self.file_path = file_path
+        self._mtime: Optional[float] = None
+        self._text: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load_text_file(self) -> str:
+        """텍스트 파일을 읽어 내용을 반환합니다."""
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.error(f"Prompt file not found at: {self.file_path}")
+            return f"오류: '{os.path.basename(self.file_path)}' 파일을 찾을 수 없습니다."
+        except Exception as e:
+            logger.error(f"Error reading prompt file {self.file_path}: {e}")
+            return f"오류: '{os.path.basename(self.file_path)}' 파일을 읽는 중 오류가 발생했습니다."
+
+    def refresh(self) -> bool:
+        """파일이 바뀌었으면 다시 읽습니다. 내용이 갱신되었으면 True"""
+        try:
+            mtime = os.stat(self.file_path).st_mtime
+        except OSError:
+            mtime = None
+        if self._text is not None and mtime == self._mtime:
+            return False
+        with self._lock:
+            if self._text is not None and mtime == self._mtime:
+                return False
+            self._text = self._load_text_file()
+            self._mtime = mtime
+            if mtime is not None:
+                logger.info(f"Prompt file loaded: {self.file_path}")
+            return True
+
+    @property
+    def text(self) -> str:
+        self.refresh()
+        return self._text
+
 class GeminiColorConsultant:
     def __init__(self):
         """
         Gemini API 초기화 및 프롬프트 데이터 로드
         
-        Gemini API 키를 설정하고, 텍스트 모델과 구조화된 출력 모델을 초기화합니다.
+        설정된 LLM 클라이언트(service/llm_client.py)를 만들고,
         퍼스널 컬러 분석에 필요한 이론 및 타입 설명 파일을 로드합니다.
+        프로세스당 한 번만 생성하여 재사용합니다. (get_gemini_consultant 참고)
         """
-        if not GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
-        
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.text_model = genai.GenerativeModel('gemini-2.5-flash')
-        self.structured_model = instructor.from_gemini(
-            client=genai.GenerativeModel(model_name="models/gemini-2.5-flash"),
-        )
+        # LLM 호출 백엔드 (settings.llm_backend: 실제 Gemini 또는 부하 테스트용 로컬 대역)
+        self.llm = create_llm_client(settings.llm_backend, GEMINI_API_KEY)
 
-        # 프롬프트에 사용될 텍스트 파일 로드
-        PROJ_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.personal_color_theory = self._load_text_file(os.path.join(PROJ_ROOT, "personal_color.txt"))
-        self.personal_color_types = self._load_text_file(os.path.join(PROJ_ROOT, "personal_color_type.txt"))
+        # 프롬프트에 사용될 텍스트 파일 (변경 시 자동으로 다시 읽음)
+        self.theory_file = PromptFile(PERSONAL_COLOR_THEORY_PATH)
+        self.types_file = PromptFile(PERSONAL_COLOR_TYPES_PATH)
+        self._prompt_head: Optional[str] = None
+        self._prompt_lock = threading.Lock()
 
-    def _load_text_file(self, file_path: str) -> str:
-        """텍스트 파일을 읽어 내용을 반환합니다."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            logger.error(f"Prompt file not found at: {file_path}")
-            return f"오류: '{os.path.basename(file_path)}' 파일을 찾을 수 없습니다."
-        except Exception as e:
-            logger.error(f"Error reading prompt file {file_path}: {e}")
-            return f"오류: '{os.path.basename(file_path)}' 파일을 읽는 중 오류가 발생했습니다."
+    @property
+    def personal_color_theory(self) -> str:
+        return self.theory_file.text
+
+    @property
+    def personal_color_types(self) -> str:
+        return self.types_file.text
+
+    def _static_prompt_head(self) -> str:
+        """
+        진단 프롬프트의 고정 부분(역할, 이론, 타입별 설명)을 한 번 만들어 두고 재사용합니다.
+        프롬프트 파일이 바뀐 경우에만 다시 만듭니다.
+        """
+        changed = self.theory_file.refresh() | self.types_file.refresh()
+        if self._prompt_head is None or changed:
+            with self._prompt_lock:
+                self._prompt_head = "\n".join([
+                    "당신은 세계 최고의 퍼스널 컬러 전문가입니다. 제공된 '퍼스널 컬러 이론', '8가지 타입별 상세 설명', 그리고 '사용자 이미지에서 추출한 HEX 코드'를 모두 종합하여 가장 정확한 최종 진단을 내려주세요.",
+                    "---",
+                    "## 1. 퍼스널 컬러 이론 (판단 기준)",
+                    self.theory_file.text,
+                    "---",
+                    "## 2. 8가지 타입별 상세 설명 (최종 진단 참고 자료)",
+                    self.types_file.text,
+                    "---",
+                    "## 3. 사용자 이미지에서 추출한 HEX 코드",
+                    "아래 HEX 코드를 보고, 각 색상의 웜/쿨, 명도, 채도를 자체적으로 분석하여 판단의 근거로 삼아주세요."
+                ])
+        return self._prompt_head
 
     def create_personal_color_prompt(self, hex_codes_data: Dict[str, List[str]]) -> str:
         """
         얼굴 부위별 HEX 코드를 바탕으로 Gemini에게 전달할 최종 진단 프롬프트를 생성합니다.
+        고정 부분은 미리 만들어 둔 문자열을 사용하고, HEX 코드 부분만 요청마다 채웁니다.
         """
-        prompt_parts = [
-            "당신은 세계 최고의 퍼스널 컬러 전문가입니다. 제공된 '퍼스널 컬러 이론', '8가지 타입별 상세 설명', 그리고 '사용자 이미지에서 추출한 HEX 코드'를 모두 종합하여 가장 정확한 최종 진단을 내려주세요.",
-            "---",
-            "## 1. 퍼스널 컬러 이론 (판단 기준)",
-            self.personal_color_theory,
-            "---",
-            "## 2. 8가지 타입별 상세 설명 (최종 진단 참고 자료)",
-            self.personal_color_types,
-            "---",
-            "## 3. 사용자 이미지에서 추출한 HEX 코드",
-            "아래 HEX 코드를 보고, 각 색상의 웜/쿨, 명도, 채도를 자체적으로 분석하여 판단의 근거로 삼아주세요."
-        ]
+        prompt_parts = [self._static_prompt_head()]
 
         for part, hex_codes in hex_codes_data.items():
             if hex_codes:
                 prompt_parts.append(f"- **{part.capitalize()}**: {', '.join(hex_codes)}")
         
-        prompt_parts.extend([
-            "---",
-            "## 4. 최종 진단 요청",
-            "위의 '1. 이론', '2. 타입별 설명', '3. HEX 코드'를 모두 엄격하게 고려하여, 사용자의 최종 퍼스널 컬러를 아래 8가지 타입 중 하나로 확정해주십시오.",
-            "**분석 과정:**",
-            "1. 먼저 **피부(skin)의 HEX 코드**를 보고 웜/쿨, 명도, 채도 특성을 분석하여 '타입별 설명'과 비교하고, 가장 유력한 계절(봄, 여름, 가을, 겨울)을 결정합니다.",
-            "2. 그 다음, **헤어(hair), 눈(eyes)** 색상의 HEX 코드를 보조 지표로 사용하여 1차 결정을 검증하고 세부 톤(예: 라이트, 뮤트, 딥)을 좁힙니다.",
-            "3. 최종적으로 '타입별 설명'에 가장 부합하는 단 하나의 타입을 선택합니다.",
-            "**반드시 'Spring Bright', 'Spring Light', 'Summer Light', 'Summer Mute', 'Autumn Mute', 'Autumn Deep', 'Winter Deep', 'Winter Bright' 중 하나만 선택해야 합니다.",
-            "**어떠한 추가 설명도 없이, 최종 타입의 이름만 정확히 반환해주십시오.**"
-        ])
+        prompt_parts.append(PERSONAL_COLOR_PROMPT_TAIL)
+        prompt = "\n".join(prompt_parts)
         
-        #디버깅을 위해 완성된 프롬프트 출력
-        print("--- Generated Gemini Prompt ---")
-        print("\n".join(prompt_parts))
-        print("-----------------------------")
+        #디버깅을 위해 완성된 프롬프트 출력 (DEBUG 레벨에서만)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"--- Generated Gemini Prompt ---\n{prompt}\n-----------------------------")
         
-        return "\n".join(prompt_parts)
+        return prompt
     
 
-    async def create_analyze_structured(self, 
-                                      user_id: int,
-                                      db: Session
-                                    ) -> str:        
+    async def create_structured_user_prompt(self,
+                                            user_id: int,
+                                            db: Session
+                                            ) -> str:
         """
-        구조화된 퍼스널 컬러 분석 프롬프트 생성
+        구조화된 분석 프롬프트 중 사용자별로 달라지는 부분 (스타일링 요약 + 현재 퍼스널 컬러)
         """
         styling_summary = get_styling_summary_by_id(db, user_id)
         if not styling_summary:
@@ -144,157 +240,23 @@ class GeminiColorConsultant:
             - 현재 퍼스널 컬러: {user_profile.personal_color_name}
             """
         
-        s_prompt = f"""
-        당신은 전문 패션 스타일리스트로 활동하면서, 퍼스널 컬러와 성별, 상의 사이즈, 하의 사이즈, 체형(str), 신발 사이즈, 선호하는 스타일, 
-        그리고 옷을 입을 상황(데이트 등) 정보를 입력받아 고객에게 최적의 옷 조합을 제안하는 업무를 수행합니다. 
-        주로 퍼스널 컬러 진단 결과와 신체 치수를 기반으로 컬러 매칭, 실루엣 강약 조절, 
-        아이템 밸런스를 고려하여 상의·하의·아우터·신발·원피스까지 포함한 완벽한 코디를 구성합니다. 
-
+        return f"""
 분석 정보:
 {styling_info}
 {profile_info}
+위 분석 정보로 진단 결과 정책에 맞게 코디를 추천해주세요.
+"""
 
-다음 형식으로 응답하세요:
-
-        ### 분석 가이드라인 ###
-        카테고리 (ex 맨투맨, 슬랙스등
-
-반드시 카테고리는 아래의 카테고리에서 골라야해합니다.
-
-상의              001
-맨투맨/스웨트       001005
-후드 티셔츠          001004
-셔츠/블라우스       001002
-긴소매 티셔츠       001010
-반소매 티셔츠       001001
-피케/카라 티셔츠       001003
-니트/스웨터          001006
-민소매 티셔츠       001011
-기타 상의          001008
-
-하의             003
-데님 팬츠         003002
-트레이닝/조거팬츠      003004
-코튼 팬츠         003007
-슈트 팬츠/슬랙스      003008
-숏 팬츠         003009
-레깅스            003005
-점프 슈트/오버올      003010
-기타 하의         003006
-
-아우터            002
-후드 집업         002022
-블루종/MA-1         002001
-레더/라이더스 재킷      002002
-카디건            002020
-트러거 재킷         002017
-슈트/블레이저 재킷      002003
-스타디움 재킷      002004
-나일론/코치 재킷      002006
-아노락 재킷         002019
-트레이닝 재킷      002018
-환절기 코트         002008
-사파리/헌팅 재킷      002014
-베스트            002021
-숏패딩            002012
-무스탕/퍼         002025
-플리스/뽀글이      002023
-겨울 싱글 코트      002007
-겨울 더블 코트      002024
-겨울 기타 코트      002009
-롱패딩/헤비 아우터      002013
-패딩 베스트         002016
-기타 아우터         002015
-
-원피스/스커트 100
-미니원피스         100001
-미디원피스         100002
-맥시원피스         100003
-미니스커트         100004
-미디스커트         100005
-롱스커트         100006
-
-신발 103
-스니커즈          103004
-패딩/퍼 신발       103007
-부츠/워커          103002
-구두             103001
-샌들/슬리퍼          103003
-스포츠화          103005
-
-색상
-반드시 색상도 마찬가지로 아래 목록에 있는 항목들만 사용해야합니다
-
-화이트          WHITE
-실버             SILVER
-라이트 그레이       LIGHTGREY
-그레이          GRAY
-다크 그레이          DARKGREY
-블랙             BLACK
-레드             RED
-딥레드          DEEPRED
-버건디          BURGUNDY
-브릭             BRICK
-페일 핑크          PALEPINK
-라이트 핑크          LIGHTPINK
-핑크             PINK
-다크 핑크          DARKPINK
-피치             PEACH
-로즈골드          ROSEGOLD
-라이트 오렌지       LIGHTORANGE
-오렌지          ORANGE
-다크              DARKORANGE
-아이보리          IVORY
-오트밀          OATMENT
-라이트 옐로우       LIGHTYELLOW
-옐로우          YELLOW
-머스타드          MUSTARD
-골드             GOLD
-라임             LIME
-라이트 그린          LIGHTGREEN
-그린             GREEN
-올리브 그린          OLIVEGREEN
-카키             KHAKI
-다크 그린          DARKGREEN
-민트             MENT
-스카이 블루          SKYBLUE
-블루             BLUE
-다크 블루          DARKBLUE
-네이비          NAVY
-다크 네이비          DARKNAVY
-라벤더          LAVENDER
-퍼플             PURPLE
-라이트 브라운       LIGHTBROWN
-브라운          BROWN
-다크 브라운          DAKTBROWN
-카멜             CAMEL
-샌드             SAND
-베이지          BEIGE
-다크 베이지          DARKBEIGE
-카키 베이지          KHAKIBEIGE
-데님             DENIM
-연청             LIGHTBLUEDENIM
-중청             MEDIUMBLUEDENIM
-진청             DARKBLUEDENIM
-흑청             BLACKDENIM
-
-        반드시 진단 결과 정책의 내용은 지켜야합니다, 만약 정책을 어길시 패널티 받게 될것입니다.
-
-        ### 진단 결과 정책###
-        반드시 선호 스타일 하나당 3개의 세트 코디를 만들어야 합니다. 스타일별로 구분 가능하게 만들어야합니다. 반드시 작성된 모든 스타일에 대한 코디를 3개씩 추천해야합니다
-        룩 이외의 다른것을 출력하지 않습니다, 양식에 있는 정보를 모두 받아야합니다,
-        옷에 맞는 색상은 반드시 퍼스널 컬러에 맞는 색으로 추천해야합니다.
-        look_Des에는 색상 관련 사항을 포함하지 않습니다. 띄어쓰기를 사용합니다.
-        비어있는 아이템은 null값을 사용하세요.
-        모든 아이템 필드는 반드시 객체 형태로 반환하세요.
-        아우터, 상의, 하의, 신발, 원피스 등 모든 카테고리는 반드시 포함해야 합니다.
-        반드시 코드에 띄어쓰기 없이 쭉 나열하여 작성합니다. 줄띄움은 필요 없습니다.
-        상의,하의,신발,원피스,아우터같이 대분류카테고리는 반드시 코드를 작성해야합니다다.
-        만약 여성이라면 원피스 추천도 해주세요.
-        만약 원피스를 추천을 해줬으면 상의,하의는 null값을 반환해야합니다.
+    async def create_analyze_structured(self, 
+                                      user_id: int,
+                                      db: Session
+                                    ) -> str:        
         """
-        return s_prompt
-        
+        구조화된 퍼스널 컬러 분석 프롬프트 생성
+        고정 앞부분(STRUCTURED_STATIC_PROMPT)과 사용자별 부분을 이어 붙입니다.
+        """
+        return STRUCTURED_STATIC_PROMPT + await self.create_structured_user_prompt(user_id, db)
+
     async def get_personal_color_analysis(self, face_color_data: Dict[str, Any]) -> str:
         """
         Gemini API를 통한 퍼스널 컬러 분석
@@ -305,14 +267,36 @@ class GeminiColorConsultant:
         Returns:
             str: 퍼스널 컬러 분석 결과 (텍스트)
         """
+        # 색이 거의 같은 이전 판정이 있으면 Gemini 호출 없이 재사용
+        cache = get_verdict_cache()
+        color_key = quantize_color_key(face_color_data) if cache else None
+        if color_key:
+            cached = await cache.aget(color_key)
+            if cached is not None:
+                return cached
+
         try:
             # 프롬프트 생성
             prompt = self.create_personal_color_prompt(face_color_data)
-            # Gemini API 호출
-            response = self.text_model.generate_content(prompt)
-            # 텍스트 응답만 반환
-            return response.text.strip()
+            # Gemini API 호출 (비동기, 시간 제한)
+            # (속도 제한기: 우선 슬롯, 429면 백오프 후 재시도)
+            response_text = await get_gemini_rate_limiter().call(
+                lambda: asyncio.wait_for(
+                    self.llm.generate_text(prompt),
+                    timeout=settings.gemini_timeout_seconds,
+                ),
+                priority=PRIORITY_HIGH,
+            )
+            # 텍스트 응답만 반환 (정상 판정만 캐시에 저장)
+            result = response_text.strip()
+            if color_key and is_valid_verdict(result):
+                await cache.aput(color_key, result)
+            return result
             
+        except asyncio.TimeoutError:
+            return "분석 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+        except GeminiQueueTimeout as e:
+            return str(e)
         except Exception as e:
             error_msg = str(e)
             if "429" in error_msg or "quota" in error_msg.lower():
@@ -340,24 +324,106 @@ class GeminiColorConsultant:
         #     recommendations=[]
         # )
         
-        s_prompt = await self.create_analyze_structured(
+        user_prompt = await self.create_structured_user_prompt(
             user_id,
             db
         )
         try:
-            result = self.structured_model.create(
-                response_model=GeminiExamplePrompt,
-                messages=[{"role": "user", "content": s_prompt}]
+            result = await get_gemini_rate_limiter().call(
+                lambda: asyncio.wait_for(
+                    self.llm.create_structured(GeminiExamplePrompt, STRUCTURED_STATIC_PROMPT, user_prompt),
+                    timeout=settings.gemini_structured_timeout_seconds,
+                ),
+                priority=PRIORITY_LOW,
             )
             return result
+        except asyncio.TimeoutError:
+            raise Exception("구조화된 분석 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        except GeminiQueueTimeout as e:
+            raise Exception(str(e))
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "quota" in error_msg.lower():
-                raise Exception("API 할당량이 소진되었습니다. 잠시 후 다시 시도해주세요.")
-            elif "API_KEY" in error_msg:
-                raise Exception("API 키가 설정되지 않았습니다. 환경변수를 확인해주세요.")
-            else:
-                raise Exception(f"구조화된 분석 중 오류가 발생했습니다: {error_msg}")
+            raise _structured_error(e)
+
+    async def stream_personal_color_structured(self,
+                                               user_id: int,
+                                               db : Session) -> AsyncIterator[GeminiExamplePrompt]:
+        """
+        구조화된 퍼스널 컬러 분석을 스트리밍으로 받습니다. (백엔드의 create_structured_partial)
+        응답이 생성되는 동안 점점 채워지는 부분(partial) GeminiExamplePrompt를 차례로 내보냅니다.
+        전체 스트림에 settings.gemini_structured_timeout_seconds 시간 제한을 적용합니다.
+        """
+        user_prompt = await self.create_structured_user_prompt(
+            user_id,
+            db
+        )
+        try:
+            # 스트림이 끝날 때까지 슬롯 하나를 사용 (첫 응답 전 429면 백오프 후 재시도)
+            async for partial in get_gemini_rate_limiter().stream(
+                lambda: self._stream_partials(user_prompt),
+                priority=PRIORITY_LOW,
+            ):
+                yield partial
+        except asyncio.TimeoutError:
+            raise Exception("구조화된 분석 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        except GeminiQueueTimeout as e:
+            raise Exception(str(e))
+        except Exception as e:
+            raise _structured_error(e)
+
+    async def _stream_partials(self, user_prompt: str) -> AsyncIterator[GeminiExamplePrompt]:
+        """부분 결과 스트림을 전체 시간 제한(settings.gemini_structured_timeout_seconds) 안에서 읽습니다."""
+        stream = self.llm.create_structured_partial(GeminiExamplePrompt, STRUCTURED_STATIC_PROMPT, user_prompt)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.gemini_structured_timeout_seconds
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    partial = await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                yield partial
+        finally:
+            await stream.aclose()
+
+def _structured_error(e: Exception) -> Exception:
+    """구조화된 분석 호출 오류를 사용자에게 보여줄 메시지의 예외로 바꿉니다."""
+    error_msg = str(e)
+    if "429" in error_msg or "quota" in error_msg.lower():
+        return Exception("API 할당량이 소진되었습니다. 잠시 후 다시 시도해주세요.")
+    elif "API_KEY" in error_msg:
+        return Exception("API 키가 설정되지 않았습니다. 환경변수를 확인해주세요.")
+    else:
+        return Exception(f"구조화된 분석 중 오류가 발생했습니다: {error_msg}")
+
+def get_gemini_metrics() -> Dict[str, Any]:
+    """Gemini 호출 지표: 속도 제한기(토큰/대기열/동시 실행/429 재시도), 추천 캐시, LLM 백엔드(컨텍스트 캐시/대역 호출 수) 통계"""
+    cache = get_recommendation_cache()
+    return {
+        "rate_limiter": get_gemini_rate_limiter().stats(),
+        "recommendation_cache": cache.stats() if cache else None,
+        "llm": _consultant.llm.stats() if _consultant is not None else None,
+    }
+
+def is_valid_verdict(result: str) -> bool:
+    """오류 메시지가 아닌 퍼스널 컬러 판정 결과인지 확인합니다."""
+    valid_keywords = ["Spring", "Summer", "Autumn", "Winter"]
+    return any(keyword in result for keyword in valid_keywords) and "오류" not in result
+
+# 프로세스 전역 Gemini 상담 인스턴스
+_consultant: Optional[GeminiColorConsultant] = None
+_consultant_lock = threading.Lock()
+
+def get_gemini_consultant() -> GeminiColorConsultant:
+    """공유 GeminiColorConsultant 인스턴스를 반환합니다. (처음 호출 시 한 번만 생성)"""
+    global _consultant
+    if _consultant is None:
+        with _consultant_lock:
+            if _consultant is None:
+                _consultant = GeminiColorConsultant()
+    return _consultant
 
 # 서비스 함수
 async def analyze_personal_color(face_color_data: Dict[str, Any], user_id: int, db: Session) -> str:
@@ -370,13 +436,25 @@ async def analyze_personal_color(face_color_data: Dict[str, Any], user_id: int,
     Returns:
         str: 퍼스널 컬러 분석 결과
     """
-    consultant = GeminiColorConsultant()
-    # 전체 face_color_data를 전달하여 final_analysis도 포함되도록 함
-    result = await consultant.get_personal_color_analysis(face_color_data)
+    result = None
+    mode = settings.personal_color_classifier
+    if mode != "gemini":
+        # 로컬 분류기로 먼저 판정하고, 신뢰도가 낮을 때만 Gemini에 요청 (hybrid)
+        classification = get_personal_color_classifier().classify(face_color_data)
+        if classification["label"] and (mode == "local" or classification["confidence"] >= settings.personal_color_confidence_threshold):
+            result = classification["label"]
+            logger.info(f"Personal color classified locally: {result} (confidence {classification['confidence']})")
+        else:
+            logger.info(f"Local classification not accepted (confidence {classification['confidence']}, "
+                        f"distance {classification.get('distance')}, reason {classification.get('reason')}), escalating to Gemini")
+
+    if result is None:
+        consultant = get_gemini_consultant()
+        # 전체 face_color_data를 전달하여 final_analysis도 포함되도록 함
+        result = await consultant.get_personal_color_analysis(face_color_data)
     
     # 유효한 퍼스널 컬러 결과인지 확인 후 DB에 저장
-    valid_keywords = ["Spring", "Summer", "Autumn", "Winter"]
-    if any(keyword in result for keyword in valid_keywords) and "오류" not in result:
+    if is_valid_verdict(result):
         create_user_personal_color_in_db(db, user_id, result)
     
     return result
@@ -394,13 +472,141 @@ async def structured_personal_color_analysis(
     Returns:
         GeminiExamplePrompt: 구조화된 분석 결과
     """
-    consultant = GeminiColorConsultant()
+    consultant = get_gemini_consultant()
+    cache = get_recommendation_cache()
+    styling_summary = get_styling_summary_by_id(db, user_id) if cache else None
+    if styling_summary is None:
+        # 캐시를 쓰지 않거나 스타일 요약이 없는 경우 (없으면 create_analyze_structured에서 404)
+        return await consultant.get_personal_color_structured(user_id, db)
+
+    # 프롬프트 입력이 그대로면 이전 결과 재사용
+    fingerprint = _recommendation_fingerprint(db, user_id, styling_summary)
+    cached, fresh = cache.get(user_id, fingerprint)
+    if cached is not None:
+        if not fresh:
+            # stale-while-revalidate: 이전 결과를 바로 반환하고 백그라운드에서 새로 생성
+            cache.refresh_in_background(user_id, lambda: _refresh_recommendations(user_id))
+        return cached.model_copy(deep=True)
+
     result = await consultant.get_personal_color_structured(
         user_id,
         db
     )
+    cache.put(user_id, fingerprint, result.model_copy(deep=True))
     return result
 
+def current_recommendation_fingerprint(db: Session, user_id: int) -> Optional[str]:
+    """사용자의 현재 추천 입력 지문 (스타일 요약이 없으면 None)"""
+    styling_summary = get_styling_summary_by_id(db, user_id)
+    if styling_summary is None:
+        return None
+    return _recommendation_fingerprint(db, user_id, styling_summary)
+
+def _recommendation_fingerprint(db: Session, user_id: int, styling_summary) -> str:
+    """추천 프롬프트 입력(스타일 요약 + 현재 퍼스널 컬러)의 지문"""
+    user = get_user_by_id(db, user_id)
+    return recommendation_fingerprint(styling_summary, user.personal_color_name if user else None)
+
+async def _refresh_recommendations(user_id: int):
+    """백그라운드 갱신: 요청의 DB 세션은 이미 닫혔을 수 있으므로 새 세션을 사용합니다."""
+    from db.user_session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        styling_summary = get_styling_summary_by_id(db, user_id)
+        if styling_summary is None:
+            return
+        fingerprint = _recommendation_fingerprint(db, user_id, styling_summary)
+        result = await get_gemini_consultant().get_personal_color_structured(user_id, db)
+        get_recommendation_cache().put(user_id, fingerprint, result)
+    finally:
+        db.close()
+
+def _flatten_looks(recommendations: Any) -> List[Tuple[Optional[str], Any]]:
+    """(부분) 추천 결과의 룩들을 응답 순서대로 (style_name, look) 리스트로 펼칩니다."""
+    flat = []
+    for recommendation in (recommendations.recommendations or []):
+        for look in (getattr(recommendation, "looks", None) or []):
+            flat.append((recommendation.style_name, look))
+    return flat
+
+async def structured_look_stream(user_id: int,
+                                 db : Session) -> AsyncIterator[Tuple[str, LookInfo]]:
+    """
+    구조화된 추천을 스트리밍으로 받아, 완성된 룩을 (style_name, LookInfo)로 하나씩 내보냅니다.
+    JSON은 순서대로 생성되므로 다음 룩(또는 다음 스타일의 룩)이 나타나면 앞의 룩은 완성된 것으로 보고,
+    마지막 룩은 스트림이 끝난 뒤 내보냅니다.
+    도중에 검증에 실패한 룩은 스트림이 끝난 뒤 최종 결과의 같은 위치 룩으로 다시 내보냅니다.
+    추천 캐시에 결과가 있으면 Gemini를 호출하지 않고 캐시된 룩을 바로 내보내며,
+    스트리밍으로 받은 최종 결과는 캐시에 저장합니다.
+    """
+    cache = get_recommendation_cache()
+    styling_summary = get_styling_summary_by_id(db, user_id) if cache else None
+    fingerprint = None
+    if styling_summary is not None:
+        fingerprint = _recommendation_fingerprint(db, user_id, styling_summary)
+        cached, fresh = cache.get(user_id, fingerprint)
+        if cached is not None:
+            if not fresh:
+                cache.refresh_in_background(user_id, lambda: _refresh_recommendations(user_id))
+            for style_name, look in _flatten_looks(cached):
+                yield style_name, look.model_copy(deep=True)
+            return
+
+    emitted = 0
+    skipped: List[int] = []  # 도중에 검증에 실패한 룩 위치
+    last_partial = None
+    async for partial in get_gemini_consultant().stream_personal_color_structured(user_id, db):
+        last_partial = partial
+        flat = _flatten_looks(partial)
+        # 마지막 룩은 아직 생성 중일 수 있으므로 그 앞까지만 내보냄
+        while emitted < len(flat) - 1:
+            style_name, look = flat[emitted]
+            emitted += 1
+            try:
+                yield style_name, LookInfo.model_validate(look.model_dump())
+            except ValidationError as e:
+                skipped.append(emitted - 1)
+                logger.warning(f"Deferring incomplete look until the stream ends: {e}")
+
+    if last_partial is None:
+        raise Exception("구조화된 분석 중 오류가 발생했습니다: 빈 응답")
+    try:
+        result = GeminiExamplePrompt.model_validate(last_partial.model_dump())
+    except ValidationError as e:
+        raise Exception(f"응답 파싱 중 오류가 발생했습니다: {e}")
+
+    flat = _flatten_looks(result)
+    for index in skipped + list(range(emitted, len(flat))):
+        if index < len(flat):
+            yield flat[index]
+    if fingerprint is not None:
+        cache.put(user_id, fingerprint, result.model_copy(deep=True))
+
+async def structured_crawling_task_stream(user_id: int,
+                                          db : Session) -> AsyncIterator[Tuple[LookInfo, List[CrawlingTask]]]:
+    """완성된 룩마다 (LookInfo, 해당 룩의 크롤링 작업 리스트)를 내보냅니다."""
+    async for style_name, look in structured_look_stream(user_id, db):
+        yield look, extract_look_tasks(style_name, look)
+
+def extract_look_tasks(style_name: str, look: LookInfo) -> List[CrawlingTask]:
+    """룩 하나에서 크롤링 작업을 추출합니다. (필수 필드가 빠진 아이템은 건너뜀)"""
+    tasks = []
+    for item_info in look.items.values():
+        if item_info and item_info.category_id and item_info.item_code and item_info.color:
+            # 필수 필드들이 모두 존재하는 경우에만 작업 생성
+            task = CrawlingTask(
+                category_id=item_info.category_id,
+                item_code=item_info.item_code,
+                color=item_info.color,
+                style_name=style_name,
+                look_name=look.look_name
+            )
+            tasks.append(task)
+        else : 
+            logger.warning(f"Skipping item due to missing info: {item_info}")
+    return tasks
+
 # 스키마를 기반으로 데이터를 추출하는 함수
 def extract_crawling_tasks(parsed_data: GeminiExamplePrompt) -> List[CrawlingTask]:
     """
@@ -416,17 +622,5 @@ def extract_crawling_tasks(parsed_data: GeminiExamplePrompt) -> List[CrawlingTas
     tasks = []
     for recommendation in parsed_data.recommendations:
         for look in recommendation.looks:
-            for item_info in look.items.values():
-                if item_info and item_info.category_id and item_info.item_code and item_info.color:
-                    # 필수 필드들이 모두 존재하는 경우에만 작업 생성
-                    task = CrawlingTask(
-                        category_id=item_info.category_id,
-                        item_code=item_info.item_code,
-                        color=item_info.color,
-                        style_name=recommendation.style_name,
-                        look_name=look.look_name
-                    )
-                    tasks.append(task)
-                else : 
-                    logger.warning(f"Skipping item due to missing info: {item_info}")
-    return tasks
\ No newline at end of file
+            tasks.extend(extract_look_tasks(recommendation.style_name, look))
+    return tasks
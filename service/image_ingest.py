@@ -0,0 +1,75 @@
+# 업로드 이미지 수신/디코딩
+# 업로드 최대 크기는 요청 본문 단계(core/upload_limit.py의 UploadSizeLimitMiddleware)에서 강제하고,
+# JPEG은 draft 모드로 작업 해상도 근처까지 축소 디코딩하여 원본 해상도 배열을 만들지 않습니다.
+
+import io
+import math
+from typing import Optional
+
+from fastapi import UploadFile, HTTPException
+from PIL import Image, UnidentifiedImageError
+
+from core.config import settings
+from core.upload_limit import too_large_detail
+
+
+async def read_upload_limited(file: UploadFile,
+                              max_bytes: Optional[int] = None,
+                              chunk_size: Optional[int] = None) -> bytes:
+    """
+    업로드 파일(이미 받아 둔 임시 파일)을 청크 단위로 읽어 바이트로 반환합니다.
+    요청 본문 크기는 UploadSizeLimitMiddleware가 먼저 제한하고, 여기서는 파일 자체의 크기를 다시 확인합니다.
+    (파일 하나가 최대 크기를 넘으면 413)
+    """
+    max_bytes = max_bytes or settings.upload_max_bytes
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    # 크기를 미리 알 수 있으면 읽기 전에 거절
+    if getattr(file, "size", None) and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+        buffer.extend(chunk)
+
+    if not buffer:
+        raise HTTPException(status_code=400, detail="빈 파일입니다. 이미지 파일을 업로드해주세요.")
+    return bytes(buffer)
+
+
+def decode_image(contents: bytes, max_side: Optional[int] = None) -> Image.Image:
+    """
+    이미지 바이트를 RGB PIL 이미지로 디코딩합니다.
+
+    max_side가 주어지면 긴 변이 max_side 이상인 범위에서 최대한 작게 디코딩합니다.
+    - JPEG: draft()로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코딩 (RGB로 바로 디코딩)
+    - 그 외: reduce()로 정수 배율 박스 축소
+    최종 크기 조정은 FaceColorExtractor.cap_resolution에서 수행합니다.
+    """
+    try:
+        image = Image.open(io.BytesIO(contents))
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=400, detail="이미지 파일을 읽을 수 없습니다. JPG 또는 PNG 파일을 업로드해주세요.")
+
+    width, height = image.size
+    if width * height > settings.upload_max_pixels:
+        raise HTTPException(status_code=413, detail="이미지 해상도가 너무 큽니다. 더 작은 사진을 사용해주세요.")
+
+    if max_side and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        target_size = (math.ceil(width * scale), math.ceil(height * scale))
+        if image.format == "JPEG":
+            image.draft("RGB", target_size)
+        else:
+            factor = min(width // target_size[0], height // target_size[1])
+            if factor >= 2:
+                image = image.reduce(factor)
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
@@ -0,0 +1,151 @@
+# 추론 실행기
+# 얼굴 파싱, OpenCV, KMeans, matplotlib 같은 CPU 작업을 이벤트 루프 밖(스레드/프로세스 풀)에서 실행합니다.
+
+import asyncio
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor
+from typing import Callable, Optional, Dict, Any, Tuple
+
+from fastapi import HTTPException
+
+
+def _call_catching_http_errors(fn: Callable, *args) -> Tuple[str, Any]:
+    """
+    워커에서 함수를 실행하고 HTTPException을 (상태코드, 메시지) 형태로 변환합니다.
+    프로세스 풀에서는 HTTPException이 그대로 피클링되지 않으므로 결과 튜플로 전달합니다.
+    """
+    try:
+        return "ok", fn(*args)
+    except HTTPException as e:
+        return "http_error", (e.status_code, e.detail)
+
+
+class InferenceExecutor:
+    def __init__(self,
+                 kind: str = "thread",
+                 workers: int = 2,
+                 max_queue: int = 16,
+                 initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        """
+        추론 실행기 초기화
+
+        Args:
+            kind: "thread"(모델 공유, 스레드 풀) 또는 "process"(워커 프로세스마다 모델 로드)
+            workers: 워커 수
+            max_queue: 실행 중인 작업 외에 대기할 수 있는 최대 작업 수 (초과 시 503)
+            initializer: 워커 초기화 함수 (프로세스 풀에서 모델 사전 로드용)
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 실행기 종류입니다: {kind}")
+
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.ready = kind == "thread"
+
+        if kind == "process":
+            self._pool: Executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference",
+                initializer=initializer,
+                initargs=initargs,
+            )
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._metrics = {
+            "submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0,
+            "total_seconds": 0.0, "max_seconds": 0.0,
+        }
+
+    def prestart(self, fn: Callable, timeout: Optional[float] = None):
+        """워커마다 fn을 한 번씩 실행해 미리 기동합니다. (프로세스 풀의 모델 로드를 시작 시점에 끝내기 위함)"""
+        futures = [self._pool.submit(fn) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=timeout)
+        self.ready = True
+
+    async def run(self, fn: Callable, *args):
+        """
+        fn(*args)를 풀에서 실행하고 결과를 기다립니다.
+        대기열이 가득 차면 즉시 503을 반환하여 요청이 무한정 쌓이지 않도록 합니다.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._metrics["rejected"] += 1
+                raise HTTPException(status_code=503, detail="현재 분석 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+            self._pending += 1
+            self._metrics["submitted"] += 1
+
+        started = time.perf_counter()
+        try:
+            future = self._pool.submit(_call_catching_http_errors, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # 대기열 자리는 요청이 취소되더라도 워커가 실제로 끝났을 때(또는 시작 전에 취소되었을 때) 반납
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            status, value = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # 연결 끊김/시간 초과 등으로 요청이 취소됨 (시작 전이면 풀 작업도 함께 취소됨)
+            self._record(started, "cancelled")
+            raise
+        except Exception:
+            self._record(started, "failed")
+            raise
+
+        if status == "http_error":
+            self._record(started, "failed")
+            status_code, detail = value
+            raise HTTPException(status_code=status_code, detail=detail)
+
+        self._record(started, "completed")
+        return value
+
+    def _release(self):
+        """대기열 자리를 반납합니다."""
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, started: float, outcome: str):
+        """요청 종료 시 지표를 갱신합니다. (outcome: completed / failed / cancelled)"""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics[outcome] += 1
+            self._metrics["total_seconds"] += elapsed
+            self._metrics["max_seconds"] = max(self._metrics["max_seconds"], elapsed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """실행기 지표를 반환합니다."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            pending = self._pending
+        finished = metrics["completed"] + metrics["failed"] + metrics["cancelled"]
+        metrics["avg_seconds"] = round(metrics["total_seconds"] / finished, 4) if finished else 0.0
+        metrics["total_seconds"] = round(metrics["total_seconds"], 4)
+        metrics["max_seconds"] = round(metrics["max_seconds"], 4)
+        metrics.update({
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": pending,
+            "queued": max(0, pending - self.workers),
+            "ready": self.ready,
+        })
+        return metrics
+
+    def shutdown(self):
+        """풀을 종료합니다."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,78 @@
+# 세그멘테이션 마스크 라벨 인덱스
+# 마스크를 한 번만 정렬해 두고, 임의의 라벨 집합에 해당하는 픽셀 위치를 전체 이미지 재탐색 없이 꺼내 씁니다.
+
+import numpy as np
+from typing import Iterable, Tuple, Optional
+
+
+class LabelIndex:
+    def __init__(self, mask: np.ndarray, offset: Tuple[int, int] = (0, 0), frame_mask: Optional[np.ndarray] = None):
+        """
+        라벨 인덱스 생성 (이미지당 한 번)
+
+        평탄화한 마스크를 라벨 순으로 안정 정렬(stable argsort)하고, bincount로 라벨별 개수와
+        시작 오프셋을 구해 둡니다. 라벨 값이 작은 정수이므로 uint8로 변환해 radix 정렬을 사용합니다.
+        같은 라벨 내부의 위치는 원래의 래스터 순서를 유지합니다.
+
+        Args:
+            mask: 인덱싱할 마스크 (전체 또는 얼굴 영역만 잘라낸 부분)
+            offset: mask가 잘라낸 부분일 때 전체 마스크에서의 (top, left) 위치
+            frame_mask: 잘라내기 전 전체 마스크 (캐시 저장, 좌표 변환용)
+        """
+        if mask.dtype != np.uint8:
+            mask = mask.astype(np.uint8)
+        self.mask = mask
+        self.shape = mask.shape
+        self.offset = offset
+        self.frame_mask = frame_mask if frame_mask is not None else mask
+        self.frame_shape = self.frame_mask.shape
+
+        flat = mask.ravel()
+        self.counts = np.bincount(flat)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self.order = np.argsort(flat, kind="stable")
+
+    def count(self, label_ids: Iterable[int]) -> int:
+        """라벨 집합에 속한 픽셀 수"""
+        return int(sum(self.counts[label] for label in label_ids if label < len(self.counts)))
+
+    def has(self, label: int) -> bool:
+        """해당 라벨의 픽셀이 하나라도 있는지 여부"""
+        return label < len(self.counts) and self.counts[label] > 0
+
+    def indices(self, label_ids: Iterable[int]) -> np.ndarray:
+        """라벨 집합에 속한 픽셀의 평탄화 인덱스 (래스터 순서)"""
+        slices = [self.order[self.offsets[label]:self.offsets[label + 1]]
+                  for label in label_ids if label < len(self.counts)]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        if len(slices) == 1:
+            return slices[0]
+        return np.sort(np.concatenate(slices))
+
+    def pixels(self, image: np.ndarray, label_ids: Iterable[int]) -> np.ndarray:
+        """이미지 (H, W, C)에서 라벨 집합에 속한 픽셀 (N, C)를 꺼냅니다."""
+        return image.reshape(-1, image.shape[-1])[self.indices(label_ids)]
+
+    def part_mask(self, label_ids: Iterable[int]) -> np.ndarray:
+        """라벨 집합에 대한 불리언 마스크 (H, W)"""
+        part_mask = np.zeros(self.mask.size, dtype=bool)
+        part_mask[self.indices(label_ids)] = True
+        return part_mask.reshape(self.shape)
+
+    def bbox(self, label_ids: Iterable[int]) -> Optional[Tuple[int, int, int, int]]:
+        """라벨 집합을 감싸는 경계 상자 (y_min, y_max, x_min, x_max), 픽셀이 없으면 None"""
+        indices = self.indices(label_ids)
+        if len(indices) == 0:
+            return None
+        rows, cols = np.divmod(indices, self.shape[1])
+        return int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max())
+
+    def crop_mask(self, label_ids: Iterable[int], bbox: Tuple[int, int, int, int]) -> np.ndarray:
+        """경계 상자 영역만 담은 uint8 마스크 (해당 라벨 255, 나머지 0)를 전체 크기 마스크 없이 만듭니다."""
+        y_min, y_max, x_min, x_max = bbox
+        crop = np.zeros((y_max - y_min + 1, x_max - x_min + 1), dtype=np.uint8)
+        rows, cols = np.divmod(self.indices(label_ids), self.shape[1])
+        inside = (rows >= y_min) & (rows <= y_max) & (cols >= x_min) & (cols <= x_max)
+        crop[rows[inside] - y_min, cols[inside] - x_min] = 255
+        return crop
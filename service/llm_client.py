@@ -0,0 +1,335 @@
+# LLM 호출 클라이언트
+# GeminiColorConsultant가 사용하는 LLM 호출을 백엔드로 분리합니다. 설정(llm_backend)으로 선택합니다.
+#
+#   - gemini : 실제 Gemini API (google.generativeai + instructor), 선택 시에만 import
+#   - fake   : 로컬 대역. 스키마에 맞는 무작위(또는 고정 파일) 추천과 퍼스널 컬러 판정을 반환하며,
+#              지연 시간 분포와 429 오류 비율을 설정할 수 있어 Gemini 할당량 없이 부하/지연 시간을 측정할 수 있습니다.
+#
+# 백엔드는 다음 메서드를 제공합니다.
+#   async generate_text(prompt) -> str
+#   async create_structured(response_model, static_prompt, user_prompt) -> response_model
+#   create_structured_partial(response_model, static_prompt, user_prompt) -> 부분 결과 async iterator
+#   stats() -> dict
+#
+# 속도 제한, 시간 제한, 재시도는 백엔드와 관계없이 gemini_service에서 처리합니다.
+
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import datetime
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from core.config import settings
+from schemas.gemini_schema import GeminiExamplePrompt, StyleRecommendation, LookInfo, ItemInfo
+from schemas.catalog import CATEGORIES, COLOR_CODES, style_map
+from service.personal_color_classifier import PERSONAL_COLOR_TYPES
+
+logger = logging.getLogger()
+
+SUPPORTED_LLM_BACKENDS = ("gemini", "fake")
+
+GEMINI_MODEL_NAME = "models/gemini-2.5-flash"
+
+
+class StructuredContextCache:
+    def __init__(self, model_name: str, system_instruction: str, ttl_seconds: int = 3600, retry_seconds: float = 600.0):
+        """
+        구조화된 추천 프롬프트 고정 앞부분의 Gemini 컨텍스트 캐시 (genai.caching.CachedContent)
+        고정 앞부분을 캐시의 system_instruction으로 한 번 올려 두고, 호출마다 사용자별 부분만 보냅니다.
+        캐시를 만들 수 없는 경우(최소 토큰 수 미달, 미지원 모델/요금제 등)에는 None을 반환하여
+        호출하는 쪽이 전체 프롬프트로 보내게 하고, retry_seconds 동안은 다시 시도하지 않습니다.
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._client = None
+        self._expires_at = 0.0
+        self._disabled_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.created = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def _create(self):
+        """캐시를 만들고 그 캐시를 쓰는 instructor 클라이언트를 반환합니다. (동기 API이므로 스레드에서 실행)"""
+        import google.generativeai as genai
+        import instructor
+        from google.generativeai import caching
+
+        cached_content = caching.CachedContent.create(
+            model=self.model_name,
+            display_name="structured-recommendation-prefix",
+            system_instruction=self.system_instruction,
+            ttl=datetime.timedelta(seconds=self.ttl_seconds),
+        )
+        return instructor.from_gemini(
+            client=genai.GenerativeModel.from_cached_content(cached_content=cached_content),
+            use_async=True,
+        )
+
+    async def get_client(self):
+        """유효한 캐시 클라이언트, 쓸 수 없으면 None (만료 1분 전부터 새로 만듦)"""
+        now = time.time()
+        if self._client is not None and now < self._expires_at - 60:
+            return self._client
+        if now < self._disabled_until:
+            return None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.time()
+            if self._client is not None and now < self._expires_at - 60:
+                return self._client
+            try:
+                self._client = await asyncio.to_thread(self._create)
+                self._expires_at = now + self.ttl_seconds
+                self.created += 1
+                logger.info("구조화된 추천 프롬프트 컨텍스트 캐시를 만들었습니다.")
+                return self._client
+            except Exception as e:
+                self._client = None
+                self.failures += 1
+                self.last_error = str(e)
+                self._disabled_until = now + self.retry_seconds
+                logger.warning(f"컨텍스트 캐시를 만들 수 없어 전체 프롬프트로 보냅니다: {e}")
+                return None
+
+    def stats(self) -> Dict[str, Any]:
+        """컨텍스트 캐시 상태"""
+        return {
+            "enabled": settings.gemini_context_cache_enabled,
+            "active": self._client is not None and time.time() < self._expires_at,
+            "created": self.created,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class GeminiLLMClient:
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str]):
+        """
+        실제 Gemini API 클라이언트
+        모델 클라이언트가 내부 HTTP 연결을 유지하므로 요청마다 연결을 새로 맺지 않으며,
+        비동기 API를 사용하므로 응답을 기다리는 동안 이벤트 루프를 막지 않습니다.
+        """
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+
+        import google.generativeai as genai
+        import instructor
+
+        genai.configure(api_key=api_key)
+        self.text_model = genai.GenerativeModel('gemini-2.5-flash')
+        self.structured_model = instructor.from_gemini(
+            client=genai.GenerativeModel(model_name=GEMINI_MODEL_NAME),
+            use_async=True,
+        )
+        # 구조화된 추천 프롬프트 고정 앞부분의 컨텍스트 캐시 (settings.gemini_context_cache_enabled일 때, 첫 호출 시 생성)
+        self.context_cache: Optional[StructuredContextCache] = None
+
+    async def generate_text(self, prompt: str) -> str:
+        response = await self.text_model.generate_content_async(prompt)
+        return response.text
+
+    async def _structured_request(self, static_prompt: str, user_prompt: str):
+        """
+        (instructor 클라이언트, 프롬프트)
+        컨텍스트 캐시를 쓸 수 있으면 캐시를 쓰는 클라이언트와 사용자별 부분만, 아니면 기본 클라이언트와 전체 프롬프트
+        """
+        if settings.gemini_context_cache_enabled:
+            if self.context_cache is None or self.context_cache.system_instruction != static_prompt:
+                self.context_cache = StructuredContextCache(
+                    GEMINI_MODEL_NAME,
+                    static_prompt,
+                    ttl_seconds=settings.gemini_context_cache_ttl_seconds,
+                )
+            client = await self.context_cache.get_client()
+            if client is not None:
+                return client, user_prompt
+        return self.structured_model, static_prompt + user_prompt
+
+    async def create_structured(self, response_model, static_prompt: str, user_prompt: str):
+        client, prompt = await self._structured_request(static_prompt, user_prompt)
+        return await client.create(
+            response_model=response_model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+
+    async def create_structured_partial(self, response_model, static_prompt: str, user_prompt: str) -> AsyncIterator[Any]:
+        client, prompt = await self._structured_request(static_prompt, user_prompt)
+        stream = client.create_partial(
+            response_model=response_model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        try:
+            async for partial in stream:
+                yield partial
+        finally:
+            await stream.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "context_cache": self.context_cache.stats() if self.context_cache else {"enabled": settings.gemini_context_cache_enabled, "active": False},
+        }
+
+
+class FakeRateLimitError(Exception):
+    """대역 클라이언트가 주입하는 429 오류 (메시지로 gemini_rate_limiter의 429 판별에 걸림)"""
+
+
+class FakeLLMClient:
+    name = "fake"
+
+    def __init__(self,
+                 text_latency_ms: float = 1500.0,
+                 structured_latency_ms: float = 20000.0,
+                 latency_sigma: float = 0.3,
+                 rate_limit_rate: float = 0.0,
+                 seed: Optional[int] = None,
+                 canned_path: Optional[str] = None):
+        """
+        로컬 LLM 대역
+
+        Args:
+            text_latency_ms: 퍼스널 컬러 판정 응답 지연 시간의 중앙값(ms)
+            structured_latency_ms: 코디 추천 전체 응답 지연 시간의 중앙값(ms)
+            latency_sigma: 로그 정규 분포의 표준편차 (0이면 항상 중앙값, 클수록 꼬리가 긺)
+            rate_limit_rate: 호출이 429 오류로 실패할 확률 (0~1)
+            seed: 난수 시드 (같은 시드면 같은 순서의 응답/지연 시간)
+            canned_path: 코디 추천으로 항상 반환할 GeminiExamplePrompt JSON 파일 (없으면 카탈로그에서 무작위 생성)
+        """
+        self.text_latency_ms = text_latency_ms
+        self.structured_latency_ms = structured_latency_ms
+        self.latency_sigma = latency_sigma
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.canned: Optional[GeminiExamplePrompt] = None
+        if canned_path:
+            with open(canned_path, encoding="utf-8") as f:
+                self.canned = GeminiExamplePrompt.model_validate(json.load(f))
+        self.calls = {"text": 0, "structured": 0}
+        self.injected_429 = 0
+
+    def _latency(self, median_ms: float) -> float:
+        """로그 정규 분포 지연 시간(초)"""
+        return median_ms / 1000.0 * math.exp(self.random.gauss(0.0, self.latency_sigma))
+
+    def _maybe_rate_limit(self):
+        if self.rate_limit_rate > 0 and self.random.random() < self.rate_limit_rate:
+            self.injected_429 += 1
+            raise FakeRateLimitError("429 Resource has been exhausted (e.g. check quota). [fake]")
+
+    async def generate_text(self, prompt: str) -> str:
+        """퍼스널 컬러 판정: 같은 프롬프트(같은 색)에는 같은 타입을 반환"""
+        self.calls["text"] += 1
+        await asyncio.sleep(self._latency(self.text_latency_ms))
+        self._maybe_rate_limit()
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        return PERSONAL_COLOR_TYPES[digest % len(PERSONAL_COLOR_TYPES)]
+
+    def _random_look(self, style_name: str, index: int, female: bool) -> LookInfo:
+        """카탈로그 코드로 스키마에 맞는 룩 하나를 만듭니다."""
+        categories = {category["name"]: category for category in CATEGORIES}
+        names = ["아우터", "상의", "하의", "신발"]
+        if female and self.random.random() < 0.3:
+            names = ["아우터", "원피스/스커트", "신발"]
+
+        items: Dict[str, Optional[ItemInfo]] = {}
+        for name in names:
+            category = categories[name]
+            item_name, item_code = self.random.choice(list(category["items"].items()))
+            items[name] = ItemInfo(
+                category=item_name,
+                item_code=item_code,
+                category_id=category["code"],
+                color=self.random.choice(COLOR_CODES),
+            )
+        return LookInfo(
+            look_name=f"{style_name} 룩 {index + 1}",
+            look_description=f"{style_name} 무드의 데일리 코디 {index + 1}",
+            items=items,
+        )
+
+    def _random_recommendations(self, user_prompt: str) -> GeminiExamplePrompt:
+        """사용자별 프롬프트의 선호 스타일/성별을 읽어 스타일당 룩 3개를 만듭니다."""
+        match = re.search(r"선호 스타일:\s*(.+)", user_prompt)
+        styles = [style.strip() for style in match.group(1).split(",")] if match else []
+        styles = [style for style in styles if style in style_map]
+        if not styles:
+            styles = self.random.sample(list(style_map), 2)
+        female = re.search(r"성별:\s*여", user_prompt) is not None
+
+        return GeminiExamplePrompt(recommendations=[
+            StyleRecommendation(style_name=style, looks=[self._random_look(style, i, female) for i in range(3)])
+            for style in styles
+        ])
+
+    def _recommendations(self, user_prompt: str) -> GeminiExamplePrompt:
+        if self.canned is not None:
+            return self.canned.model_copy(deep=True)
+        return self._random_recommendations(user_prompt)
+
+    async def create_structured(self, response_model, static_prompt: str, user_prompt: str):
+        self.calls["structured"] += 1
+        await asyncio.sleep(self._latency(self.structured_latency_ms))
+        self._maybe_rate_limit()
+        return response_model.model_validate(self._recommendations(user_prompt).model_dump())
+
+    async def create_structured_partial(self, response_model, static_prompt: str, user_prompt: str) -> AsyncIterator[Any]:
+        """
+        전체 지연 시간의 15%를 첫 응답까지, 나머지를 룩마다 나눠 기다리며 룩이 하나씩 늘어나는 부분 결과를 내보냅니다.
+        """
+        self.calls["structured"] += 1
+        total = self._latency(self.structured_latency_ms)
+        await asyncio.sleep(total * 0.15)
+        self._maybe_rate_limit()
+
+        result = self._recommendations(user_prompt)
+        look_count = sum(len(recommendation.looks) for recommendation in result.recommendations) or 1
+        received: List[Dict[str, Any]] = []
+        for recommendation in result.recommendations:
+            received.append({"style_name": recommendation.style_name, "looks": []})
+            for look in recommendation.looks:
+                await asyncio.sleep(total * 0.85 / look_count)
+                received[-1]["looks"].append(look.model_dump())
+                yield response_model.model_validate({"recommendations": received})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "calls": dict(self.calls),
+            "injected_429": self.injected_429,
+            "text_latency_ms": self.text_latency_ms,
+            "structured_latency_ms": self.structured_latency_ms,
+            "latency_sigma": self.latency_sigma,
+            "rate_limit_rate": self.rate_limit_rate,
+            "canned": self.canned is not None,
+        }
+
+
+def create_llm_client(kind: str, api_key: Optional[str] = None):
+    """설정 값에 맞는 LLM 클라이언트를 생성합니다."""
+    if kind not in SUPPORTED_LLM_BACKENDS:
+        raise ValueError(f"지원하지 않는 LLM 백엔드입니다: {kind} (사용 가능: {', '.join(SUPPORTED_LLM_BACKENDS)})")
+
+    if kind == "gemini":
+        return GeminiLLMClient(api_key)
+
+    logger.warning("LLM 대역(fake) 백엔드를 사용합니다. 실제 Gemini를 호출하지 않습니다.")
+    return FakeLLMClient(
+        text_latency_ms=settings.fake_llm_text_latency_ms,
+        structured_latency_ms=settings.fake_llm_structured_latency_ms,
+        latency_sigma=settings.fake_llm_latency_sigma,
+        rate_limit_rate=settings.fake_llm_rate_limit_rate,
+        seed=settings.fake_llm_seed,
+        canned_path=settings.fake_llm_canned_path,
+    )
@@ -0,0 +1,181 @@
+# 퍼스널 컬러 판정 결과 캐시
+# 피부/머리카락/눈의 대표 색을 CIELAB 격자(bin)로 양자화한 키로 Gemini 판정 결과를 저장합니다.
+# 색이 거의 같은 사용자는 같은 키가 되므로 Gemini 호출 없이 이전 판정을 재사용합니다.
+#
+# 메모리 LRU(크기/TTL 제한) -> 선택적 SQL 테이블(personal_color_verdict_cache) 순으로 조회합니다.
+# 비동기 코드에서는 aget/aput을 사용합니다. (SQL 조회/저장은 스레드에서 실행하여 이벤트 루프를 막지 않음)
+
+import asyncio
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from core.config import settings
+from service.color_space import hex_to_lab
+from service.ttl_cache import TTLCache
+
+# 판정에 사용하는 부위 (지배색 1순위만 사용)
+VERDICT_PARTS = ("skin", "hair", "eyes")
+
+
+def quantize_color_key(hex_codes_data: Dict[str, List[str]], bin_size: Optional[float] = None) -> Optional[str]:
+    """
+    부위별 1순위 HEX 코드를 Lab 격자 좌표로 양자화한 키를 만듭니다. 피부 색이 없으면 None
+    예) "skin:18,3,5|hair:4,0,1|eyes:-"
+    """
+    bin_size = bin_size or settings.personal_color_cache_bin_size
+    if not hex_codes_data.get("skin"):
+        return None
+
+    parts = []
+    for part in VERDICT_PARTS:
+        hex_codes = hex_codes_data.get(part)
+        if not hex_codes:
+            parts.append(f"{part}:-")
+            continue
+        bins = np.floor(hex_to_lab(hex_codes[0]) / bin_size).astype(int)
+        parts.append(f"{part}:{','.join(str(v) for v in bins)}")
+    return "|".join(parts)
+
+
+class PersonalColorVerdictCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 7 * 24 * 3600, use_sql: bool = False):
+        """
+        판정 캐시 초기화
+
+        Args:
+            max_entries: 메모리 LRU 최대 항목 수
+            ttl_seconds: 항목 만료 시간(초)
+            use_sql: SQL 테이블에도 저장/조회 (여러 워커/재시작 간 공유)
+        """
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.use_sql = use_sql
+        self.sql_hits = 0
+        self.sql_errors = 0
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def _ensure_table(self):
+        """캐시 테이블이 없으면 생성합니다. (프로세스당 한 번)"""
+        if self._table_ready:
+            return
+        with self._table_lock:
+            if not self._table_ready:
+                from db.user_session import engine
+                from model.user_model import PersonalColorVerdict
+                PersonalColorVerdict.__table__.create(bind=engine, checkfirst=True)
+                self._table_ready = True
+
+    def _sql_get(self, cache_key: str) -> Optional[str]:
+        from db.user_session import SessionLocal
+        from model.user_model import PersonalColorVerdict
+
+        self._ensure_table()
+        db = SessionLocal()
+        try:
+            row = db.query(PersonalColorVerdict).filter(PersonalColorVerdict.cache_key == cache_key).first()
+            if row is None:
+                return None
+            if self.ttl_seconds > 0 and row.created_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                db.delete(row)
+                db.commit()
+                return None
+            return row.verdict
+        finally:
+            db.close()
+
+    def _sql_set(self, cache_key: str, color_key: str, verdict: str):
+        from db.user_session import SessionLocal
+        from model.user_model import PersonalColorVerdict
+
+        self._ensure_table()
+        db = SessionLocal()
+        try:
+            db.merge(PersonalColorVerdict(cache_key=cache_key, color_key=color_key,
+                                          verdict=verdict, created_at=datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _hash(color_key: str) -> str:
+        return hashlib.sha256(color_key.encode("utf-8")).hexdigest()
+
+    def get(self, color_key: str) -> Optional[str]:
+        """양자화 키로 판정을 조회합니다. (메모리 -> SQL)"""
+        verdict = self.memory.get(color_key)
+        if verdict is not None or not self.use_sql:
+            return verdict
+        return self._get_from_sql(color_key)
+
+    async def aget(self, color_key: str) -> Optional[str]:
+        """get의 비동기 버전 (메모리 조회는 바로, SQL 조회는 스레드에서 실행)"""
+        verdict = self.memory.get(color_key)
+        if verdict is not None or not self.use_sql:
+            return verdict
+        return await asyncio.to_thread(self._get_from_sql, color_key)
+
+    def _get_from_sql(self, color_key: str) -> Optional[str]:
+        """SQL 테이블에서 조회하고, 찾으면 메모리에도 저장합니다."""
+        try:
+            verdict = self._sql_get(self._hash(color_key))
+        except Exception as e:
+            # 캐시 저장소 오류는 요청 실패로 이어지지 않도록 기록만 함
+            self.sql_errors += 1
+            print(f"판정 캐시 조회 실패: {e}")
+            return None
+        if verdict is not None:
+            self.sql_hits += 1
+            self.memory.set(color_key, verdict)
+        return verdict
+
+    def put(self, color_key: str, verdict: str):
+        """판정을 저장합니다. (정상 판정만 저장해야 함)"""
+        self.memory.set(color_key, verdict)
+        if self.use_sql:
+            self._put_to_sql(color_key, verdict)
+
+    async def aput(self, color_key: str, verdict: str):
+        """put의 비동기 버전 (메모리 저장은 바로, SQL 저장은 스레드에서 실행)"""
+        self.memory.set(color_key, verdict)
+        if self.use_sql:
+            await asyncio.to_thread(self._put_to_sql, color_key, verdict)
+
+    def _put_to_sql(self, color_key: str, verdict: str):
+        try:
+            self._sql_set(self._hash(color_key), color_key, verdict)
+        except Exception as e:
+            self.sql_errors += 1
+            print(f"판정 캐시 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (memory hits/misses는 메모리 LRU 기준, SQL 적중은 sql_hits)"""
+        stats = self.memory.stats()
+        stats["sql_enabled"] = self.use_sql
+        stats["sql_hits"] = self.sql_hits
+        stats["sql_errors"] = self.sql_errors
+        return stats
+
+
+_cache: Optional[PersonalColorVerdictCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> Optional[PersonalColorVerdictCache]:
+    """설정에 따라 프로세스 전역 판정 캐시를 반환합니다. 비활성화되어 있으면 None"""
+    global _cache
+    if not settings.personal_color_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PersonalColorVerdictCache(
+                    max_entries=settings.personal_color_cache_max_entries,
+                    ttl_seconds=settings.personal_color_cache_ttl_seconds,
+                    use_sql=settings.personal_color_cache_sql,
+                )
+    return _cache
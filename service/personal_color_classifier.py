@@ -0,0 +1,177 @@
+# 로컬 퍼스널 컬러 분류기
+# 얼굴 부위별 HEX 코드(피부, 머리카락, 눈)를 CIELAB 특징으로 바꿔 8가지 타입의 기준점(centroid)과 비교합니다.
+# personal_color.txt의 판단 기준을 그대로 특징으로 사용합니다.
+#
+#   색상(웜/쿨) : 피부의 Lab 색상각 h = atan2(b*, a*)  (클수록 노란 기, 작을수록 붉은/푸른 기)
+#   명도        : 피부의 L*
+#   채도        : 피부의 C* = sqrt(a*² + b*²)
+#   대비        : 피부 L* - 머리카락/눈 중 더 어두운 L* (브라이트/딥 타입은 명암 대비가 큼)
+#
+# 각 타입까지의 표준화 거리를 구하고, 신뢰도는 다음 두 값의 기하 평균입니다.
+#   근접도 : 가장 가까운 기준점까지의 거리가 max_distance에 가까울수록 0
+#   분리도 : 가장 가까운 타입과 두 번째 타입의 거리 차이 (d2 - d1) / (d2 + d1), 두 타입 사이 중간이면 0
+# 가장 가까운 기준점도 max_distance보다 멀거나(학습한 범위 밖의 색), 피부 채도가 min_chroma 미만이라
+# 색상각이 의미 없는 경우(무채색)에는 판정하지 않고 label=None을 반환합니다.
+# 판정하지 않았거나 신뢰도가 settings.personal_color_confidence_threshold 미만이면 gemini_service가 Gemini로 넘깁니다.
+
+import json
+import math
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from core.config import settings
+from service.color_space import hex_to_lab
+
+PERSONAL_COLOR_TYPES = (
+    "Spring Bright", "Spring Light", "Summer Light", "Summer Mute",
+    "Autumn Mute", "Autumn Deep", "Winter Deep", "Winter Bright",
+)
+
+FEATURE_NAMES = ("skin_lightness", "skin_hue", "skin_chroma", "contrast")
+
+# 타입별 기준 특징값 (personal_color_type.txt의 피부/헤어/눈동자 설명을 Lab 값으로 옮긴 것)
+DEFAULT_CENTROIDS: Dict[str, List[float]] = {
+    #                 L*    h(°)  C*    대비
+    "Spring Light":  [75.0, 62.0, 22.0, 40.0],  # 밝고 따뜻한 아이보리/피치, 연한 헤어
+    "Spring Bright": [72.0, 60.0, 28.0, 52.0],  # 생기 있는 웜톤, 선명한 대비
+    "Summer Light":  [76.0, 48.0, 17.0, 42.0],  # 핑크 베이스 쿨톤, 부드러운 대비
+    "Summer Mute":   [67.0, 52.0, 14.0, 46.0],  # 중성~쿨, 베이지 그레이, 낮은 채도
+    "Autumn Mute":   [64.0, 62.0, 21.0, 48.0],  # 따뜻한 베이지/올리브, 차분함
+    "Autumn Deep":   [56.0, 64.0, 26.0, 52.0],  # 짙은 웜 베이지, 깊은 명도
+    "Winter Deep":   [64.0, 50.0, 16.0, 65.0],  # 쿨 베이지, 블랙 헤어의 강한 대비
+    "Winter Bright": [74.0, 47.0, 18.0, 68.0],  # 밝고 투명한 쿨톤, 매우 강한 대비
+}
+
+# 특징별 거리 척도 (이 정도 차이를 표준편차 1로 봄)
+DEFAULT_SCALES: List[float] = [6.0, 6.0, 5.0, 10.0]
+
+HUE_INDEX = FEATURE_NAMES.index("skin_hue")
+
+
+def _mean_lab(hex_codes: Optional[List[str]]) -> Optional[np.ndarray]:
+    """부위의 HEX 코드들(지배색 순)의 평균 Lab, 없으면 None"""
+    if not hex_codes:
+        return None
+    return np.mean([hex_to_lab(code) for code in hex_codes], axis=0)
+
+
+def extract_features(hex_codes_data: Dict[str, List[str]]) -> Optional[np.ndarray]:
+    """
+    부위별 HEX 코드에서 분류 특징 벡터를 만듭니다. 피부 색이 없으면 None
+    머리카락/눈 색이 모두 없으면 대비는 중간값(타입 기준점 평균)으로 둡니다.
+    """
+    skin = _mean_lab(hex_codes_data.get("skin"))
+    if skin is None:
+        return None
+
+    L, a, b = skin
+    hue = math.degrees(math.atan2(b, a))
+    chroma = math.hypot(a, b)
+
+    dark_parts = [lab for lab in (_mean_lab(hex_codes_data.get("hair")), _mean_lab(hex_codes_data.get("eyes"))) if lab is not None]
+    if dark_parts:
+        contrast = L - min(lab[0] for lab in dark_parts)
+    else:
+        contrast = float(np.mean([centroid[3] for centroid in DEFAULT_CENTROIDS.values()]))
+    return np.array([L, hue, chroma, contrast], dtype=np.float64)
+
+
+class PersonalColorClassifier:
+    def __init__(self,
+                 centroids: Optional[Dict[str, List[float]]] = None,
+                 scales: Optional[List[float]] = None,
+                 temperature: float = 1.0,
+                 max_distance: float = 3.0,
+                 min_chroma: float = 5.0):
+        """
+        최근접 기준점(nearest-centroid) 분류기 초기화
+
+        Args:
+            centroids: 타입 이름 -> 특징 기준값 [L*, h, C*, 대비] (기본값 DEFAULT_CENTROIDS)
+            scales: 특징별 거리 척도 (기본값 DEFAULT_SCALES)
+            temperature: 타입별 점수(scores) softmax 온도 (클수록 완만해짐, 신뢰도에는 쓰지 않음)
+            max_distance: 판정하는 최대 표준화 거리 (가장 가까운 기준점도 이보다 멀면 label=None)
+            min_chroma: 판정하는 최소 피부 채도 C* (미만이면 색상각이 의미 없으므로 label=None)
+        """
+        centroids = centroids or DEFAULT_CENTROIDS
+        self.labels = list(centroids.keys())
+        self.centroids = np.array([centroids[label] for label in self.labels], dtype=np.float64)
+        self.scales = np.array(scales or DEFAULT_SCALES, dtype=np.float64)
+        self.temperature = temperature
+        self.max_distance = max_distance
+        self.min_chroma = min_chroma
+
+    @classmethod
+    def from_json(cls, path: str, **kwargs) -> "PersonalColorClassifier":
+        """{"centroids": {...}, "scales": [...], "temperature": 1.0} 형식의 보정 파일로 생성합니다."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("centroids"), config.get("scales"), config.get("temperature", 1.0), **kwargs)
+
+    def distances(self, features: np.ndarray) -> np.ndarray:
+        """타입별 표준화 거리 (색상각 차이는 -180~180도로 감아서 계산)"""
+        diff = self.centroids - features
+        diff[:, HUE_INDEX] = (diff[:, HUE_INDEX] + 180.0) % 360.0 - 180.0
+        return np.sqrt(np.sum((diff / self.scales) ** 2, axis=1))
+
+    def classify(self, hex_codes_data: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        부위별 HEX 코드를 분류합니다.
+
+        Returns:
+            Dict[str, Any]: {"label": 타입 이름 또는 None, "confidence": 0~1, "distance": 가장 가까운 기준점까지의 거리,
+                             "reason": 판정하지 않은 이유 또는 None, "scores": 타입별 상대 점수, "features": 특징값}
+        """
+        features = extract_features(hex_codes_data)
+        if features is None:
+            return {"label": None, "confidence": 0.0, "distance": None, "reason": "no_skin", "scores": {}, "features": None}
+
+        distances = self.distances(features)
+        logits = -distances ** 2 / (2.0 * self.temperature)
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+
+        order = np.argsort(distances)
+        best, second = int(order[0]), int(order[1])
+        d1, d2 = float(distances[best]), float(distances[second])
+
+        reason = None
+        if features[FEATURE_NAMES.index("skin_chroma")] < self.min_chroma:
+            reason = "achromatic_skin"
+        elif d1 > self.max_distance:
+            reason = "out_of_range"
+
+        if reason is None:
+            proximity = 1.0 - d1 / self.max_distance
+            separation = (d2 - d1) / (d2 + d1) if d2 + d1 > 0 else 0.0
+            confidence = math.sqrt(max(0.0, proximity) * max(0.0, separation))
+        else:
+            confidence = 0.0
+
+        return {
+            "label": self.labels[best] if reason is None else None,
+            "confidence": round(confidence, 4),
+            "distance": round(d1, 3),
+            "reason": reason,
+            "scores": {label: round(float(p), 4) for label, p in zip(self.labels, probabilities)},
+            "features": {name: round(float(value), 2) for name, value in zip(FEATURE_NAMES, features)},
+        }
+
+
+_classifier: Optional[PersonalColorClassifier] = None
+
+
+def get_personal_color_classifier() -> PersonalColorClassifier:
+    """공유 분류기 인스턴스 (settings.personal_color_centroids_path가 있으면 보정 파일 사용)"""
+    global _classifier
+    if _classifier is None:
+        limits = {
+            "max_distance": settings.personal_color_max_distance,
+            "min_chroma": settings.personal_color_min_chroma,
+        }
+        if settings.personal_color_centroids_path:
+            _classifier = PersonalColorClassifier.from_json(settings.personal_color_centroids_path, **limits)
+        else:
+            _classifier = PersonalColorClassifier(**limits)
+    return _classifier
@@ -0,0 +1,146 @@
+# 구조화된 코디 추천 결과 캐시
+# create_analyze_structured의 프롬프트는 StylingSummary 필드와 User.personal_color_name으로만 만들어지므로,
+# 이 입력들의 지문(fingerprint)이 같으면 이전 GeminiExamplePrompt 결과를 그대로 재사용합니다.
+#
+#   - 사용자 ID별로 (지문, 결과, 저장 시각)을 보관하고, 조회 시 현재 지문과 다르면 무효
+#   - crud의 스타일 요약/퍼스널 컬러 변경 함수에서 invalidate_recommendations(user_id)로 즉시 제거
+#   - stale-while-revalidate: 신선 기간(TTL)이 지났지만 허용 기간 안이면 이전 결과를 바로 반환하고
+#     백그라운드에서 새로 생성
+#
+# (crud가 이 모듈을 import 하므로 이 모듈은 crud/서비스 모듈을 import 하지 않습니다.)
+
+import json
+import time
+import hashlib
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from core.config import settings
+from service.ttl_cache import TTLCache
+
+# 프롬프트 형식이 바뀌면 올려서 이전 결과를 모두 무효화
+PROMPT_VERSION = "2"
+
+_FINGERPRINT_FIELDS = (
+    "budget", "occasion", "height", "gender", "top_size", "bottom_size",
+    "shoe_size", "body_feature", "preferred_styles",
+)
+
+
+def recommendation_fingerprint(styling_summary: Any, personal_color_name: Optional[str]) -> str:
+    """추천 프롬프트에 들어가는 입력(스타일 요약 필드 + 퍼스널 컬러)의 SHA-256 지문"""
+    payload = {field: getattr(styling_summary, field, None) for field in _FINGERPRINT_FIELDS}
+    payload["personal_color_name"] = personal_color_name
+    payload["prompt_version"] = PROMPT_VERSION
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 6 * 3600, stale_seconds: float = 0):
+        """
+        추천 캐시 초기화
+
+        Args:
+            max_entries: 최대 사용자 수
+            ttl_seconds: 결과를 신선하다고 보는 시간(초)
+            stale_seconds: TTL이 지난 뒤에도 이전 결과를 반환하며 백그라운드 갱신하는 추가 시간(초), 0이면 사용 안 함
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        # 항목 자체는 TTL + stale 기간까지 보관
+        self.entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds + stale_seconds)
+        self.stale_hits = 0
+        self.invalidations = 0
+        self.refreshes = 0
+        self._refreshing: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, fingerprint: str) -> Tuple[Optional[Any], bool]:
+        """
+        (결과, 신선 여부)를 반환합니다. 지문이 다르거나 없으면 (None, False)
+        """
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None, False
+        cached_fingerprint, result, stored_at = entry
+        if cached_fingerprint != fingerprint:
+            self.entries.delete(user_id)
+            return None, False
+        fresh = time.monotonic() - stored_at <= self.ttl_seconds
+        if not fresh:
+            self.stale_hits += 1
+        return result, fresh
+
+    def put(self, user_id: int, fingerprint: str, result: Any):
+        """결과를 저장합니다."""
+        self.entries.set(user_id, (fingerprint, result, time.monotonic()))
+
+    def invalidate(self, user_id: int):
+        """사용자의 결과를 제거합니다."""
+        self.entries.delete(user_id)
+        self.invalidations += 1
+
+    def refresh_in_background(self, user_id: int, refresh: Callable[[], Awaitable[None]]) -> bool:
+        """
+        사용자별로 하나의 백그라운드 갱신만 실행합니다. 이미 갱신 중이면 False
+        refresh는 결과를 직접 put 해야 합니다.
+        """
+        with self._lock:
+            if user_id in self._refreshing:
+                return False
+            self._refreshing.add(user_id)
+
+        async def run():
+            try:
+                await refresh()
+                self.refreshes += 1
+            except Exception as e:
+                print(f"추천 결과 백그라운드 갱신 실패 (user_id={user_id}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user_id)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        stats = self.entries.stats()
+        stats["fresh_ttl_seconds"] = self.ttl_seconds
+        stats["stale_seconds"] = self.stale_seconds
+        stats["stale_hits"] = self.stale_hits
+        stats["invalidations"] = self.invalidations
+        stats["background_refreshes"] = self.refreshes
+        stats["refreshing"] = len(self._refreshing)
+        return stats
+
+
+_cache: Optional[RecommendationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_recommendation_cache() -> Optional[RecommendationCache]:
+    """설정에 따라 프로세스 전역 추천 캐시를 반환합니다. 비활성화되어 있으면 None"""
+    global _cache
+    if not settings.recommendation_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RecommendationCache(
+                    max_entries=settings.recommendation_cache_max_entries,
+                    ttl_seconds=settings.recommendation_cache_ttl_seconds,
+                    stale_seconds=settings.recommendation_cache_stale_seconds,
+                )
+    return _cache
+
+
+def invalidate_recommendations(user_id: int):
+    """스타일 요약이나 퍼스널 컬러가 바뀐 사용자의 추천 결과를 제거합니다. (crud에서 호출)"""
+    if _cache is not None:
+        _cache.invalidate(user_id)
@@ -0,0 +1,34 @@
+# 클라이언트 연결 종료 시 작업 취소
+# LLM 호출처럼 오래 걸리는 작업을 실행하는 동안 클라이언트 연결을 주기적으로 확인하고,
+# 연결이 끊기면 작업을 취소하여 응답받을 사람이 없는 호출에 할당량과 워커를 쓰지 않도록 합니다.
+
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import Request, HTTPException
+
+T = TypeVar("T")
+
+# 클라이언트가 응답 전에 연결을 끊은 경우 (nginx 관례)
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """
+    awaitable을 실행하면서 poll_interval 간격으로 클라이언트 연결을 확인합니다.
+    작업이 끝나면 결과를 반환하고, 그 전에 연결이 끊기면 작업을 취소한 뒤 499 HTTPException을 발생시킵니다.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                print(f"클라이언트 연결 종료로 작업을 취소했습니다: {request.url.path}")
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="클라이언트가 요청을 취소했습니다.")
+    finally:
+        # 요청 처리 자체가 취소된 경우에도 작업이 남지 않도록 정리
+        if not task.done():
+            task.cancel()
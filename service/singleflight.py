@@ -0,0 +1,212 @@
+# 동일 요청 합치기 (singleflight)
+# 더블 클릭이나 프런트엔드 재시도로 같은 분석 요청이 동시에 여러 번 들어오면,
+# 첫 요청(leader)만 실제로 계산하고 나머지(follower)는 그 결과를 함께 받습니다.
+#
+#   - SingleFlight     : 프로세스 내부. 키별로 실행 중인 asyncio 작업 하나를 공유
+#                        기다리는 요청이 모두 연결을 끊으면 작업도 취소
+#   - FileSingleFlight : 여러 워커 프로세스 간. 키별 잠금 파일(fcntl.flock)을 잡은 프로세스만 계산하고
+#                        결과를 결과 파일에 저장, 계산이 끝날 때 잠금을 기다리던 프로세스는 결과 파일을 읽어 반환
+#                        (잠금은 프로세스가 죽으면 OS가 해제하므로 남은 잠금 파일 정리가 필요 없음)
+#
+# 결과 캐시가 아닙니다. 계산이 끝난 뒤에 들어온 요청은 같은 키라도 새로 계산합니다.
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """프로세스 내부 요청 합치기"""
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self,
+                 key: str,
+                 factory: Callable[[], Awaitable[Any]],
+                 dumps: Optional[Callable[[Any], Any]] = None,
+                 loads: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        key로 실행 중인 작업이 있으면 그 결과를 기다리고, 없으면 factory()를 실행합니다.
+        factory는 요청 객체(DB 세션 등)에 의존하지 않아야 합니다. (먼저 온 요청이 끊겨도 작업은 계속될 수 있음)
+        dumps/loads는 FileSingleFlight와 같은 방식으로 호출할 수 있도록 받기만 합니다.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = {"task": asyncio.ensure_future(factory()), "waiters": 0}
+            self._calls[key] = call
+
+            def _forget(_):
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+            call["task"].add_done_callback(_forget)
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call["waiters"] += 1
+        try:
+            # shield: 한 요청이 취소되어도 다른 요청이 기다리는 작업은 계속 실행
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                # 기다리는 요청이 하나도 남지 않으면 작업 취소
+                call["task"].cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """요청 합치기 통계"""
+        return {"backend": "local", "in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class FileSingleFlight:
+    def __init__(self, directory: str, poll_interval: float = 0.2):
+        """
+        여러 워커 프로세스 간 요청 합치기
+
+        Args:
+            directory: 잠금/결과 파일 저장 경로 (같은 호스트의 워커들이 공유)
+            poll_interval: 잠금을 다시 시도하는 간격(초)
+        """
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.local = SingleFlight()
+        self.leaders = 0
+        self.shared_hits = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: str):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + ".lock", base + ".json"
+
+    @staticmethod
+    def _read_result(result_path: str, arrived_at: float) -> Optional[Any]:
+        """
+        arrived_at(이 요청이 잠금을 기다리기 시작한 시각) 이후에 계산이 끝난 결과 파일 내용, 없으면 None
+        그 전에 끝난 결과는 이 요청과 동시에 실행된 계산이 아니므로 사용하지 않습니다.
+        """
+        try:
+            with open(result_path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or record.get("finished_at", 0.0) < arrived_at:
+            return None
+        return record.get("payload")
+
+    @staticmethod
+    def _write_result(result_path: str, payload: Any):
+        """결과 파일을 계산이 끝난 시각과 함께 원자적으로 저장 (임시 파일 후 교체)"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(result_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"finished_at": time.time(), "payload": payload}, f, ensure_ascii=False)
+            os.replace(tmp_path, result_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def _acquire(self, lock_path: str) -> int:
+        """
+        잠금을 얻을 때까지 비차단 시도를 반복합니다. (스레드에서 차단 대기하면 요청이 취소되었을 때
+        잠금을 쥔 채 남을 수 있으므로 이벤트 루프에서 폴링)
+        """
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    await asyncio.sleep(self.poll_interval)
+        except BaseException:
+            os.close(fd)
+            raise
+
+    async def _do_shared(self,
+                         key: str,
+                         factory: Callable[[], Awaitable[Any]],
+                         dumps: Callable[[Any], Any],
+                         loads: Callable[[Any], Any]) -> Any:
+        lock_path, result_path = self._paths(key)
+        arrived_at = time.time()
+        fd = await self._acquire(lock_path)
+        try:
+            # 기다리는 동안 다른 워커가 계산을 마쳤으면 그 결과 사용
+            payload = self._read_result(result_path, arrived_at)
+            if payload is not None:
+                self.shared_hits += 1
+                return loads(payload)
+
+            self.leaders += 1
+            result = await factory()
+            try:
+                self._write_result(result_path, dumps(result))
+            except Exception as e:
+                print(f"singleflight 결과 파일 저장 실패: {e}")
+            return result
+        finally:
+            # 파일을 닫으면 잠금도 해제됨
+            os.close(fd)
+
+    async def do(self,
+                 key: str,
+                 factory: Callable[[], Awaitable[Any]],
+                 dumps: Callable[[Any], Any],
+                 loads: Callable[[Any], Any]) -> Any:
+        """
+        프로세스 안에서는 SingleFlight로 합치고, 프로세스 간에는 잠금 파일로 합칩니다.
+        dumps/loads는 결과를 JSON으로 저장 가능한 값으로 바꾸고 되돌리는 함수입니다.
+        """
+        return await self.local.do(key, lambda: self._do_shared(key, factory, dumps, loads))
+
+    def stats(self) -> Dict[str, Any]:
+        """요청 합치기 통계 (leaders: 이 프로세스가 실제 계산한 수, shared_hits: 다른 워커 결과 사용 수)"""
+        stats = self.local.stats()
+        stats["backend"] = "file"
+        stats["leaders"] = self.leaders
+        stats["shared_hits"] = self.shared_hits
+        return stats
+
+
+_singleflight: Optional[Any] = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> Optional[Any]:
+    """
+    설정에 따라 프로세스 전역 요청 합치기 인스턴스를 반환합니다. 비활성화되어 있으면 None
+    "file"이지만 fcntl을 쓸 수 없는 환경(Windows)이면 프로세스 내부 합치기만 사용합니다.
+    """
+    global _singleflight
+    backend = settings.singleflight_backend
+    if backend == "off":
+        return None
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                if backend == "file" and fcntl is not None:
+                    _singleflight = FileSingleFlight(
+                        settings.singleflight_dir or os.path.join(tempfile.gettempdir(), "myshoppingfairy_singleflight"),
+                    )
+                else:
+                    if backend == "file":
+                        print("fcntl을 사용할 수 없어 프로세스 내부 요청 합치기만 사용합니다.")
+                    _singleflight = SingleFlight()
+    return _singleflight
@@ -0,0 +1,47 @@
+# 테스트 공통 설정
+# core.config.Settings의 필수 환경변수를 테스트용 값으로 채우고, 프로젝트 루트를 import 경로에 추가합니다.
+# (외부 서비스 없이 실행되는 단위 테스트만 둡니다. DB는 임시 SQLite 파일)
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="myshoppingfairy-test-"), "test.db"))
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+
+class FakeClock:
+    """time.monotonic 대신 쓰는 수동 시계 (advance로만 흐름)"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    fake_clock.install(module): 모듈의 time을 수동 시계로 바꿉니다.
+    (asyncio의 타이머는 실제 시간으로 동작하므로, 시계를 진행한 뒤 필요하면 직접 다시 배분을 호출)
+    """
+    clock = FakeClock()
+
+    def install(module):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=clock.monotonic, time=clock.time))
+
+    clock.install = install
+    return clock
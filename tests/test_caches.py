@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+import service.recommendation_cache as recommendation_module
+import service.ttl_cache as ttl_module
+from service.personal_color_cache import PersonalColorVerdictCache, quantize_color_key
+from service.recommendation_cache import RecommendationCache, recommendation_fingerprint
+from service.ttl_cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a가 최근 사용
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["entries"] == 2
+
+
+def test_ttl_cache_expires_entries(fake_clock):
+    fake_clock.install(ttl_module)
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+
+    fake_clock.advance(60)
+    assert cache.get("a") == 1
+    fake_clock.advance(1)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 0)
+
+
+def test_quantize_color_key_groups_nearby_colors():
+    base = {"skin": ["#E0B8A0"], "hair": ["#2B1D16"], "eyes": []}
+    nearby = {"skin": ["#E1B8A0"], "hair": ["#2B1D16"], "eyes": []}
+    far = {"skin": ["#8D5A3B"], "hair": ["#2B1D16"], "eyes": []}
+
+    key = quantize_color_key(base, bin_size=8)
+    assert key.startswith("skin:") and key.endswith("|eyes:-")
+    assert quantize_color_key(nearby, bin_size=8) == key
+    assert quantize_color_key(far, bin_size=8) != key
+    assert quantize_color_key({"hair": ["#2B1D16"]}, bin_size=8) is None
+
+
+def test_verdict_cache_memory_only():
+    cache = PersonalColorVerdictCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("skin:1,2,3|hair:-|eyes:-") is None
+    cache.put("skin:1,2,3|hair:-|eyes:-", "spring_light")
+    assert cache.get("skin:1,2,3|hair:-|eyes:-") == "spring_light"
+    assert cache.stats()["sql_enabled"] is False
+
+
+def test_verdict_cache_sql_is_shared_between_instances():
+    async def scenario():
+        color_key = "skin:9,9,9|hair:1,1,1|eyes:-"
+        writer = PersonalColorVerdictCache(max_entries=10, ttl_seconds=3600, use_sql=True)
+        await writer.aput(color_key, "autumn_deep")
+
+        # 다른 워커 = 메모리가 빈 새 인스턴스
+        reader = PersonalColorVerdictCache(max_entries=10, ttl_seconds=3600, use_sql=True)
+        assert await reader.aget(color_key) == "autumn_deep"
+        assert reader.stats()["sql_hits"] == 1
+        # SQL에서 찾은 판정은 메모리에도 저장
+        assert reader.memory.get(color_key) == "autumn_deep"
+        assert reader.get("skin:0,0,0|hair:-|eyes:-") is None
+        assert reader.stats()["sql_errors"] == 0
+
+    asyncio.run(scenario())
+
+
+def summary(**overrides):
+    fields = {
+        "budget": "100000", "occasion": "데이트", "height": 165, "gender": "female",
+        "top_size": "M", "bottom_size": "27", "shoe_size": 240,
+        "body_feature": "어깨가 넓음", "preferred_styles": ["캐주얼"],
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_recommendation_fingerprint_tracks_prompt_inputs():
+    fingerprint = recommendation_fingerprint(summary(), "spring_light")
+    assert recommendation_fingerprint(summary(), "spring_light") == fingerprint
+    assert recommendation_fingerprint(summary(occasion="출근"), "spring_light") != fingerprint
+    assert recommendation_fingerprint(summary(), "winter_deep") != fingerprint
+    # 프롬프트에 쓰이지 않는 필드는 무시
+    assert recommendation_fingerprint(summary(updated_at="2026-01-01"), "spring_light") == fingerprint
+
+
+def test_recommendation_cache_fresh_stale_and_expired(fake_clock):
+    fake_clock.install(ttl_module)
+    fake_clock.install(recommendation_module)
+    cache = RecommendationCache(max_entries=10, ttl_seconds=60, stale_seconds=30)
+    cache.put(1, "fp", ["look"])
+
+    assert cache.get(1, "fp") == (["look"], True)
+    fake_clock.advance(61)
+    assert cache.get(1, "fp") == (["look"], False)
+    assert cache.stats()["stale_hits"] == 1
+    fake_clock.advance(30)
+    assert cache.get(1, "fp") == (None, False)
+
+
+def test_recommendation_cache_fingerprint_mismatch_and_invalidate():
+    cache = RecommendationCache(max_entries=10, ttl_seconds=60)
+    cache.put(1, "fp", ["look"])
+    assert cache.get(1, "other") == (None, False)
+    # 지문이 다르면 항목이 제거됨
+    assert cache.get(1, "fp") == (None, False)
+
+    cache.put(2, "fp", ["look"])
+    cache.invalidate(2)
+    assert cache.get(2, "fp") == (None, False)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_recommendation_cache_runs_one_background_refresh_per_user():
+    async def scenario():
+        cache = RecommendationCache(max_entries=10, ttl_seconds=60, stale_seconds=60)
+        release = asyncio.Event()
+
+        async def refresh():
+            await release.wait()
+            cache.put(1, "fp", ["new look"])
+
+        assert cache.refresh_in_background(1, refresh)
+        assert not cache.refresh_in_background(1, refresh)
+        release.set()
+        await asyncio.gather(*cache._tasks)
+
+        assert cache.get(1, "fp") == (["new look"], True)
+        assert cache.stats()["background_refreshes"] == 1
+        assert cache.stats()["refreshing"] == 0
+
+    asyncio.run(scenario())
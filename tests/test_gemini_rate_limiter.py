@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+
+import service.gemini_rate_limiter as module
+from service.gemini_rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    GeminiQueueTimeout,
+    GeminiRateLimiter,
+    is_rate_limit_error,
+)
+from service.llm_client import FakeLLMClient, FakeRateLimitError
+
+
+async def settle():
+    """대기 중인 콜백/태스크가 한 번씩 실행되도록 양보합니다."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_burst_then_refill(fake_clock):
+    fake_clock.install(module)
+
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=60, burst=2, max_in_flight=10)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        third = asyncio.ensure_future(limiter.acquire())
+        await settle()
+        assert not third.done()
+        assert limiter.stats()["queued"]["low"] == 1
+
+        # 분당 60회 = 1초에 토큰 1개
+        fake_clock.advance(1.0)
+        limiter._dispatch()
+        await settle()
+        assert third.done()
+        assert limiter.stats()["in_flight"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_high_priority_is_granted_before_low():
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=6000, burst=10, max_in_flight=1)
+        await limiter.acquire()
+
+        order = []
+
+        async def wait(priority, name):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        low = asyncio.ensure_future(wait(PRIORITY_LOW, "low"))
+        await settle()
+        high = asyncio.ensure_future(wait(PRIORITY_HIGH, "high"))
+        await settle()
+        assert order == []
+
+        limiter.release()
+        await settle()
+        assert order == ["high"]
+        limiter.release()
+        await settle()
+        assert order == ["high", "low"]
+        await asyncio.gather(low, high)
+        assert limiter.stats()["granted"] == {"high": 1, "low": 2}
+
+    asyncio.run(scenario())
+
+
+def test_slot_is_released_after_block():
+    async def scenario():
+        limiter = GeminiRateLimiter(max_in_flight=1)
+        async with limiter.slot():
+            assert limiter.stats()["in_flight"] == 1
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout(fake_clock):
+    fake_clock.install(module)
+
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=1, burst=1, queue_timeout_seconds=0.05)
+        await limiter.acquire()
+        with pytest.raises(GeminiQueueTimeout):
+            await limiter.acquire()
+        stats = limiter.stats()
+        assert stats["queue_timeouts"] == 1
+        assert stats["queued"] == {"high": 0, "low": 0}
+
+    asyncio.run(scenario())
+
+
+def test_backoff_is_jittered_and_respects_retry_delay_hint(fake_clock):
+    fake_clock.install(module)
+    limiter = GeminiRateLimiter(backoff_base_seconds=1.0, backoff_max_seconds=30.0)
+
+    for attempt in range(4):
+        delay = limiter.backoff(attempt)
+        expected = 2 ** attempt
+        assert expected * 0.5 <= delay <= expected
+
+    hinted = limiter.backoff(0, Exception("429 quota exceeded retry_delay { seconds: 20 }"))
+    assert hinted >= 20
+    # 백오프 동안 버킷이 멈춤
+    assert limiter.stats()["paused_seconds"] == pytest.approx(hinted)
+    assert limiter.stats()["tokens"] == 0.0
+
+
+def test_is_rate_limit_error_checks_cause_chain():
+    assert is_rate_limit_error(FakeRateLimitError("429 Resource has been exhausted"))
+    assert not is_rate_limit_error(ValueError("bad request"))
+
+    try:
+        try:
+            raise FakeRateLimitError("429 quota")
+        except FakeRateLimitError as e:
+            raise RuntimeError("instructor retry failed") from e
+    except RuntimeError as wrapped:
+        assert is_rate_limit_error(wrapped)
+
+
+def test_call_retries_rate_limit_errors():
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=60000, max_retries=3, backoff_base_seconds=0.001, backoff_max_seconds=0.01)
+        attempts = {"count": 0}
+
+        async def flaky():
+            attempts["count"] += 1
+            if attempts["count"] < 3:
+                raise FakeRateLimitError("429 quota")
+            return "ok"
+
+        assert await limiter.call(flaky) == "ok"
+        stats = limiter.stats()
+        assert attempts["count"] == 3
+        assert stats["retries"] == 2
+        assert stats["rate_limited"] == 2
+        assert stats["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_call_does_not_retry_other_errors_and_gives_up_after_max_retries():
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=60000, max_retries=2, backoff_base_seconds=0.001, backoff_max_seconds=0.01)
+
+        async def broken():
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await limiter.call(broken)
+        assert limiter.stats()["retries"] == 0
+
+        async def always_429():
+            raise FakeRateLimitError("429 quota")
+
+        with pytest.raises(FakeRateLimitError):
+            await limiter.call(always_429)
+        assert limiter.stats()["retries"] == 2
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_retries_only_before_first_item():
+    async def scenario():
+        limiter = GeminiRateLimiter(requests_per_minute=60000, max_retries=3, backoff_base_seconds=0.001, backoff_max_seconds=0.01)
+        attempts = {"count": 0}
+
+        async def flaky_stream():
+            attempts["count"] += 1
+            if attempts["count"] == 1:
+                raise FakeRateLimitError("429 quota")
+            for item in range(3):
+                yield item
+
+        assert [item async for item in limiter.stream(flaky_stream)] == [0, 1, 2]
+        assert limiter.stats()["retries"] == 1
+
+        async def fails_mid_stream():
+            yield 0
+            raise FakeRateLimitError("429 quota")
+
+        received = []
+        with pytest.raises(FakeRateLimitError):
+            async for item in limiter.stream(fails_mid_stream):
+                received.append(item)
+        assert received == [0]
+        assert limiter.stats()["retries"] == 1
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_fake_llm_rate_limits_are_absorbed():
+    async def scenario():
+        fake = FakeLLMClient(text_latency_ms=1, latency_sigma=0.0, rate_limit_rate=0.3, seed=7)
+        limiter = GeminiRateLimiter(requests_per_minute=60000, burst=100, max_retries=10,
+                                    backoff_base_seconds=0.001, backoff_max_seconds=0.005)
+        verdicts = await asyncio.gather(*[
+            limiter.call(lambda i=i: fake.generate_text(f"skin #{i:06x}"), priority=PRIORITY_HIGH)
+            for i in range(20)
+        ])
+        assert len(verdicts) == 20
+        assert fake.injected_429 > 0
+        assert limiter.stats()["retries"] == fake.injected_429
+
+    asyncio.run(scenario())
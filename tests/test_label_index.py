@@ -0,0 +1,71 @@
+import numpy as np
+
+from service.label_index import LabelIndex
+
+MASK = np.array([
+    [0, 1, 1, 0],
+    [2, 1, 0, 3],
+    [2, 2, 0, 3],
+], dtype=np.uint8)
+
+
+def test_count_and_has():
+    index = LabelIndex(MASK)
+    assert index.count([1]) == 3
+    assert index.count([1, 2]) == 6
+    assert index.count([17]) == 0
+    assert index.has(3)
+    assert not index.has(4)
+    assert not index.has(17)
+
+
+def test_indices_are_in_raster_order():
+    index = LabelIndex(MASK)
+    assert index.indices([1]).tolist() == [1, 2, 5]
+    assert index.indices([2, 1]).tolist() == [1, 2, 4, 5, 8, 9]
+    assert index.indices([17]).tolist() == []
+
+
+def test_pixels_match_boolean_indexing():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=MASK.shape + (3,), dtype=np.uint8)
+    index = LabelIndex(MASK)
+
+    np.testing.assert_array_equal(index.pixels(image, [1, 3]), image[np.isin(MASK, [1, 3])])
+    assert index.pixels(image, [17]).shape == (0, 3)
+
+
+def test_part_mask_bbox_and_crop_mask():
+    index = LabelIndex(MASK)
+    np.testing.assert_array_equal(index.part_mask([2, 3]), np.isin(MASK, [2, 3]))
+
+    bbox = index.bbox([1])
+    assert bbox == (0, 1, 1, 2)
+    np.testing.assert_array_equal(index.crop_mask([1], bbox), np.array([[255, 255], [255, 0]], dtype=np.uint8))
+    assert index.bbox([17]) is None
+
+
+def test_crop_mask_clips_to_given_bbox():
+    index = LabelIndex(MASK)
+    crop = index.crop_mask([2], (2, 2, 0, 1))
+    np.testing.assert_array_equal(crop, np.array([[255, 255]], dtype=np.uint8))
+
+
+def test_region_index_keeps_frame_mask_and_offset():
+    frame = np.zeros((6, 8), dtype=np.uint8)
+    frame[2:5, 3:7] = MASK
+    region = frame[2:5, 3:7]
+
+    index = LabelIndex(region, offset=(2, 3), frame_mask=frame)
+    assert index.shape == MASK.shape
+    assert index.frame_shape == frame.shape
+    assert index.offset == (2, 3)
+    assert index.frame_mask is frame
+    # 영역 기준 좌표
+    assert index.bbox([3]) == (1, 2, 3, 3)
+
+
+def test_non_uint8_mask_is_converted():
+    index = LabelIndex(MASK.astype(np.int64))
+    assert index.mask.dtype == np.uint8
+    assert index.count([2]) == 3
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import service.personal_color_classifier as module
+from service.personal_color_classifier import (
+    DEFAULT_CENTROIDS,
+    FEATURE_NAMES,
+    PersonalColorClassifier,
+    extract_features,
+)
+
+DARK_HAIR = {"hair": ["#2b1b12"], "eyes": ["#3a2a20"]}
+
+
+def classify_features(monkeypatch, classifier, features):
+    """특징값을 직접 넣어 분류합니다. (extract_features를 우회)"""
+    monkeypatch.setattr(module, "extract_features", lambda _: np.asarray(features, dtype=np.float64))
+    return classifier.classify({"skin": ["#000000"]})
+
+
+def test_no_skin_returns_no_label():
+    result = PersonalColorClassifier().classify({"hair": ["#2b1b12"]})
+    assert result["label"] is None
+    assert result["confidence"] == 0.0
+    assert result["reason"] == "no_skin"
+
+
+@pytest.mark.parametrize("label", list(DEFAULT_CENTROIDS))
+def test_centroid_is_classified_with_full_confidence(monkeypatch, label):
+    result = classify_features(monkeypatch, PersonalColorClassifier(), DEFAULT_CENTROIDS[label])
+    assert result["label"] == label
+    assert result["confidence"] == pytest.approx(1.0)
+    assert result["distance"] == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize("skin", ["#00ff00", "#a0522d", "#8d5524"])
+def test_far_from_every_centroid_is_rejected(skin):
+    result = PersonalColorClassifier().classify({"skin": [skin], **DARK_HAIR})
+    assert result["label"] is None
+    assert result["confidence"] == 0.0
+    assert result["reason"] == "out_of_range"
+
+
+@pytest.mark.parametrize("skin", ["#ffffff", "#808080"])
+def test_achromatic_skin_is_rejected(skin):
+    result = PersonalColorClassifier().classify({"skin": [skin], **DARK_HAIR})
+    assert result["label"] is None
+    assert result["reason"] == "achromatic_skin"
+
+
+def test_confidence_drops_with_distance(monkeypatch):
+    classifier = PersonalColorClassifier()
+    centroid = np.array(DEFAULT_CENTROIDS["Spring Light"])
+    direction = np.zeros(len(FEATURE_NAMES))
+    direction[0] = classifier.scales[0]
+    confidences = [classify_features(monkeypatch, classifier, centroid + step * direction)["confidence"] for step in (0.0, 0.5, 1.0, 2.0)]
+    assert confidences == sorted(confidences, reverse=True)
+    assert confidences[-1] < 0.6
+
+
+def test_midpoint_between_two_types_has_no_confidence(monkeypatch):
+    classifier = PersonalColorClassifier()
+    midpoint = (np.array(DEFAULT_CENTROIDS["Spring Light"]) + np.array(DEFAULT_CENTROIDS["Spring Bright"])) / 2
+    assert classify_features(monkeypatch, classifier, midpoint)["confidence"] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_hue_difference_wraps_around():
+    classifier = PersonalColorClassifier()
+    features = np.array(DEFAULT_CENTROIDS["Spring Light"])
+    wrapped = features.copy()
+    wrapped[FEATURE_NAMES.index("skin_hue")] += 360.0
+    assert np.allclose(classifier.distances(features), classifier.distances(wrapped))
+
+
+def test_contrast_defaults_without_hair_and_eyes():
+    features = extract_features({"skin": ["#e8b896"]})
+    assert features is not None
+    expected = np.mean([centroid[3] for centroid in DEFAULT_CENTROIDS.values()])
+    assert features[FEATURE_NAMES.index("contrast")] == pytest.approx(expected)
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from service.singleflight import FileSingleFlight, SingleFlight, fcntl
+
+
+async def settle():
+    """대기 중인 콜백/태스크가 한 번씩 실행되도록 양보합니다."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_share_one_computation():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = {"count": 0}
+
+        async def compute():
+            calls["count"] += 1
+            await release.wait()
+            return {"verdict": "spring_light"}
+
+        first = asyncio.ensure_future(flight.do("user-1", compute))
+        second = asyncio.ensure_future(flight.do("user-1", compute))
+        await settle()
+        release.set()
+
+        assert await first == await second == {"verdict": "spring_light"}
+        assert calls["count"] == 1
+        assert flight.stats() == {"backend": "local", "in_flight": 0, "leaders": 1, "coalesced": 1}
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_are_not_coalesced():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def compute(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(flight.do("a", lambda: compute(1)), flight.do("b", lambda: compute(2)))
+        assert results == [1, 2]
+        assert flight.stats()["leaders"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_exception_is_raised_to_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def broken():
+            await release.wait()
+            raise ValueError("gemini failed")
+
+        waiters = [asyncio.ensure_future(flight.do("key", broken)) for _ in range(3)]
+        await settle()
+        release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_computation_continues_while_someone_is_waiting():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "done"
+
+        leaver = asyncio.ensure_future(flight.do("key", compute))
+        stayer = asyncio.ensure_future(flight.do("key", compute))
+        await settle()
+
+        # 먼저 온 요청이 끊겨도 남은 요청은 결과를 받음
+        leaver.cancel()
+        await settle()
+        release.set()
+        assert await stayer == "done"
+        assert leaver.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_computation_is_cancelled_when_every_waiter_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def compute():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flight.do("key", compute)) for _ in range(2)]
+        await settle()
+        for waiter in waiters:
+            waiter.cancel()
+        await settle()
+
+        assert cancelled.is_set()
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_calls_after_completion_compute_again():
+    async def scenario():
+        flight = SingleFlight()
+        calls = {"count": 0}
+
+        async def compute():
+            calls["count"] += 1
+            return calls["count"]
+
+        assert await flight.do("key", compute) == 1
+        assert await flight.do("key", compute) == 2
+        assert flight.stats()["coalesced"] == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(fcntl is None, reason="fcntl이 없는 환경")
+def test_file_singleflight_shares_result_only_with_concurrent_waiters(tmp_path):
+    async def scenario():
+        # 같은 디렉터리를 쓰는 두 인스턴스 = 두 워커 프로세스
+        worker_a = FileSingleFlight(str(tmp_path), poll_interval=0.01)
+        worker_b = FileSingleFlight(str(tmp_path), poll_interval=0.01)
+        release = asyncio.Event()
+        calls = {"count": 0}
+
+        async def compute():
+            calls["count"] += 1
+            await release.wait()
+            return {"verdict": f"run-{calls['count']}"}
+
+        leader = asyncio.ensure_future(worker_a.do("key", compute, dumps=dict, loads=dict))
+        await asyncio.sleep(0.02)
+        follower = asyncio.ensure_future(worker_b.do("key", compute, dumps=dict, loads=dict))
+        await asyncio.sleep(0.02)
+        release.set()
+
+        assert await leader == {"verdict": "run-1"}
+        assert await follower == {"verdict": "run-1"}
+        assert calls["count"] == 1
+        assert worker_a.stats()["leaders"] == 1
+        assert worker_b.stats()["shared_hits"] == 1
+
+        # 계산이 끝난 뒤 들어온 요청은 결과 파일이 남아 있어도 새로 계산
+        assert await worker_b.do("key", compute, dumps=dict, loads=dict) == {"verdict": "run-2"}
+        assert calls["count"] == 2
+        assert worker_b.stats()["leaders"] == 1
+
+    asyncio.run(scenario())